@@ -48,16 +48,17 @@ def get_db_data(student_usn: str) -> pd.DataFrame:
         
     conn = sqlite3.connect(db_path)
     
-    # Query that joins students -> semesters -> subjects -> marks 
+    # Query that joins students -> semesters -> subjects (-> courses) -> marks 
     query = """
     SELECT 
-        s.subject_name as Subject,
-        s.credits as Credits,
+        co.subject_name as Subject,
+        co.credits as Credits,
         COALESCE(c.final_cie, 0) as CIE,
         COALESCE(sm.reduced_scored, 0) as SEE
     FROM students st
     JOIN semesters sem ON sem.student_id = st.id
     JOIN subjects s ON s.semester_id = sem.id
+    JOIN courses co ON co.id = s.course_id
     LEFT JOIN cie_records c ON c.subject_id = s.id
     LEFT JOIN see_marks sm ON sm.subject_id = s.id
     WHERE st.usn = ?
@@ -0,0 +1,160 @@
+"""
+bench/bench_async_load.py – Latency distribution of the hot read endpoints at 500 concurrent clients, sync vs async
+
+The four hot reads (marks summary, subject list, CIE, SEE) are served twice by the
+same app: as shipped (async def on get_async_db) and, mounted under /sync, as the
+previous sync handlers on get_db, which FastAPI runs in its threadpool (40 threads).
+--clients concurrent clients each send up to --requests random reads to one variant,
+starting no new request after --seconds; latency percentiles are reported per variant.
+Failed requests are counted as errors: under overload the sync handlers park every
+threadpool thread on a connection checkout while finished handlers still hold their
+sessions, waiting for a thread to serialise the response, until the pool times out.
+
+Clients and server share one event loop (httpx ASGITransport; no uvicorn needed), so
+absolute latencies include the client side; compare the two rows, not the numbers
+with a deployed server. A throwaway SQLite database is seeded and the response cache
+is off, so every request reaches the database.
+
+    python bench/bench_async_load.py --clients 500 --requests 20
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_TMP = tempfile.mkdtemp(prefix="bench-async-load-")
+# configuration is read at import time: set it before anything from the engine is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'bench.db')}"
+os.environ["RESPONSE_CACHE_BACKEND"] = "off"
+os.environ["SYLLABUS_JOB_DIR"] = os.path.join(_TMP, "job_files")
+os.environ["UPLOAD_TMP_DIR"] = _TMP
+sys.path.insert(0, ENGINE_DIR)
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from main import app  # creates and migrates the tables
+import models, schemas
+from bench.bench_db_concurrency import seed
+from database import engine, get_db
+from services.summary_service import build_semester_summary, semester_tree_options
+
+# ── Sync twins of the async read endpoints ──────────────────────────
+
+sync_router = APIRouter(prefix="/sync")
+
+
+@sync_router.get("/semesters/{semester_id}/marks-summary", response_model=schemas.SemesterMarksSummary)
+def get_marks_summary(semester_id: int, db: Session = Depends(get_db)):
+    sem = (db.query(models.Semester).options(*semester_tree_options())
+           .filter(models.Semester.id == semester_id).first())
+    if not sem:
+        raise HTTPException(404, "Semester not found")
+    return build_semester_summary(sem)
+
+
+@sync_router.get("/semesters/{semester_id}/subjects/", response_model=list[schemas.SubjectOut])
+def list_subjects(semester_id: int, db: Session = Depends(get_db)):
+    if db.get(models.Semester, semester_id) is None:
+        raise HTTPException(404, "Semester not found")
+    return db.query(models.Subject).filter(models.Subject.semester_id == semester_id).all()
+
+
+@sync_router.get("/subjects/{subject_id}/cie", response_model=schemas.CIERecordOut)
+def get_cie(subject_id: int, db: Session = Depends(get_db)):
+    rec = db.query(models.CIERecord).filter(models.CIERecord.subject_id == subject_id).first()
+    if not rec:
+        raise HTTPException(404, "CIE record not found")
+    return rec
+
+
+@sync_router.get("/subjects/{subject_id}/see", response_model=schemas.SEEMarkOut)
+def get_see(subject_id: int, db: Session = Depends(get_db)):
+    mark = db.query(models.SEEMark).filter(models.SEEMark.subject_id == subject_id).first()
+    if not mark:
+        raise HTTPException(404, "SEE mark not found")
+    return mark
+
+
+app.include_router(sync_router)
+
+
+# ── Load ──────────────────────────────────────────────────────────
+
+def random_path(rng: random.Random, students: int, subject_ids: int) -> str:
+    kind = rng.randrange(4)
+    if kind == 0:
+        return f"/semesters/{rng.randint(1, students)}/marks-summary"
+    if kind == 1:
+        return f"/semesters/{rng.randint(1, students)}/subjects/"
+    return f"/subjects/{rng.randint(1, subject_ids)}/{'cie' if kind == 2 else 'see'}"
+
+
+async def run_load(prefix: str, clients: int, requests: int, seconds: float, students: int, subject_ids: int) -> dict:
+    latencies, errors = [], [0]
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)   # 500s count as errors
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        async def client(i: int):
+            rng = random.Random(i)
+            for _ in range(requests):
+                if time.perf_counter() > deadline:
+                    break
+                t0 = time.perf_counter()
+                resp = await http.get(prefix + random_path(rng, students, subject_ids))
+                if resp.status_code != 200:
+                    errors[0] += 1
+                    continue
+                latencies.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        deadline = t0 + seconds
+        await asyncio.gather(*(client(i) for i in range(clients)))
+        wall = time.perf_counter() - t0
+    return {"latencies": sorted(latencies), "errors": errors[0], "wall": wall}
+
+
+def pct(values: list, p: float) -> float:
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] * 1e3 if values else float("nan")
+
+
+async def compare(args, subject_ids: int):
+    # short warm-up of both paths (connection pools, first-query compilation)
+    for prefix in ("/sync", ""):
+        await run_load(prefix, 20, 5, 10.0, args.students, subject_ids)
+    for name, prefix in (("sync", "/sync"), ("async", "")):
+        r = await run_load(prefix, args.clients, args.requests, args.seconds, args.students, subject_ids)
+        lat = r["latencies"]
+        print(f"{name:10s}{len(lat):>7d}{len(lat) / r['wall']:>8.0f}{r['errors']:>8d}{pct(lat, 50):>9.1f}{pct(lat, 90):>9.1f}"
+              f"{pct(lat, 99):>9.1f}{pct(lat, 100):>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=500, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--seconds", type=float, default=60.0, help="no new requests after this (per variant)")
+    parser.add_argument("--students", type=int, default=1000, help="seeded semesters (one per student)")
+    parser.add_argument("--subjects", type=int, default=9, help="subjects per semester")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)   # one INFO line per request otherwise
+    try:
+        subject_ids = seed(engine, args.students, args.subjects)
+        print(f"{args.clients} clients × up to {args.requests} requests in {args.seconds:.0f} s, "
+              f"{args.students} semesters × {args.subjects} subjects\n")
+        print(f"{'handlers':10s}{'done':>7s}{'req/s':>8s}{'errors':>8s}{'p50':>9s}{'p90':>9s}{'p99':>9s}{'max':>9s}   (ms)")
+        asyncio.run(compare(args, subject_ids))
+    finally:
+        engine.dispose()
+        shutil.rmtree(_TMP, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+bench/bench_course_catalog.py – Per-student subject copies vs the shared course catalog
+
+Builds a database in the pre-catalog layout (every enrollment carries its own code,
+name, type, credits and L-T-P), measures it, runs the real migration
+(migrations.subjects_to_courses) on a copy and measures again:
+
+  storage      file size after VACUUM, and pages of subjects / courses with their indexes
+  summary      marks-summary rows of one semester (subjects + course + CIE + SEE)
+  transcript   every subject of one student by USN (academic_analyzer get_db_data)
+  correction   changing one course's credits for the whole scheme
+
+    python bench/bench_course_catalog.py --students 3000 --subjects 9 --semesters 4
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+import models  # registers the tables on Base
+from database import Base
+from migrations import subjects_to_courses
+
+LEGACY_SUBJECTS = """
+CREATE TABLE subjects (
+    id INTEGER PRIMARY KEY, semester_id INTEGER NOT NULL REFERENCES semesters (id) ON DELETE CASCADE,
+    subject_code VARCHAR(20) NOT NULL, subject_name VARCHAR(200) NOT NULL,
+    subject_type VARCHAR(4) NOT NULL, credits FLOAT NOT NULL, ltp_hours VARCHAR(20),
+    is_mandatory BOOLEAN NOT NULL, option_group VARCHAR(30), is_chosen BOOLEAN NOT NULL,
+    created_at DATETIME, updated_at DATETIME,
+    CONSTRAINT uq_sem_subject UNIQUE (semester_id, subject_code)
+)
+"""
+TYPES = ("PCC", "IPCC", "PCCL", "ESC", "AEC", "MC")
+
+SUMMARY = {
+    "legacy": """SELECT s.id, s.subject_code, s.subject_name, s.subject_type, s.credits, c.final_cie, m.reduced_scored
+                 FROM subjects s LEFT JOIN cie_records c ON c.subject_id = s.id
+                 LEFT JOIN see_marks m ON m.subject_id = s.id WHERE s.semester_id = ?""",
+    "catalog": """SELECT s.id, co.subject_code, co.subject_name, co.subject_type, co.credits, c.final_cie, m.reduced_scored
+                  FROM subjects s JOIN courses co ON co.id = s.course_id
+                  LEFT JOIN cie_records c ON c.subject_id = s.id
+                  LEFT JOIN see_marks m ON m.subject_id = s.id WHERE s.semester_id = ?""",
+}
+TRANSCRIPT = {
+    "legacy": """SELECT s.subject_name, s.credits, COALESCE(c.final_cie, 0), COALESCE(m.reduced_scored, 0)
+                 FROM students st JOIN semesters sem ON sem.student_id = st.id
+                 JOIN subjects s ON s.semester_id = sem.id
+                 LEFT JOIN cie_records c ON c.subject_id = s.id LEFT JOIN see_marks m ON m.subject_id = s.id
+                 WHERE st.usn = ?""",
+    "catalog": """SELECT co.subject_name, co.credits, COALESCE(c.final_cie, 0), COALESCE(m.reduced_scored, 0)
+                  FROM students st JOIN semesters sem ON sem.student_id = st.id
+                  JOIN subjects s ON s.semester_id = sem.id JOIN courses co ON co.id = s.course_id
+                  LEFT JOIN cie_records c ON c.subject_id = s.id LEFT JOIN see_marks m ON m.subject_id = s.id
+                  WHERE st.usn = ?""",
+}
+CORRECTION = {
+    "legacy": """UPDATE subjects SET credits = credits + 1 WHERE subject_code = ? AND semester_id IN (
+                     SELECT sem.id FROM semesters sem JOIN students st ON st.id = sem.student_id
+                     WHERE st.scheme = '2024')""",
+    "catalog": "UPDATE courses SET credits = credits + 1 WHERE scheme = '2024' AND subject_code = ?",
+}
+
+
+def build_legacy(path: str, students: int, subjects: int, semesters: int, seed: int = 0):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE subjects"))
+        conn.execute(text(LEGACY_SUBJECTS))
+    engine.dispose()
+
+    rng = random.Random(seed)
+    catalog = {
+        (n, k): (f"BCS{n}{k:02d}", f"Course {n}.{k} – " + "Engineering " * rng.randint(1, 3),
+                 TYPES[k % len(TYPES)], float(rng.choice((1, 2, 3, 4))), "3-0-2")
+        for n in range(1, semesters + 1) for k in range(subjects)
+    }
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany("INSERT INTO students (id, name, usn, branch, scheme, created_at) "
+                         "VALUES (?, ?, ?, 'CSE', '2024', '2025-01-01')",
+                         [(i, f"Student {i}", f"1RN24CS{i:05d}") for i in range(1, students + 1)])
+        sem_rows, subj_rows, cie_rows, see_rows = [], [], [], []
+        sem_id = subj_id = 0
+        for st in range(1, students + 1):
+            for n in range(1, semesters + 1):
+                sem_id += 1
+                sem_rows.append((sem_id, st, n, "2025-26"))
+                for k in range(subjects):
+                    subj_id += 1
+                    code, name, stype, credits, ltp = catalog[(n, k)]
+                    subj_rows.append((subj_id, sem_id, code, name, stype, credits, ltp, stype == "MC"))
+                    final = round(rng.uniform(10, 50), 2)
+                    cie_rows.append((subj_id, final, final < 20))
+                    see_rows.append((subj_id, rng.randint(0, 100) / 2))
+        conn.executemany("INSERT INTO semesters (id, student_id, semester_number, academic_year) VALUES (?, ?, ?, ?)",
+                         sem_rows)
+        conn.executemany("INSERT INTO subjects (id, semester_id, subject_code, subject_name, subject_type, credits, "
+                         "ltp_hours, is_mandatory, is_chosen, created_at, updated_at) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, '2025-01-01', '2025-01-01')", subj_rows)
+        conn.executemany("INSERT INTO cie_records (subject_id, final_cie, is_detained) VALUES (?, ?, ?)", cie_rows)
+        conn.executemany("INSERT INTO see_marks (subject_id, reduced_scored, is_absent, is_detained) "
+                         "VALUES (?, ?, 0, 0)", see_rows)
+    conn.execute("VACUUM")
+    conn.close()
+    return sem_id, [c[0] for c in catalog.values()]
+
+
+def storage(path: str) -> dict:
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    out = {"file": os.path.getsize(path)}
+    try:
+        for table in ("subjects", "courses"):
+            names = [table] + [r[0] for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table,))]
+            out[table] = conn.execute(
+                f"SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN ({','.join('?' * len(names))})",
+                names).fetchone()[0]
+    except sqlite3.OperationalError:   # SQLite built without the dbstat table
+        pass
+    conn.close()
+    return out
+
+
+def time_queries(path: str, layout: str, semesters_total: int, students: int, codes: list, n: int) -> dict:
+    conn = sqlite3.connect(path)
+    rng = random.Random(1)
+    out = {}
+    for name, sql, arg in (
+        ("summary", SUMMARY[layout], lambda: rng.randint(1, semesters_total)),
+        ("transcript", TRANSCRIPT[layout], lambda: f"1RN24CS{rng.randint(1, students):05d}"),
+    ):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            conn.execute(sql, (arg(),)).fetchall()
+        out[name] = (time.perf_counter() - t0) / n * 1e6
+    t0 = time.perf_counter()
+    touched = conn.execute(CORRECTION[layout], (codes[0],)).rowcount
+    conn.commit()
+    out["correction"] = (time.perf_counter() - t0) * 1e3
+    out["rows_touched"] = touched
+    conn.close()
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=3000)
+    parser.add_argument("--subjects", type=int, default=9, help="subjects per semester")
+    parser.add_argument("--semesters", type=int, default=4, help="semesters per student")
+    parser.add_argument("--queries", type=int, default=2000, help="timed reads per query")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="bench-catalog-")
+    try:
+        legacy, catalog = os.path.join(tmp, "legacy.db"), os.path.join(tmp, "catalog.db")
+        t0 = time.perf_counter()
+        semesters_total, codes = build_legacy(legacy, args.students, args.subjects, args.semesters)
+        print(f"{args.students} students × {args.semesters} semesters × {args.subjects} subjects "
+              f"= {semesters_total * args.subjects} enrollments (built in {time.perf_counter() - t0:.1f} s)")
+        shutil.copy(legacy, catalog)
+        engine = create_engine(f"sqlite:///{catalog}")
+        t0 = time.perf_counter()
+        subjects_to_courses(engine)
+        engine.dispose()
+        print(f"migration: {time.perf_counter() - t0:.2f} s\n")
+
+        sizes = {"legacy": storage(legacy), "catalog": storage(catalog)}
+        timings = {layout: time_queries(path, layout, semesters_total, args.students, codes, args.queries)
+                   for layout, path in (("legacy", legacy), ("catalog", catalog))}
+
+        mib = lambda b: f"{b / 2**20:.2f} MiB"
+        print(f"{'':28s}{'per-student copies':>20s}{'course catalog':>18s}")
+        print(f"{'database file':28s}{mib(sizes['legacy']['file']):>20s}{mib(sizes['catalog']['file']):>18s}")
+        if "subjects" in sizes["legacy"]:
+            for layout in sizes:
+                sizes[layout]["subject data"] = sizes[layout]["subjects"] + sizes[layout].get("courses", 0)
+            print(f"{'subjects + courses (+idx)':28s}{mib(sizes['legacy']['subject data']):>20s}"
+                  f"{mib(sizes['catalog']['subject data']):>18s}")
+        for key, label in (("summary", "summary by semester (µs)"), ("transcript", "transcript by USN (µs)")):
+            print(f"{label:28s}{timings['legacy'][key]:>20.1f}{timings['catalog'][key]:>18.1f}")
+        print(f"{'credits correction (ms)':28s}{timings['legacy']['correction']:>20.2f}"
+              f"{timings['catalog']['correction']:>18.2f}")
+        print(f"{'  rows rewritten':28s}{timings['legacy']['rows_touched']:>20d}{timings['catalog']['rows_touched']:>18d}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
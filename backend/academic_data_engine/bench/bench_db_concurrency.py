@@ -0,0 +1,196 @@
+"""
+bench/bench_db_concurrency.py – Mixed read/write throughput: SQLite rollback journal vs WAL vs PostgreSQL
+
+Seeds a cohort (students × subjects with CIE and SEE marks), then runs --threads
+workers for --seconds against each backend. Every operation is either a marks-summary
+read of one semester or a mark entry (CIE + SEE update of one subject, one transaction);
+--write-ratio sets the mix. Engines are built with database.engine_kwargs() and
+apply_sqlite_pragmas(), i.e. the settings the server uses:
+
+  sqlite-journal   SQLite with the default rollback journal (no pragmas)
+  sqlite-wal       SQLite with database.SQLITE_PRAGMAS (WAL, synchronous=NORMAL, busy_timeout …)
+  postgresql       only with --postgres URL; tables live in a scratch schema that is dropped afterwards
+
+    python bench/bench_db_concurrency.py --threads 16 --seconds 10 --write-ratio 0.2
+    python bench/bench_db_concurrency.py --postgres postgresql://user:pw@localhost/scratch
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+import models
+from database import Base, apply_sqlite_pragmas, engine_kwargs
+
+PG_SCHEMA = "bench_concurrency"
+
+SUMMARY = text("""
+    SELECT s.id, co.subject_code, co.credits, c.final_cie, c.is_detained, m.reduced_scored
+    FROM subjects s JOIN courses co ON co.id = s.course_id
+    LEFT JOIN cie_records c ON c.subject_id = s.id
+    LEFT JOIN see_marks m ON m.subject_id = s.id
+    WHERE s.semester_id = :sem
+""")
+CIE_ENTRY = text("UPDATE cie_records SET cce_marks = :cce, final_cie = :final, is_detained = :detained "
+                 "WHERE subject_id = :subj")
+SEE_ENTRY = text("UPDATE see_marks SET raw_scored = :raw, reduced_scored = :raw / 2 WHERE subject_id = :subj")
+
+
+def seed(engine, students: int, subjects: int) -> int:
+    """students semesters of `subjects` subjects each; returns the number of subjects."""
+    Base.metadata.create_all(engine)
+    rng = random.Random(0)
+    subject_ids = students * subjects
+    with engine.begin() as conn:
+        conn.execute(models.Student.__table__.insert(), [
+            {"id": i, "name": f"Student {i}", "usn": f"1RN24CS{i:05d}", "branch": "CSE", "scheme": "2024"}
+            for i in range(1, students + 1)])
+        conn.execute(models.Semester.__table__.insert(), [
+            {"id": i, "student_id": i, "semester_number": 3, "academic_year": "2025-26"}
+            for i in range(1, students + 1)])
+        conn.execute(models.Course.__table__.insert(), [
+            {"id": k, "scheme": "2024", "subject_code": f"BCS3{k:02d}", "subject_name": f"Course {k}",
+             "subject_type": models.SubjectType.pcc, "credits": 3.0, "is_mandatory": False}
+            for k in range(1, subjects + 1)])
+        conn.execute(models.Subject.__table__.insert(), [
+            {"id": (st - 1) * subjects + k, "semester_id": st, "course_id": k, "is_chosen": True}
+            for st in range(1, students + 1) for k in range(1, subjects + 1)])
+        conn.execute(models.CIERecord.__table__.insert(), [
+            {"subject_id": i, "ia_test1_raw": 40.0, "ia_test2_raw": 30.0, "ia_scaled": 21.0,
+             "cce_marks": 15.0, "final_cie": 36.0, "is_detained": False}
+            for i in range(1, subject_ids + 1)])
+        conn.execute(models.SEEMark.__table__.insert(), [
+            {"subject_id": i, "raw_scored": float(rng.randint(0, 100)), "reduced_scored": 35.0,
+             "is_absent": False, "is_detained": False}
+            for i in range(1, subject_ids + 1)])
+    return subject_ids
+
+
+def run_load(engine, students: int, subject_ids: int, threads: int, seconds: float, write_ratio: float) -> dict:
+    latencies = {"read": [], "write": []}
+    errors = [0]
+    lock = threading.Lock()
+    start = threading.Barrier(threads + 1)
+    deadline = [0.0]
+
+    def worker(seed_: int):
+        rng = random.Random(seed_)
+        mine = {"read": [], "write": []}
+        failed = 0
+        start.wait()
+        while time.perf_counter() < deadline[0]:
+            kind = "write" if rng.random() < write_ratio else "read"
+            t0 = time.perf_counter()
+            try:
+                if kind == "read":
+                    with engine.connect() as conn:
+                        conn.execute(SUMMARY, {"sem": rng.randint(1, students)}).fetchall()
+                else:
+                    subj, cce = rng.randint(1, subject_ids), float(rng.randint(0, 20))
+                    with engine.begin() as conn:
+                        conn.execute(CIE_ENTRY, {"subj": subj, "cce": cce, "final": 21.0 + cce,
+                                                 "detained": 21.0 + cce < 20})
+                        conn.execute(SEE_ENTRY, {"subj": subj, "raw": float(rng.randint(0, 100))})
+            except OperationalError:   # "database is locked" once busy_timeout runs out
+                failed += 1
+                continue
+            mine[kind].append(time.perf_counter() - t0)
+        with lock:
+            for k in latencies:
+                latencies[k].extend(mine[k])
+            errors[0] += failed
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    deadline[0] = time.perf_counter() + seconds
+    start.wait()
+    for t in pool:
+        t.join()
+    return {"latencies": latencies, "errors": errors[0], "seconds": seconds}
+
+
+def pct(values: list, p: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] * 1e3
+
+
+def sqlite_engine(path: str, wal: bool, threads: int):
+    url = f"sqlite:///{path}"
+    # the default SQLite pool (5 + 10 overflow) would otherwise cap the worker threads
+    engine = create_engine(url, pool_size=threads, max_overflow=0, **engine_kwargs(url=url))
+    if wal:
+        apply_sqlite_pragmas(engine)
+    return engine
+
+
+def postgres_engine(url: str):
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    admin = create_engine(url)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {PG_SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {PG_SCHEMA}"))
+    admin.dispose()
+    return create_engine(url, connect_args={"options": f"-csearch_path={PG_SCHEMA}"}, **engine_kwargs(url=url))
+
+
+def drop_postgres_schema(url: str):
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    admin = create_engine(url)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {PG_SCHEMA} CASCADE"))
+    admin.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--subjects", type=int, default=9, help="subjects per semester")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent clients (e.g. faculty entering marks)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="load duration per backend")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="share of operations that are mark entries")
+    parser.add_argument("--postgres", metavar="URL", help="also run against this PostgreSQL database")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="bench-concurrency-")
+    backends = [("sqlite-journal", lambda: sqlite_engine(os.path.join(tmp, "journal.db"), False, args.threads)),
+                ("sqlite-wal", lambda: sqlite_engine(os.path.join(tmp, "wal.db"), True, args.threads))]
+    if args.postgres:
+        backends.append(("postgresql", lambda: postgres_engine(args.postgres)))
+
+    print(f"{args.students} semesters × {args.subjects} subjects, {args.threads} threads, "
+          f"{args.write_ratio:.0%} writes, {args.seconds:.0f} s per backend\n")
+    print(f"{'backend':16s}{'ops/s':>9s}{'reads/s':>9s}{'writes/s':>9s}{'errors':>8s}"
+          f"{'read p50':>10s}{'p95':>8s}{'p99':>8s}{'write p50':>11s}{'p95':>8s}{'p99':>8s}   (ms)")
+    try:
+        for name, make in backends:
+            engine = make()
+            try:
+                subject_ids = seed(engine, args.students, args.subjects)
+                r = run_load(engine, args.students, subject_ids, args.threads, args.seconds, args.write_ratio)
+            finally:
+                engine.dispose()
+            reads, writes = r["latencies"]["read"], r["latencies"]["write"]
+            print(f"{name:16s}{(len(reads) + len(writes)) / r['seconds']:>9.0f}{len(reads) / r['seconds']:>9.0f}"
+                  f"{len(writes) / r['seconds']:>9.0f}{r['errors']:>8d}"
+                  f"{pct(reads, 50):>10.2f}{pct(reads, 95):>8.2f}{pct(reads, 99):>8.2f}"
+                  f"{pct(writes, 50):>11.2f}{pct(writes, 95):>8.2f}{pct(writes, 99):>8.2f}")
+    finally:
+        if args.postgres:
+            drop_postgres_schema(args.postgres)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+bench/bench_multi_semester.py – Table extraction over large multi-semester handbooks: page pre-filter and page workers
+
+Generates scheme books of --semesters semesters. Each semester has a heading page with its
+bordered subject table, then --pages-per-semester pages of course detail: prose, a CO–PO
+mapping grid (ruled, no subject header words) and an assessment table (ruled, with
+"Sl. No" / "Subject" headers, so it passes the pre-filter and must be table-detected).
+Both entry points run in a fresh process per mode:
+
+  by-semester   extract_subjects_by_semester (the whole book: POST /upload-syllabus/all-semesters)
+  first-table   extract_subjects_from_pdf (stops at the first subject table)
+
+  no-filter           every page table-detected in this process (the behaviour before the pre-filter)
+  no-filter+Nw        every page, fanned out to N page workers
+  filter              pages failing _could_hold_subject_table() skipped (PDF_PAGE_WORKERS=0, default)
+  filter+Nw           pre-filter, remaining pages fanned out (PDF_PAGE_WORKERS=N)
+
+Rows are checked against the generated subjects, so a faster mode that loses tables shows up.
+
+    pip install fpdf2
+    python bench/bench_multi_semester.py --docs 3 --semesters 8 --pages-per-semester 25 --page-workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROSE = ("Course outcomes, teaching-learning process and assessment details are listed "
+         "for every course of the semester. ") * 12
+ASSESSMENT = [("1", "Internal Assessment Test 1", "25"), ("2", "Internal Assessment Test 2", "25"),
+              ("3", "Comprehensive Continuous Evaluation", "50"), ("4", "Semester End Examination", "100")]
+
+
+# ── Corpus ────────────────────────────────────────────────────────
+
+def expected_subjects(semesters: int) -> set:
+    return {(f"BCS{n}0{k}", n) for n in range(1, semesters + 1) for k in range(1, 7)}
+
+
+def build_handbook(path: str, semesters: int, pages_per_semester: int):
+    from fpdf import FPDF
+    pdf = FPDF()
+    for n in range(1, semesters + 1):
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, f"Semester {n} - Scheme of Teaching and Examination", new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", "B", 10)
+        for w, h in zip((30, 90, 20, 30), ("Course Code", "Course Title", "Credits", "L-T-P")):
+            pdf.cell(w, 8, h, border=1)
+        pdf.ln()
+        pdf.set_font("Helvetica", "", 9)
+        for code, _ in sorted(c for c in expected_subjects(semesters) if c[1] == n):
+            for w, v in zip((30, 90, 20, 30), (code, f"Course {code} Fundamentals", "3", "3-0-2")):
+                pdf.cell(w, 7, v, border=1)
+            pdf.ln()
+
+        for p in range(pages_per_semester):
+            pdf.add_page()
+            pdf.set_font("Helvetica", "", 9)
+            if p % 5 == 3:      # CO-PO mapping: ruled, but no subject header words
+                for row in [["CO"] + [f"PO{i}" for i in range(1, 13)]] + [
+                        [f"CO{c}"] + [str((c + i) % 4) for i in range(12)] for c in range(1, 6)]:
+                    for v in row:
+                        pdf.cell(14, 7, v, border=1)
+                    pdf.ln()
+            elif p % 5 == 4:    # assessment pattern: passes the pre-filter, not a subject table
+                for row in [("Sl. No", "Subject", "Marks")] + ASSESSMENT:
+                    for w, v in zip((20, 110, 30), row):
+                        pdf.cell(w, 7, v, border=1)
+                    pdf.ln()
+            else:
+                pdf.multi_cell(0, 5, f"Semester {n}, page {p + 1}. " + PROSE)
+    pdf.output(path)
+
+
+# ── Measurement (child process) ───────────────────────────────────
+
+def _run_mode(prefilter: bool, page_workers: int, paths: list, queue):
+    from pdf_engine import structure_extractor as se
+    se.PAGE_WORKERS = page_workers
+    if not prefilter:
+        se._could_hold_subject_table = lambda doc, pg_num: True
+
+    out = {}
+    for name, fn in (("by-semester", se.extract_subjects_by_semester), ("first-table", se.extract_subjects_from_pdf)):
+        found = []
+        t0 = time.perf_counter()
+        for path in paths:
+            rows, _ = fn(path)
+            found.append({(r["subject_code"], r.get("semester_number")) for r in rows})
+        out[name] = (time.perf_counter() - t0, found)
+    queue.put(out)
+
+
+def measure(prefilter: bool, page_workers: int, paths: list) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_mode, args=(prefilter, page_workers, paths, queue))
+    proc.start()
+    out = queue.get()
+    proc.join()
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=3, help="handbooks (identical layout)")
+    parser.add_argument("--semesters", type=int, default=8)
+    parser.add_argument("--pages-per-semester", type=int, default=25, help="course detail pages after each table")
+    parser.add_argument("--page-workers", type=int, default=4, help="PDF_PAGE_WORKERS for the +Nw modes")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="bench-multisem-")
+    try:
+        paths = []
+        for i in range(args.docs):
+            paths.append(os.path.join(tmp, f"handbook-{i}.pdf"))
+            build_handbook(paths[-1], args.semesters, args.pages_per_semester)
+        expected = expected_subjects(args.semesters)
+        first = {c for c in expected if c[1] == 1}
+        pages = args.semesters * (args.pages_per_semester + 1)
+        print(f"{args.docs} handbooks × {pages} pages ({args.semesters} semesters, "
+              f"{len(expected)} subjects each)\n")
+        print(f"{'mode':16s}{'by-semester s/doc':>19s}{'rows ok':>9s}{'first-table s/doc':>19s}{'rows ok':>9s}")
+
+        w = args.page_workers
+        for mode, prefilter, workers in (("no-filter", False, 0), (f"no-filter+{w}w", False, w),
+                                         ("filter", True, 0), (f"filter+{w}w", True, w)):
+            out = measure(prefilter, workers, paths)
+            (by_wall, by_found), (ft_wall, ft_found) = out["by-semester"], out["first-table"]
+            by_ok = all(f == expected for f in by_found)
+            # first-table rows carry no semester_number: compare the codes of semester 1
+            ft_ok = all({c for c, _ in f} == {c for c, _ in first} for f in ft_found)
+            print(f"{mode:16s}{by_wall / args.docs:>19.2f}{'yes' if by_ok else 'NO':>9s}"
+                  f"{ft_wall / args.docs:>19.2f}{'yes' if ft_ok else 'NO':>9s}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+bench/bench_pdf_extraction.py – Syllabus extraction over a generated corpus, per strategy
+
+The corpus is built with the repository's gen_pdf.py (bordered subject table) plus two
+variants of the same subjects: the table behind N pages of prose, and the rows as
+plain text without ruling (which only the text strategies can read). Each strategy runs
+over the whole corpus in a fresh process, so the reported peak RSS is its own:
+
+  tables   _extract_via_tables      text   _extract_via_text
+  pymupdf  _extract_via_fitz_blocks all    extract_subjects_from_pdf (the real cascade)
+
+    pip install fpdf2
+    python bench/bench_pdf_extraction.py --docs 20 --filler-pages 40
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(os.path.dirname(ENGINE_DIR))
+sys.path.insert(0, ENGINE_DIR)
+
+STRATEGIES = ("tables", "text", "pymupdf", "all")
+PLAIN_ROWS = [
+    ("BCS301", "Discrete Mathematical Structures", "3"),
+    ("BCS302", "Analog and Digital Electronics", "4"),
+    ("BCS303", "Data Structures and Applications", "3"),
+    ("BCS304", "Computer Organization and Architecture", "3"),
+    ("BCSL307", "Data Structures Laboratory", "2"),
+    ("BUHV309", "Universal Human Values", "1"),
+]
+PROSE = ("Course outcomes, teaching-learning process and assessment details are listed "
+         "for every course of the semester. ") * 12
+
+
+# ── Corpus ────────────────────────────────────────────────────────
+
+def _prose_pdf(path: str, pages: int):
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.set_font("Helvetica", "", 10)
+    for i in range(pages):
+        pdf.add_page()
+        pdf.multi_cell(0, 5, f"Page {i + 1}. " + PROSE)
+    pdf.output(path)
+
+
+def _plain_pdf(path: str):
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Courier", "", 10)
+    for code, name, credits in PLAIN_ROWS:
+        pdf.cell(0, 6, f"{code:<10}  {name:<42}  {credits}", new_x="LMARGIN", new_y="NEXT")
+    pdf.output(path)
+
+
+def build_corpus(out_dir: str, docs: int, filler_pages: int) -> dict:
+    """{kind: [paths]} with docs PDFs of each kind."""
+    sys.path.insert(0, REPO_ROOT)
+    import fitz
+    import gen_pdf
+
+    corpus = {"table": [], "long": [], "plain": []}
+    prose = os.path.join(out_dir, "prose.pdf")
+    _prose_pdf(prose, filler_pages)
+    for i in range(docs):
+        table = os.path.join(out_dir, f"table-{i}.pdf")
+        with contextlib.redirect_stdout(io.StringIO()):   # gen_pdf prints every file it writes
+            gen_pdf.create_sample_syllabus(table)
+        corpus["table"].append(table)
+
+        long_path = os.path.join(out_dir, f"long-{i}.pdf")
+        with fitz.open(prose) as merged, fitz.open(table) as tail:
+            merged.insert_pdf(tail)
+            merged.save(long_path)
+        corpus["long"].append(long_path)
+
+        plain = os.path.join(out_dir, f"plain-{i}.pdf")
+        _plain_pdf(plain)
+        corpus["plain"].append(plain)
+    return corpus
+
+
+# ── Measurement (child process) ───────────────────────────────────
+
+def _reset_peak() -> bool:
+    """Restart the peak-RSS counter (Linux); False where that is not possible."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mib() -> float:
+    try:
+        with open("/proc/self/status") as f:   # VmHWM: peak RSS, restartable, not inherited across exec
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024   # bytes on macOS, KiB on Linux
+
+
+def _current_rss_mib() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return _peak_rss_mib()
+
+
+def _run_strategy(strategy: str, corpus: dict, queue):
+    import fitz, pdfplumber  # noqa: F401 – loaded before the baseline, as in a warm worker
+    from pdf_engine import structure_extractor as se
+    from pdf_engine.document import PdfDocument
+    fn = {"tables": se._extract_via_tables, "text": se._extract_via_text,
+          "pymupdf": se._extract_via_fitz_blocks}.get(strategy)
+    baseline = _current_rss_mib() if _reset_peak() else _peak_rss_mib()
+
+    result = {}
+    for kind, paths in corpus.items():
+        found = 0
+        t0 = time.perf_counter()
+        for path in paths:
+            if fn is None:
+                rows, _ = se.extract_subjects_from_pdf(path)
+            else:
+                with PdfDocument(path) as doc:
+                    rows, _ = fn(doc)
+            found += len(rows)
+        result[kind] = (time.perf_counter() - t0, found / len(paths))
+    queue.put((result, baseline, _peak_rss_mib()))
+
+
+def measure(strategy: str, corpus: dict):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_strategy, args=(strategy, corpus, queue))
+    proc.start()
+    out = queue.get()
+    proc.join()
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=20, help="PDFs of each kind")
+    parser.add_argument("--filler-pages", type=int, default=40, help="prose pages before the table in 'long' PDFs")
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=list(STRATEGIES))
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="bench-pdf-")
+    try:
+        corpus = build_corpus(tmp, args.docs, args.filler_pages)
+        print(f"corpus: {args.docs} × table (1 page), long ({args.filler_pages + 1} pages), plain (1 page)\n")
+        print(f"{'strategy':9s} {'kind':6s} {'wall s':>8s} {'ms/doc':>8s} {'rows/doc':>9s} "
+              f"{'peak RSS MiB':>13s} {'(+ over imports)':>17s}")
+        print("(peak RSS covers all three kinds: one process per strategy)")
+        for strategy in args.strategies:
+            result, baseline, peak = measure(strategy, corpus)
+            for kind, (wall, rows) in result.items():
+                print(f"{strategy:9s} {kind:6s} {wall:8.2f} {wall / args.docs * 1e3:8.1f} {rows:9.1f} "
+                      f"{peak:13.1f} {peak - baseline:+17.1f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
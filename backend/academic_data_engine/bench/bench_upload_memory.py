@@ -0,0 +1,152 @@
+"""
+bench/bench_upload_memory.py – Server memory under concurrent syllabus uploads: streamed to disk vs read whole
+
+Sends --uploads concurrent multipart uploads of a --mb MB PDF, plus --oversize bodies
+over MAX_PDF_MB, to one of two handlers of the same app and reports the server's peak
+RSS above its idle baseline:
+
+  buffered    the previous handler: `await file.read()`, size check afterwards, the PDF
+              handed to the pdf_engine as bytes (io.BytesIO / stream copies)
+  streaming   POST /upload-syllabus/{id}: UploadSizeLimit + uploads.staged_pdf(), opened by path
+
+Each mode runs in a fresh process (in-process httpx ASGITransport, client bodies streamed
+from disk). Extraction is replaced by opening the document with both backends, so the
+numbers cover upload handling, not table parsing; the bytes the buffered handler also
+pickled to the extraction worker are not counted.
+
+    python bench/bench_upload_memory.py --uploads 16 --mb 8 --oversize 4
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ENGINE_DIR)
+
+from bench.bench_pdf_extraction import _current_rss_mib, _peak_rss_mib, _reset_peak
+
+MODES = ("buffered", "streaming")
+
+
+# ── Corpus ────────────────────────────────────────────────────────
+
+def build_pdf(path: str, mb: float):
+    """A valid PDF of about mb MB: pages of incompressible noise images."""
+    import fitz
+    import numpy as np
+    rng = np.random.default_rng(0)
+    doc = fitz.open()
+    while True:
+        pix = fitz.Pixmap(fitz.csRGB, 512, 512, rng.integers(0, 256, 512 * 512 * 3, dtype=np.uint8).tobytes(), 0)
+        doc.new_page().insert_image(fitz.Rect(36, 36, 559, 559), stream=pix.tobytes("png"))
+        if len(doc.tobytes()) >= mb * 2**20:
+            break
+    doc.save(path)
+    doc.close()
+
+
+# ── Server + load (child process) ─────────────────────────────────
+
+def _run_mode(mode: str, pdf: str, big: str, uploads: int, oversize: int, tmp: str, queue):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, f'{mode}.db')}"
+    os.environ["RESPONSE_CACHE_BACKEND"] = "off"
+    os.environ["SYLLABUS_JOB_DIR"] = os.path.join(tmp, "job_files")
+    os.environ["UPLOAD_TMP_DIR"] = tmp
+    import fitz, pdfplumber, httpx  # noqa: F401 – loaded before the baseline, as in a warm server
+    from fastapi import File, HTTPException, UploadFile
+    from main import app
+    import models
+    from database import SessionLocal
+    from pdf_engine.document import PdfDocument
+    from services import extraction_cache, extraction_pool, module_service, uploads as upload_service
+
+    async def open_only(fn, source):
+        with PdfDocument(source) as doc:
+            pages = doc.page_count + (len(doc.fitz) if doc.fitz else 0)
+        return [], [f"{pages} pages"]
+
+    extraction_pool.run = open_only
+    extraction_cache.get = lambda db, key: None   # identical uploads: every one is opened, as in buffered
+    module_service.populate_modules = lambda *args: None
+
+    @app.post("/bench/buffered-upload/{semester_id}", status_code=201)
+    async def buffered_upload(semester_id: int, file: UploadFile = File(...)):
+        file_bytes = await file.read()
+        if len(file_bytes) > upload_service.MAX_PDF_BYTES:
+            raise HTTPException(status_code=413, detail="PDF exceeds limit.")
+        await extraction_pool.run(None, file_bytes)
+        return {"semester_id": semester_id}
+
+    db = SessionLocal()
+    student = models.Student(name="Bench", usn="1RN24CS001", branch="CSE", scheme="2024")
+    sem = models.Semester(student=student, semester_number=3, academic_year="2025-26")
+    db.add_all([student, sem])
+    db.commit()
+    url = (f"/bench/buffered-upload/{sem.id}" if mode == "buffered" else f"/upload-syllabus/{sem.id}")
+    db.close()
+
+    async def upload(http, path):
+        with open(path, "rb") as fh:
+            resp = await http.post(url, files={"file": ("syllabus.pdf", fh, "application/pdf")})
+        return resp.status_code
+
+    async def load():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+            return await asyncio.gather(*([upload(http, pdf) for _ in range(uploads)] +
+                                          [upload(http, big) for _ in range(oversize)]))
+
+    logging.getLogger().setLevel(logging.WARNING)   # httpx and the app log every upload otherwise
+    baseline = _current_rss_mib() if _reset_peak() else _peak_rss_mib()
+    t0 = time.perf_counter()
+    statuses = asyncio.run(load())
+    wall = time.perf_counter() - t0
+    queue.put((baseline, _peak_rss_mib(), wall, {s: statuses.count(s) for s in sorted(set(statuses))}))
+
+
+def measure(mode: str, pdf: str, big: str, uploads: int, oversize: int, tmp: str):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_mode, args=(mode, pdf, big, uploads, oversize, tmp, queue))
+    proc.start()
+    out = queue.get()
+    proc.join()
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=16, help="concurrent uploads of an accepted PDF")
+    parser.add_argument("--mb", type=float, default=8.0, help="size of the accepted PDF")
+    parser.add_argument("--oversize", type=int, default=4, help="concurrent uploads over MAX_PDF_MB")
+    parser.add_argument("--oversize-mb", type=float, default=60.0)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="bench-upload-")
+    try:
+        pdf, big = os.path.join(tmp, "syllabus.pdf"), os.path.join(tmp, "oversize.pdf")
+        build_pdf(pdf, args.mb)
+        with open(big, "wb") as out, open(pdf, "rb") as src:   # only its size matters: it must be refused
+            data = src.read()
+            while out.tell() < args.oversize_mb * 2**20:
+                out.write(data)
+        print(f"{args.uploads} × {os.path.getsize(pdf) / 2**20:.1f} MiB PDF + {args.oversize} × "
+              f"{os.path.getsize(big) / 2**20:.0f} MiB oversize, concurrently\n")
+        print(f"{'handler':10s}{'wall s':>8s}{'peak RSS MiB':>14s}{'(+ over idle)':>15s}   responses")
+        for mode in args.modes:
+            baseline, peak, wall, statuses = measure(mode, pdf, big, args.uploads, args.oversize, tmp)
+            print(f"{mode:10s}{wall:8.2f}{peak:14.1f}{peak - baseline:+15.1f}   "
+                  + ", ".join(f"{n}× {s}" for s, n in statuses.items()))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,88 @@
 """
 database.py – SQLAlchemy engine + session factory
+
+Configuration (environment):
+  DATABASE_URL             default sqlite:///./academic.db  (postgresql://… for team deployments)
+  ASYNC_DATABASE_URL       default derived from DATABASE_URL (sqlite+aiosqlite / postgresql+asyncpg)
+  SQLITE_BUSY_TIMEOUT_MS   default 5000   – how long a writer waits for the lock
+  SQLITE_CACHE_MB          default 64     – page cache per connection
+  SQLITE_MMAP_MB           default 256    – memory-mapped I/O window
+  DB_POOL_SIZE             default 10     – PostgreSQL only
+  DB_MAX_OVERFLOW          default 20     – PostgreSQL only
+  DB_POOL_TIMEOUT          default 30     – seconds to wait for a pooled connection
+  DB_POOL_RECYCLE          default 1800   – seconds before a connection is replaced
 """
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-DATABASE_URL = "sqlite:///./academic.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./academic.db")
+if DATABASE_URL.startswith("postgres://"):  # Heroku / Railway style URLs
+    DATABASE_URL = "postgresql://" + DATABASE_URL[len("postgres://"):]
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+
+def _async_url(url: str) -> str:
+    """Same database, async driver: sqlite → aiosqlite, postgresql → asyncpg."""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith("postgresql:"):
+        return "postgresql+asyncpg:" + url[len("postgresql:"):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+# WAL lets readers run alongside a writer; NORMAL sync is durable under WAL except on power loss.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_MB", "64")) * 1024,  # negative = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_MB", "256")) * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+def engine_kwargs(is_async: bool = False, url: str = DATABASE_URL) -> dict:
+    """create_engine() / create_async_engine() arguments for the backend of url (default: the configured one)."""
+    if url.startswith("sqlite"):
+        return {} if is_async else {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+    }
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
+
+def apply_sqlite_pragmas(sync_engine):
+    """Run SQLITE_PRAGMAS on every new DBAPI connection of a SQLite engine."""
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cur.execute(f"PRAGMA {name}={value}")
+        cur.close()
+
+
+engine = create_engine(DATABASE_URL, **engine_kwargs())
+if IS_SQLITE:
+    apply_sqlite_pragmas(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async path for hot read endpoints – handlers await the database instead of holding
+# one of the threadpool workers that sync handlers run in.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_kwargs(is_async=True))
+if IS_SQLITE:
+    apply_sqlite_pragmas(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -23,3 +93,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """FastAPI dependency – yields an AsyncSession (use from `async def` handlers)."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -8,8 +8,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
-from database import engine, Base
-from routers import student, semester, subjects, syllabus, marks, results
+from database import async_engine, engine, Base
+from migrations import run_migrations
+from routers import student, semester, subjects, syllabus, marks, results, search, cohort, admin
+from services import extraction_pool, job_queue, search_service, uploads
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,6 +21,8 @@ logger = logging.getLogger(__name__)
 
 # Create / migrate all tables on startup
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+search_service.ensure_module_index(engine)
 
 app = FastAPI(
     title="RNSIT Academic Data Engine",
@@ -28,6 +32,9 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# 413 for oversized syllabus uploads before their body is read
+app.add_middleware(uploads.UploadSizeLimit)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -35,6 +42,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.on_event("shutdown")
+async def _dispose_async_engine():
+    await async_engine.dispose()
+
+
+@app.on_event("startup")
+def _start_job_workers():
+    job_queue.start()
+
+
+@app.on_event("shutdown")
+def _stop_background_work():
+    job_queue.stop()
+    extraction_pool.shutdown()
+
+
 # Routers
 app.include_router(student.router)
 app.include_router(semester.router)
@@ -42,6 +66,9 @@ app.include_router(subjects.router)
 app.include_router(syllabus.router)
 app.include_router(marks.router)
 app.include_router(results.router)
+app.include_router(search.router)
+app.include_router(cohort.router)
+app.include_router(admin.router)
 
 # Serve frontend
 FRONTEND_DIR = os.path.join(os.path.dirname(__file__), "frontend")
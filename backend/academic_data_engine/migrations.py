@@ -0,0 +1,207 @@
+"""
+migrations.py – In-place upgrades of databases created by older versions
+
+Base.metadata.create_all() only creates missing tables, it never alters an existing
+one. run_migrations() is called at startup right after it; every migration inspects
+the live schema first, so on an up-to-date database each one is a no-op.
+"""
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+import models
+
+logger = logging.getLogger(__name__)
+
+
+# ── subjects → courses (catalog) + subjects (enrollments) ─────────
+
+_COPY_COURSES = """
+INSERT INTO courses (scheme, subject_code, subject_name, subject_type, credits,
+                     ltp_hours, is_mandatory, created_at, updated_at)
+SELECT st.scheme, s.subject_code, s.subject_name, s.subject_type, s.credits,
+       s.ltp_hours, s.is_mandatory, s.created_at, s.updated_at
+FROM subjects s
+JOIN semesters sem ON sem.id = s.semester_id
+JOIN students st ON st.id = sem.student_id
+WHERE s.id IN (
+    -- the newest copy of each (scheme, code) becomes the catalog entry
+    SELECT MAX(s2.id) FROM subjects s2
+    JOIN semesters sem2 ON sem2.id = s2.semester_id
+    JOIN students st2 ON st2.id = sem2.student_id
+    GROUP BY st2.scheme, s2.subject_code
+)
+ON CONFLICT (scheme, subject_code) DO NOTHING
+"""
+
+# (scheme, code) groups whose per-student copies disagree; only the newest copy is kept
+_DIVERGENT_COPIES = """
+SELECT st.scheme, s.subject_code, COUNT(*),
+       COUNT(DISTINCT s.subject_name), COUNT(DISTINCT s.subject_type), COUNT(DISTINCT s.credits),
+       COUNT(DISTINCT COALESCE(s.ltp_hours, '')), COUNT(DISTINCT s.is_mandatory)
+FROM subjects s
+JOIN semesters sem ON sem.id = s.semester_id
+JOIN students st ON st.id = sem.student_id
+GROUP BY st.scheme, s.subject_code
+HAVING COUNT(DISTINCT s.subject_name) > 1 OR COUNT(DISTINCT s.subject_type) > 1
+    OR COUNT(DISTINCT s.credits) > 1 OR COUNT(DISTINCT COALESCE(s.ltp_hours, '')) > 1
+    OR COUNT(DISTINCT s.is_mandatory) > 1
+ORDER BY st.scheme, s.subject_code
+"""
+_COPY_FIELDS = ("subject_name", "subject_type", "credits", "ltp_hours", "is_mandatory")
+MAX_DIVERGENT_LOGGED = 50
+
+_ENROLLMENT_SOURCE = """
+FROM subjects s
+JOIN semesters sem ON sem.id = s.semester_id
+JOIN students st ON st.id = sem.student_id
+JOIN courses c ON c.scheme = st.scheme AND c.subject_code = s.subject_code
+"""
+
+_MOVED_COLUMNS = ("subject_code", "subject_name", "subject_type", "credits", "ltp_hours", "is_mandatory")
+
+
+def _sqlite_subjects_to_courses(engine: Engine):
+    """SQLite cannot drop constrained columns: rebuild subjects, keeping every row id."""
+    table = models.Subject.__table__
+    create = str(CreateTable(table).compile(dialect=engine.dialect))
+    create = create.replace(f"CREATE TABLE {table.name} (", f"CREATE TABLE {table.name}_new (", 1)
+    statements = [
+        _COPY_COURSES,
+        create,
+        f"""INSERT INTO subjects_new (id, semester_id, course_id, option_group, is_chosen, created_at, updated_at)
+            SELECT s.id, s.semester_id, c.id, s.option_group, s.is_chosen, s.created_at, s.updated_at
+            {_ENROLLMENT_SOURCE}""",
+        "DROP TABLE subjects",
+        "ALTER TABLE subjects_new RENAME TO subjects",
+        *(str(CreateIndex(idx).compile(dialect=engine.dialect)) for idx in table.indexes),
+    ]
+
+    # Raw connection so the DDL runs inside one explicit transaction (pysqlite would
+    # otherwise autocommit it), with foreign keys off so DROP TABLE cascades nothing.
+    raw = engine.raw_connection()
+    dbapi_conn = raw.driver_connection
+    isolation = dbapi_conn.isolation_level
+    dbapi_conn.isolation_level = None
+    cur = raw.cursor()
+    try:
+        fk_on = cur.execute("PRAGMA foreign_keys").fetchone()[0]
+        cur.execute("PRAGMA foreign_keys=OFF")
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            before = cur.execute("SELECT COUNT(*) FROM subjects").fetchone()[0]
+            for stmt in statements:
+                cur.execute(stmt)
+            after = cur.execute("SELECT COUNT(*) FROM subjects").fetchone()[0]
+            cur.execute("COMMIT")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        finally:
+            if fk_on:
+                cur.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cur.close()
+        dbapi_conn.isolation_level = isolation
+        raw.close()
+    return before, after
+
+
+def _postgresql_subjects_to_courses(engine: Engine):
+    with engine.begin() as conn:
+        before = conn.execute(text("SELECT COUNT(*) FROM subjects")).scalar()
+        conn.execute(text(_COPY_COURSES))
+        conn.execute(text("ALTER TABLE subjects ADD COLUMN course_id INTEGER REFERENCES courses (id)"))
+        conn.execute(text("""
+            UPDATE subjects SET course_id = c.id
+            FROM semesters sem, students st, courses c
+            WHERE sem.id = subjects.semester_id AND st.id = sem.student_id
+              AND c.scheme = st.scheme AND c.subject_code = subjects.subject_code
+        """))
+        conn.execute(text("DELETE FROM subjects WHERE course_id IS NULL"))
+        conn.execute(text("ALTER TABLE subjects ALTER COLUMN course_id SET NOT NULL"))
+        conn.execute(text("ALTER TABLE subjects DROP CONSTRAINT IF EXISTS uq_sem_subject"))
+        conn.execute(text("ALTER TABLE subjects " + ", ".join(f"DROP COLUMN {c}" for c in _MOVED_COLUMNS)))
+        conn.execute(text("ALTER TABLE subjects ADD CONSTRAINT uq_sem_course UNIQUE (semester_id, course_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_subjects_course_id ON subjects (course_id)"))
+        after = conn.execute(text("SELECT COUNT(*) FROM subjects")).scalar()
+    return before, after
+
+
+def _warn_divergent_copies(engine: Engine):
+    """Log the courses whose per-student copies differ: the migration keeps only the newest."""
+    with engine.connect() as conn:
+        rows = conn.execute(text(_DIVERGENT_COPIES)).all()
+    for scheme, code, copies, *distinct in rows[:MAX_DIVERGENT_LOGGED]:
+        fields = ", ".join(f"{f} ({n} values)" for f, n in zip(_COPY_FIELDS, distinct) if n > 1)
+        logger.warning(f"Course {scheme} {code}: its {copies} per-student copies differ in {fields}; "
+                       f"the newest copy becomes the catalog entry – check it after the migration")
+    if len(rows) > MAX_DIVERGENT_LOGGED:
+        logger.warning(f"… and {len(rows) - MAX_DIVERGENT_LOGGED} more courses with differing copies")
+
+
+def subjects_to_courses(engine: Engine):
+    """Move the descriptive subject columns into the courses catalog (one row per scheme + code)."""
+    columns = {c["name"] for c in inspect(engine).get_columns("subjects")}
+    if "course_id" in columns or "subject_code" not in columns:
+        return
+    _warn_divergent_copies(engine)
+    if engine.dialect.name == "sqlite":
+        before, after = _sqlite_subjects_to_courses(engine)
+    elif engine.dialect.name == "postgresql":
+        before, after = _postgresql_subjects_to_courses(engine)
+    else:
+        raise RuntimeError(f"No subjects → courses migration for {engine.dialect.name}; migrate manually.")
+    with engine.connect() as conn:
+        courses = conn.execute(text("SELECT COUNT(*) FROM courses")).scalar()
+    logger.info(f"Migrated {after} subject rows onto {courses} courses"
+                + (f" ({before - after} orphaned rows without a student dropped)" if before != after else ""))
+
+
+# ── added columns ─────────────────────────────────────────────────
+
+def ensure_columns(engine: Engine):
+    """Add nullable columns declared in models.py that an existing table is missing."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in models.Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present or not column.nullable:
+                    continue
+                ddl_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl_type}"))
+                logger.info(f"Added column {table.name}.{column.name}")
+
+
+# ── indexes ───────────────────────────────────────────────────────
+
+# Replaced by a wider index in models.py
+_DROPPED_INDEXES = ["ix_syllabus_modules_subject_id"]
+
+
+def ensure_indexes(engine: Engine):
+    """Create every index declared in models.py that an existing table is missing."""
+    with engine.begin() as conn:
+        for name in _DROPPED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        for table in models.Base.metadata.sorted_tables:
+            for idx in table.indexes:
+                idx.create(conn, checkfirst=True)
+
+
+# ── runner ────────────────────────────────────────────────────────
+
+MIGRATIONS = [
+    subjects_to_courses,
+    ensure_columns,
+    ensure_indexes,
+]
+
+
+def run_migrations(engine: Engine):
+    for migrate in MIGRATIONS:
+        migrate(engine)
@@ -1,14 +1,15 @@
 """
 models.py – SQLAlchemy ORM models (RNSIT 2024 Scheme - Final Version)
-CIE+SEE only, no SGPA/CGPA stored. Simplified Subject model (no cie_max/see_max - fixed by scheme type).
+CIE+SEE only; SGPA is stored only as a per-semester aggregate (semester_stats), no CGPA. Simplified Subject model (no cie_max/see_max - fixed by scheme type).
 """
 from __future__ import annotations
 import enum
 from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, Float, Boolean, DateTime,
-    ForeignKey, UniqueConstraint, Enum as SAEnum
+    Column, Integer, String, Float, Boolean, DateTime, Text,
+    ForeignKey, Index, UniqueConstraint, Enum as SAEnum
 )
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -37,6 +38,11 @@ class Student(Base):
 
     semesters = relationship("Semester", back_populates="student", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_students_name_id", "name", "id"),  # keyset pagination order
+        Index("ix_students_scheme_branch", "scheme", "branch"),  # cohort uploads
+    )
+
 
 class Semester(Base):
     __tablename__ = "semesters"
@@ -49,36 +55,79 @@ class Semester(Base):
 
     student  = relationship("Student", back_populates="semesters")
     subjects = relationship("Subject", back_populates="semester", cascade="all, delete-orphan")
+    stats    = relationship("SemesterStats", back_populates="semester",
+                            uselist=False, cascade="all, delete-orphan")
 
     __table_args__ = (
         UniqueConstraint("student_id", "semester_number", name="uq_student_semester"),
+        # cohort uploads: (number, year) → student_id without touching the table
+        Index("ix_semesters_number_year", "semester_number", "academic_year", "student_id"),
     )
 
 
-class Subject(Base):
-    __tablename__ = "subjects"
+class Course(Base):
+    """
+    Catalog entry shared by every student on a scheme: one row per (scheme, subject_code).
+    Enrollment rows (Subject) reference it, so a correction is a single-row update.
+    """
+    __tablename__ = "courses"
 
     id           = Column(Integer, primary_key=True, index=True)
-    semester_id  = Column(Integer, ForeignKey("semesters.id", ondelete="CASCADE"), nullable=False)
+    scheme       = Column(String(20),  nullable=False)
     subject_code = Column(String(20),  nullable=False)
     subject_name = Column(String(200), nullable=False)
     subject_type = Column(SAEnum(SubjectType), nullable=False, default=SubjectType.pcc)
     credits      = Column(Float, nullable=False, default=0.0)
     ltp_hours    = Column(String(20), nullable=True)
     is_mandatory = Column(Boolean, nullable=False, default=False)
+    created_at   = Column(DateTime, default=datetime.utcnow)
+    updated_at   = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    enrollments = relationship("Subject", back_populates="course")
+
+    __table_args__ = (
+        UniqueConstraint("scheme", "subject_code", name="uq_scheme_course"),
+    )
+
+
+# Descriptive subject fields live on Course; Subject exposes them unchanged
+COURSE_FIELDS = ("subject_code", "subject_name", "subject_type", "credits", "ltp_hours", "is_mandatory")
+
+
+class Subject(Base):
+    """
+    A course as taken in one student's semester (enrollment). subject_code, subject_name,
+    subject_type, credits, ltp_hours and is_mandatory are read from – and written to –
+    the shared Course; create rows with course=… rather than those fields.
+    """
+    __tablename__ = "subjects"
+
+    id           = Column(Integer, primary_key=True, index=True)
+    semester_id  = Column(Integer, ForeignKey("semesters.id", ondelete="CASCADE"), nullable=False)
+    course_id    = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
     option_group = Column(String(30), nullable=True)
     is_chosen    = Column(Boolean, nullable=False, default=True)
     created_at   = Column(DateTime, default=datetime.utcnow)
     updated_at   = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     semester    = relationship("Semester", back_populates="subjects")
+    course      = relationship("Course", back_populates="enrollments", lazy="joined", innerjoin=True)
     cie_record  = relationship("CIERecord", back_populates="subject",
                                uselist=False, cascade="all, delete-orphan")
     see_mark    = relationship("SEEMark",   back_populates="subject",
                                uselist=False, cascade="all, delete-orphan")
+    modules     = relationship("SyllabusModule", back_populates="subject",
+                               order_by="SyllabusModule.module_number", cascade="all, delete-orphan")
+
+    subject_code = association_proxy("course", "subject_code")
+    subject_name = association_proxy("course", "subject_name")
+    subject_type = association_proxy("course", "subject_type")
+    credits      = association_proxy("course", "credits")
+    ltp_hours    = association_proxy("course", "ltp_hours")
+    is_mandatory = association_proxy("course", "is_mandatory")
 
     __table_args__ = (
-        UniqueConstraint("semester_id", "subject_code", name="uq_sem_subject"),
+        UniqueConstraint("semester_id", "course_id", name="uq_sem_course"),
     )
 
 
@@ -156,3 +205,113 @@ class SEEMark(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     subject = relationship("Subject", back_populates="see_mark")
+
+
+class SyllabusModule(Base):
+    """Module / topic content of a subject, parsed from the detailed syllabus pages."""
+    __tablename__ = "syllabus_modules"
+
+    id                  = Column(Integer, primary_key=True, index=True)
+    subject_id          = Column(Integer, ForeignKey("subjects.id", ondelete="CASCADE"),
+                                 nullable=False)
+    module_number       = Column(Integer, nullable=False)
+    module_title        = Column(String(300), nullable=True)
+    topics              = Column(Text, nullable=True)
+    learning_objectives = Column(Text, nullable=True)   # filled on module 1 only
+    created_at          = Column(DateTime, default=datetime.utcnow)
+
+    subject = relationship("Subject", back_populates="modules")
+
+    __table_args__ = (
+        Index("ix_syllabus_modules_subject_number", "subject_id", "module_number"),  # modules in order
+    )
+
+
+class SemesterStats(Base):
+    """
+    Per-semester aggregates over the chosen subjects, maintained by services/stats_service.py:
+    recomputed in the same transaction as every marks write, dropped when the semester's
+    subjects or their courses change (and rebuilt on the next read).
+    """
+    __tablename__ = "semester_stats"
+
+    semester_id       = Column(Integer, ForeignKey("semesters.id", ondelete="CASCADE"), primary_key=True)
+    subjects_total    = Column(Integer, nullable=False, default=0)
+    subjects_complete = Column(Integer, nullable=False, default=0)   # Complete / Detained / Absent
+    detained_count    = Column(Integer, nullable=False, default=0)
+    total_cie         = Column(Float, nullable=False, default=0.0)   # credit subjects, /50 each
+    total_see         = Column(Float, nullable=False, default=0.0)   # reduced, /50 each
+    credits_total     = Column(Float, nullable=False, default=0.0)
+    credits_earned    = Column(Float, nullable=False, default=0.0)
+    sgpa              = Column(Float, nullable=True)                 # None without credit subjects
+    status            = Column(String(20), nullable=False, default="pending")  # pending|in_progress|complete
+    updated_at        = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    semester = relationship("Semester", back_populates="stats")
+
+
+class CohortSnapshot(Base):
+    """
+    Cached rank list of one cohort (branch + scheme + semester number + academic year),
+    for a subject code or the whole semester. Deleted by services/cohort_service.py
+    whenever marks or subjects of that cohort change.
+    """
+    __tablename__ = "cohort_snapshots"
+
+    key             = Column(String(200), primary_key=True)
+    branch          = Column(String(100), nullable=False)
+    scheme          = Column(String(20), nullable=False)
+    semester_number = Column(Integer, nullable=False)
+    academic_year   = Column(String(20), nullable=False)
+    payload_json    = Column(Text, nullable=False)
+    created_at      = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_cohort_snapshots_cohort", "scheme", "branch", "semester_number", "academic_year"),
+    )
+
+
+class JobStatus(str, enum.Enum):
+    queued  = "queued"
+    running = "running"
+    done    = "done"
+    failed  = "failed"
+
+
+class SyllabusJob(Base):
+    """Background syllabus upload (POST /upload-syllabus/{id}?background=true)."""
+    __tablename__ = "syllabus_jobs"
+
+    id             = Column(Integer, primary_key=True, index=True)
+    semester_id    = Column(Integer, ForeignKey("semesters.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename       = Column(String(255), nullable=True)
+    file_path      = Column(String(500), nullable=True)   # staged PDF, removed when the job ends
+    status         = Column(SAEnum(JobStatus), nullable=False, default=JobStatus.queued, index=True)
+    # Progress, written by the worker process while it parses
+    strategy       = Column(String(20), nullable=True)    # tables / text / pymupdf
+    pages_total    = Column(Integer, nullable=False, default=0)
+    pages_scanned  = Column(Integer, nullable=False, default=0)
+    subjects_found = Column(Integer, nullable=False, default=0)
+    # Ownership: the API process working on a running job, alive while it heartbeats
+    worker_id      = Column(String(32), nullable=True)
+    heartbeat_at   = Column(DateTime, nullable=True)
+    # Outcome
+    result_json    = Column(Text, nullable=True)          # SyllabusUploadResponse
+    error          = Column(Text, nullable=True)
+
+    created_at  = Column(DateTime, default=datetime.utcnow)
+    started_at  = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class ExtractionCacheEntry(Base):
+    """Syllabus extraction result keyed by sha256(PDF bytes) + extractor version."""
+    __tablename__ = "extraction_cache"
+
+    key           = Column(String(80), primary_key=True)
+    rows_json     = Column(Text, nullable=False)
+    warnings_json = Column(Text, nullable=False)
+    size_bytes    = Column(Integer, nullable=False)
+    hits          = Column(Integer, nullable=False, default=0)
+    created_at    = Column(DateTime, default=datetime.utcnow)
+    last_used_at  = Column(DateTime, default=datetime.utcnow, index=True)  # LRU order
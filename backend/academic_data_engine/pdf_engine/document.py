@@ -0,0 +1,108 @@
+"""
+pdf_engine/document.py – One parsed PDF shared by every extraction strategy
+
+Each backend (pdfplumber, PyMuPDF) is opened at most once per document, and each
+page's text / tables are extracted at most once and cached, so falling through from
+the table strategy to the text strategies re-uses work instead of re-opening the PDF.
+The source is the PDF's bytes or, for uploads, the path of the staged file.
+"""
+import logging
+from typing import Dict, List
+from pdf_engine.pdf_reader import PdfSource, open_with_pdfplumber, open_with_pymupdf
+
+logger = logging.getLogger(__name__)
+
+_FAILED = object()  # backend could not open this document
+
+
+class PdfDocument:
+    """Lazy, cached view of a PDF. Use as a context manager so both backends get closed."""
+
+    def __init__(self, source: PdfSource):
+        self._source = source
+        self._plumber = None
+        self._fitz = None
+        self._text: Dict[int, str] = {}
+        self._tables: Dict[int, List] = {}
+        self._fitz_text: Dict[int, str] = {}
+
+    # ── backends ──────────────────────────────────────────────────
+
+    @property
+    def plumber(self):
+        """pdfplumber document, or None if pdfplumber cannot open the PDF."""
+        if self._plumber is None:
+            self._plumber = open_with_pdfplumber(self._source) or _FAILED
+        return None if self._plumber is _FAILED else self._plumber
+
+    @property
+    def fitz(self):
+        """PyMuPDF document, or None if PyMuPDF cannot open the PDF."""
+        if self._fitz is None:
+            self._fitz = open_with_pymupdf(self._source) or _FAILED
+        return None if self._fitz is _FAILED else self._fitz
+
+    @property
+    def source(self) -> PdfSource:
+        """What the document was opened from (bytes or a path) – cheap to hand to a worker if a path."""
+        return self._source
+
+    @property
+    def page_count(self) -> int:
+        if self.plumber:
+            return len(self.plumber.pages)
+        return len(self.fitz) if self.fitz else 0
+
+    # ── per-page cache ────────────────────────────────────────────
+
+    def page_tables(self, i: int) -> List:
+        """pdfplumber tables on page i ([] when pdfplumber is unavailable)."""
+        if i not in self._tables:
+            self._tables[i] = (self.plumber.pages[i].extract_tables() or []) if self.plumber else []
+        return self._tables[i]
+
+    def page_has_ruling(self, i: int) -> bool:
+        """
+        True if page i has any vector drawing (lines / rects / curves). pdfplumber's default
+        (lattice) table finder builds tables from these, so a page without them has none.
+        Checked with PyMuPDF, which is far cheaper than pdfplumber's object parsing.
+        """
+        if self.fitz:
+            return bool(self.fitz[i].get_drawings())
+        return bool(self.plumber.pages[i].edges) if self.plumber else False
+
+    def quick_text(self, i: int) -> str:
+        """Cheapest available page text (PyMuPDF, else pdfplumber) – for filtering, not parsing."""
+        return self.fitz_text(i) if self.fitz else self.page_text(i)
+
+    def page_text(self, i: int) -> str:
+        """Page text from pdfplumber, falling back to PyMuPDF when pdfplumber cannot open the PDF."""
+        if i not in self._text:
+            if self.plumber:
+                self._text[i] = self.plumber.pages[i].extract_text() or ""
+            else:
+                self._text[i] = self.fitz_text(i)
+        return self._text[i]
+
+    def fitz_text(self, i: int) -> str:
+        """Page text as laid out by PyMuPDF."""
+        if i not in self._fitz_text:
+            self._fitz_text[i] = self.fitz[i].get_text("text") if self.fitz else ""
+        return self._fitz_text[i]
+
+    # ── lifecycle ─────────────────────────────────────────────────
+
+    def close(self):
+        for doc in (self._plumber, self._fitz):
+            if doc is not None and doc is not _FAILED:
+                try:
+                    doc.close()
+                except Exception as e:
+                    logger.debug(f"Closing PDF backend failed: {e}")
+        self._plumber = self._fitz = _FAILED
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
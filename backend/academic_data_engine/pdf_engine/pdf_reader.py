@@ -1,27 +1,40 @@
 """
 pdf_engine/pdf_reader.py – PDF file loading utilities (v2)
+
+Every opener takes a PdfSource: the PDF's bytes, or the path of a PDF on disk.
+Paths are opened by the backends directly, which read pages from the file on demand.
 """
 import logging
-from typing import Optional
+import os
+from typing import Union
 
 logger = logging.getLogger(__name__)
 
+PdfSource = Union[bytes, str, os.PathLike]
+
+
+def _is_bytes(source: PdfSource) -> bool:
+    return isinstance(source, (bytes, bytearray, memoryview))
+
 
-def open_with_pdfplumber(file_bytes: bytes):
-    """Open PDF bytes with pdfplumber. Returns context-manager document or None."""
+def open_with_pdfplumber(source: PdfSource):
+    """Open a PDF with pdfplumber. Returns context-manager document or None."""
     try:
         import pdfplumber, io
-        return pdfplumber.open(io.BytesIO(file_bytes))
+        return pdfplumber.open(io.BytesIO(source) if _is_bytes(source) else source)
     except Exception as e:
         logger.warning(f"pdfplumber open failed: {e}")
         return None
 
 
-def open_with_pymupdf(file_bytes: bytes):
-    """Open PDF bytes with PyMuPDF (fitz). Returns fitz.Document or None."""
+def open_with_pymupdf(source: PdfSource):
+    """Open a PDF with PyMuPDF (fitz). Returns fitz.Document or None."""
     try:
         import fitz
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
+        if _is_bytes(source):
+            doc = fitz.open(stream=source, filetype="pdf")
+        else:
+            doc = fitz.open(source, filetype="pdf")
         return doc
     except Exception as e:
         logger.warning(f"PyMuPDF open failed: {e}")
@@ -5,6 +5,17 @@ Strategies:
   1. pdfplumber table extraction (best for bordered tables)
   2. pdfplumber text-line regex (fallback for plain-text PDFs)
   3. PyMuPDF text extraction (last resort)
+All three read from one PdfDocument, so the PDF is opened once per backend
+and every page is extracted at most once.
+
+Table detection is the expensive step, so strategy 1 only runs it on pages that pass
+a cheap pre-filter (ruling lines present + header keywords and digits in the page text).
+With PDF_PAGE_WORKERS > 1 (default 0 = off) the remaining pages after the first wave are
+table-detected in that many worker processes; per extraction, so the total is
+PDF_WORKERS × PDF_PAGE_WORKERS.
+
+extract_subjects_by_semester() runs the table strategy over the whole book instead of
+stopping at the first table, tagging each row with the semester it belongs to.
 
 For RNSIT, subject_type is inferred from the course code pattern:
   - Codes ending in L  (e.g. BCSL305) → pccl
@@ -13,12 +24,27 @@ For RNSIT, subject_type is inferred from the course code pattern:
   - Otherwise → pcc (default; user can refine after upload)
 """
 import re
+import os
+import itertools
 import logging
-from typing import List, Dict, Optional, Tuple
-from pdf_engine.pdf_reader import open_with_pdfplumber, open_with_pymupdf
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
+from pdf_engine.document import PdfDocument
+from pdf_engine.pdf_reader import PdfSource
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever extraction rules change so cached results (services/extraction_cache) are not reused
+EXTRACTOR_VERSION = "4.2"
+
+PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", "0"))
+PAGES_PER_TASK = 4
+
+# progress(strategy=..., pages_total=..., pages_scanned=..., subjects_found=...) – any subset;
+# subjects_found is the running count of the current strategy, reported as rows are found
+ProgressFn = Optional[Callable[..., None]]
+
 # ── Column header keywords ─────────────────────────────────────────
 HDR = {
     "code":    ["course code", "sub code", "subject code", "code", "sl.no", "sl no", "course\ncode"],
@@ -101,70 +127,153 @@ def _detect_col_map(rows: List[List]) -> Optional[Dict[str, int]]:
 
 # ── Strategy 1: pdfplumber table extraction ───────────────────────
 
-def _extract_via_tables(pdf_bytes: bytes) -> Tuple[List[Dict], List[str]]:
-    warnings: List[str] = []
+# Single words from HDR: a header cell matching any HDR keyword contains one of these
+_HINT_WORDS = {
+    "code": ("code", "sl"),
+    "name": ("title", "name", "subject"),
+}
+
+
+def _could_hold_subject_table(doc: PdfDocument, pg_num: int) -> bool:
+    """Cheap pre-filter: skip table detection on pages that cannot yield a subject table."""
+    if not doc.page_has_ruling(pg_num):
+        return False
+    text = doc.quick_text(pg_num).lower()
+    if not re.search(r"\d{2,}", text):  # subject codes carry at least two digits
+        return False
+    return all(any(w in text for w in words) for words in _HINT_WORDS.values())
+
+
+def _tables_for_pages(source: PdfSource, pages: List[int]) -> Dict[int, List]:
+    """Page-worker entry point: table-detect a slice of pages."""
+    with PdfDocument(source) as doc:
+        return {i: doc.page_tables(i) for i in pages}
+
+
+def _fan_out_tables(doc: PdfDocument, pages: Iterator[int]) -> Iterator[Tuple[int, List]]:
+    """
+    Table-detect pages in PAGE_WORKERS processes, one wave at a time, yielding in page
+    order so the caller can stop at the first subject table like the sequential loop.
+    Waves are drawn from `pages` as they are needed, and if all that is left fits in
+    one wave no processes are started. The pool lives for one extraction only: a pool
+    kept inside an extraction-pool worker would block that worker's exit.
+    """
+    wave = PAGE_WORKERS * PAGES_PER_TASK
+    chunk = list(itertools.islice(pages, wave))
+    if len(chunk) < wave:  # not worth spawning workers
+        for pg_num in chunk:
+            yield pg_num, doc.page_tables(pg_num)
+        return
+    with ProcessPoolExecutor(max_workers=PAGE_WORKERS,
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        while chunk:
+            slices = [chunk[i:i + PAGES_PER_TASK] for i in range(0, len(chunk), PAGES_PER_TASK)]
+            futures = [pool.submit(_tables_for_pages, doc.source, sl) for sl in slices]
+            try:
+                for fut in futures:
+                    for pg_num, tables in fut.result().items():
+                        yield pg_num, tables
+            finally:  # caller stopped early (or failed): drop the rest of the wave
+                for fut in futures:
+                    fut.cancel()
+            chunk = list(itertools.islice(pages, wave))
+
+
+def _candidate_pages(doc: PdfDocument, progress: ProgressFn) -> Iterator[int]:
+    """Numbers of the pages passing the pre-filter, checked lazily in page order."""
+    n_pages = doc.page_count
+    for pg_num in range(n_pages):
+        if progress:
+            progress(strategy="tables", pages_total=n_pages, pages_scanned=pg_num)
+        if _could_hold_subject_table(doc, pg_num):
+            yield pg_num
+
+
+def _candidate_page_tables(doc: PdfDocument, progress: ProgressFn) -> Iterator[Tuple[int, List]]:
+    """
+    (page number, tables) for pages passing the pre-filter, in page order. With page
+    workers the first wave is still detected here, so a subject table near the front
+    (extract_subjects_from_pdf stops there) is found without starting any process.
+    """
+    pages = _candidate_pages(doc, progress)
+    wave = PAGE_WORKERS * PAGES_PER_TASK if PAGE_WORKERS > 1 else None
+    for pg_num in itertools.islice(pages, wave):
+        yield pg_num, doc.page_tables(pg_num)
+    if wave:
+        yield from _fan_out_tables(doc, pages)
+
+
+def _subjects_from_table(table: List[List]) -> List[Dict]:
+    """Subject rows of one pdfplumber table ([] if it is not a subject table)."""
     subjects: List[Dict] = []
+    if not table:
+        return subjects
+    col_map = _detect_col_map(table)
+    if not col_map:
+        return subjects
+
+    hdr_idx = 0
+    for i, row in enumerate(table[:15]):
+        if row and col_map.get("code") is not None:
+            cell = _clean(row[col_map["code"]])
+            if _match(cell, "code"):
+                hdr_idx = i
+                break
+
+    for row in table[hdr_idx + 1:]:
+        if not row or all(not _clean(c) for c in row):
+            continue
 
-    doc = open_with_pdfplumber(pdf_bytes)
-    if not doc:
-        return subjects, ["pdfplumber could not open the PDF"]
-
-    with doc as pdf:
-        for pg_num, page in enumerate(pdf.pages):
-            for table in (page.extract_tables() or []):
-                if not table:
-                    continue
-                col_map = _detect_col_map(table)
-                if not col_map:
-                    continue
-
-                hdr_idx = 0
-                for i, row in enumerate(table[:15]):
-                    if row and col_map.get("code") is not None:
-                        cell = _clean(row[col_map["code"]])
-                        if _match(cell, "code"):
-                            hdr_idx = i
-                            break
-
-                for row in table[hdr_idx + 1:]:
-                    if not row or all(not _clean(c) for c in row):
-                        continue
-
-                    code = _clean(row[col_map["code"]]) if "code" in col_map and col_map["code"] < len(row) else ""
-                    name = _clean(row[col_map["name"]]) if "name" in col_map and col_map["name"] < len(row) else ""
-
-                    if not code or not name:
-                        continue
-                    # Skip header-like rows
-                    if re.fullmatch(r"[A-Za-z\s/()\-,.]+", code) and len(code) > 15:
-                        continue
-                    # Must look like a subject code
-                    if not re.search(r"\d{2,}", code):
-                        continue
-
-                    def gf(k):
-                        idx = col_map.get(k)
-                        return _to_float(row[idx]) if idx is not None and idx < len(row) else None
-
-                    type_hint = _clean(row[col_map["type"]]) if "type" in col_map and col_map["type"] < len(row) else ""
-                    ltp = _clean(row[col_map["ltp"]]) if "ltp" in col_map and col_map["ltp"] < len(row) else None
-                    credits = gf("credits") or 0.0
-                    stype = _infer_subject_type(code, name, type_hint)
-
-                    subjects.append({
-                        "subject_code": code,
-                        "subject_name": name,
-                        "subject_type": stype,
-                        "credits": credits,
-                        "ltp_hours": ltp or None,
-                        "is_mandatory": stype == "mc",
-                    })
-
-                if subjects:
-                    logger.info(f"[table-strategy] Extracted {len(subjects)} subjects from page {pg_num + 1}")
-                    return subjects, warnings
+        code = _clean(row[col_map["code"]]) if "code" in col_map and col_map["code"] < len(row) else ""
+        name = _clean(row[col_map["name"]]) if "name" in col_map and col_map["name"] < len(row) else ""
 
-    return subjects, warnings
+        if not code or not name:
+            continue
+        # Skip header-like rows
+        if re.fullmatch(r"[A-Za-z\s/()\-,.]+", code) and len(code) > 15:
+            continue
+        # Must look like a subject code
+        if not re.search(r"\d{2,}", code):
+            continue
+
+        def gf(k):
+            idx = col_map.get(k)
+            return _to_float(row[idx]) if idx is not None and idx < len(row) else None
+
+        type_hint = _clean(row[col_map["type"]]) if "type" in col_map and col_map["type"] < len(row) else ""
+        ltp = _clean(row[col_map["ltp"]]) if "ltp" in col_map and col_map["ltp"] < len(row) else None
+        credits = gf("credits") or 0.0
+        stype = _infer_subject_type(code, name, type_hint)
+
+        subjects.append({
+            "subject_code": code,
+            "subject_name": name,
+            "subject_type": stype,
+            "credits": credits,
+            "ltp_hours": ltp or None,
+            "is_mandatory": stype == "mc",
+        })
+    return subjects
+
+
+def _extract_via_tables(doc: PdfDocument, progress: ProgressFn = None) -> Tuple[List[Dict], List[str]]:
+    warnings: List[str] = []
+
+    if not doc.plumber:
+        return [], ["pdfplumber could not open the PDF"]
+
+    if progress:
+        progress(strategy="tables", subjects_found=0)
+    for pg_num, tables in _candidate_page_tables(doc, progress):
+        for table in tables:
+            subjects = _subjects_from_table(table)
+            if subjects:
+                logger.info(f"[table-strategy] Extracted {len(subjects)} subjects from page {pg_num + 1}")
+                if progress:
+                    progress(strategy="tables", pages_scanned=pg_num + 1, subjects_found=len(subjects))
+                return subjects, warnings
+
+    return [], warnings
 
 
 # ── Strategy 2: regex text-line parsing ──────────────────────────
@@ -181,43 +290,33 @@ _ROW_PATTERN = re.compile(
 )
 
 
-def _extract_via_text(pdf_bytes: bytes) -> Tuple[List[Dict], List[str]]:
+def _extract_via_text(doc: PdfDocument, progress: ProgressFn = None) -> Tuple[List[Dict], List[str]]:
     warnings: List[str] = []
     subjects: List[Dict] = []
 
-    doc = open_with_pdfplumber(pdf_bytes)
-    lines = []
-    if doc:
-        with doc as pdf:
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                lines.extend(text.splitlines())
-    else:
-        fitz_doc = open_with_pymupdf(pdf_bytes)
-        if fitz_doc:
-            for page in fitz_doc:
-                lines.extend(page.get_text().splitlines())
-            fitz_doc.close()
-
-    for line in lines:
-        line = line.strip()
-        m = _ROW_PATTERN.match(line)
-        if not m:
-            continue
-        code = m.group(1)
-        name = m.group(2).strip()
-        credits_s = m.group(3)
-        if len(name) < 4 or len(name) > 120:
-            continue
-        stype = _infer_subject_type(code, name)
-        subjects.append({
-            "subject_code": code,
-            "subject_name": name,
-            "subject_type": stype,
-            "credits": float(credits_s),
-            "ltp_hours": None,
-            "is_mandatory": stype == "mc",
-        })
+    n_pages = doc.page_count
+    for pg_num in range(n_pages):
+        if progress:
+            progress(strategy="text", pages_total=n_pages, pages_scanned=pg_num, subjects_found=len(subjects))
+        for line in doc.page_text(pg_num).splitlines():
+            line = line.strip()
+            m = _ROW_PATTERN.match(line)
+            if not m:
+                continue
+            code = m.group(1)
+            name = m.group(2).strip()
+            credits_s = m.group(3)
+            if len(name) < 4 or len(name) > 120:
+                continue
+            stype = _infer_subject_type(code, name)
+            subjects.append({
+                "subject_code": code,
+                "subject_name": name,
+                "subject_type": stype,
+                "credits": float(credits_s),
+                "ltp_hours": None,
+                "is_mandatory": stype == "mc",
+            })
 
     if subjects:
         logger.info(f"[text-strategy] Extracted {len(subjects)} subjects")
@@ -228,15 +327,17 @@ def _extract_via_text(pdf_bytes: bytes) -> Tuple[List[Dict], List[str]]:
 
 # ── Strategy 3: PyMuPDF blocks ────────────────────────────────────
 
-def _extract_via_fitz_blocks(pdf_bytes: bytes) -> Tuple[List[Dict], List[str]]:
+def _extract_via_fitz_blocks(doc: PdfDocument, progress: ProgressFn = None) -> Tuple[List[Dict], List[str]]:
     warnings: List[str] = []
     subjects: List[Dict] = []
-    fitz_doc = open_with_pymupdf(pdf_bytes)
-    if not fitz_doc:
+    if not doc.fitz:
         return subjects, ["PyMuPDF could not open PDF"]
-    try:
-        all_text = "\n".join(page.get_text("text") for page in fitz_doc)
-        for m in _ROW_PATTERN.finditer(all_text):
+
+    n_pages = len(doc.fitz)
+    for pg_num in range(n_pages):
+        if progress:
+            progress(strategy="pymupdf", pages_total=n_pages, pages_scanned=pg_num, subjects_found=len(subjects))
+        for m in _ROW_PATTERN.finditer(doc.fitz_text(pg_num)):
             code = m.group(1)
             name = m.group(2).strip()
             if len(name) < 4:
@@ -250,8 +351,6 @@ def _extract_via_fitz_blocks(pdf_bytes: bytes) -> Tuple[List[Dict], List[str]]:
                 "ltp_hours": None,
                 "is_mandatory": stype == "mc",
             })
-    finally:
-        fitz_doc.close()
 
     if not subjects:
         warnings.append(
@@ -263,26 +362,109 @@ def _extract_via_fitz_blocks(pdf_bytes: bytes) -> Tuple[List[Dict], List[str]]:
 
 # ── Public API ─────────────────────────────────────────────────────
 
-def extract_subjects_from_pdf(file_bytes: bytes) -> Tuple[List[Dict], List[str]]:
+def extract_subjects_from_pdf(source: PdfSource, progress: ProgressFn = None) -> Tuple[List[Dict], List[str]]:
     """
-    Try 3 strategies in order. Returns (subjects, warnings).
+    Try 3 strategies in order on source (PDF bytes or a file path). Returns (subjects, warnings).
     Each subject dict has: subject_code, subject_name, subject_type,
                            credits, ltp_hours, is_mandatory.
+    progress, if given, is called per page with strategy / pages_total /
+    pages_scanned / subjects_found keyword arguments.
     """
+    with PdfDocument(source) as doc:
+        return _run_strategies(doc, progress)
+
+
+def _run_strategies(doc: PdfDocument, progress: ProgressFn) -> Tuple[List[Dict], List[str]]:
     all_warnings: List[str] = []
 
-    subjects, w = _extract_via_tables(file_bytes)
+    subjects, w = _extract_via_tables(doc, progress)
     all_warnings.extend(w)
     if subjects:
         return subjects, all_warnings
 
     all_warnings.append("Table extraction found nothing; trying text-line strategy.")
-    subjects, w = _extract_via_text(file_bytes)
+    subjects, w = _extract_via_text(doc, progress)
     all_warnings.extend(w)
     if subjects:
         return subjects, all_warnings
 
     all_warnings.append("Text-line strategy found nothing; trying PyMuPDF.")
-    subjects, w = _extract_via_fitz_blocks(file_bytes)
+    subjects, w = _extract_via_fitz_blocks(doc, progress)
     all_warnings.extend(w)
     return subjects, all_warnings
+
+
+
+# ── Multi-semester mode ────────────────────────────────────────────
+# Scheme books print one table per semester under a heading such as
+# "III Semester", "Semester - 4" or "5th Sem".
+
+_ROMAN = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8, "ix": 9, "x": 10}
+_SEM_HEADING = re.compile(
+    r"\b(?:semester|sem)\.?\s*[-:]?\s*(\d{1,2}|[ivx]{1,4})\b"
+    r"|\b(\d{1,2}|[ivx]{1,4})\s*(?:st|nd|rd|th)?\s+(?:semester|sem)\b",
+    re.IGNORECASE,
+)
+
+
+def _semester_headings(text: str) -> List[int]:
+    """Semester numbers mentioned as headings in a page, in reading order."""
+    found = []
+    for m in _SEM_HEADING.finditer(text):
+        token = (m.group(1) or m.group(2)).lower()
+        n = int(token) if token.isdigit() else _ROMAN.get(token)
+        if n and 1 <= n <= 10:
+            found.append(n)
+    return found
+
+
+def _semester_from_code(code: str) -> Optional[int]:
+    """VTU-style codes carry the semester as the first digit: BCS301 → 3, BCSL305 → 3."""
+    m = re.match(r"[A-Z]+(\d)", code.upper())
+    return int(m.group(1)) if m and m.group(1) != "0" else None
+
+
+def extract_subjects_by_semester(source: PdfSource, progress: ProgressFn = None) -> Tuple[List[Dict], List[str]]:
+    """
+    Extract every subject table in the PDF in one pass (no stop at the first table).
+    Rows have the same keys as extract_subjects_from_pdf plus semester_number, taken from
+    the nearest semester heading above the table, else from the course code (None if neither).
+    """
+    warnings: List[str] = []
+    rows: List[Dict] = []
+    with PdfDocument(source) as doc:
+        if not doc.plumber:
+            return rows, ["pdfplumber could not open the PDF"]
+
+        headings = [_semester_headings(doc.quick_text(i)) for i in range(doc.page_count)]
+        if progress:
+            progress(strategy="tables", subjects_found=0)
+        current: Optional[int] = None  # last heading seen on an earlier page
+        last_pg = -1
+        for pg_num, tables in _candidate_page_tables(doc, progress):
+            for heads in headings[last_pg + 1:pg_num]:
+                current = heads[-1] if heads else current
+            last_pg = pg_num
+
+            page_heads = headings[pg_num]
+            page_tables = [t for t in (_subjects_from_table(t) for t in tables) if t]
+            for k, table_rows in enumerate(page_tables):
+                if len(page_heads) == len(page_tables):   # one heading per table
+                    sem = page_heads[k]
+                else:
+                    sem = page_heads[0] if page_heads else current
+                for r in table_rows:
+                    r["semester_number"] = sem or _semester_from_code(r["subject_code"])
+                rows.extend(table_rows)
+            if page_tables and progress:
+                progress(strategy="tables", subjects_found=len(rows))
+            current = page_heads[-1] if page_heads else current
+
+    if not rows:
+        warnings.append("No subject tables found. Multi-semester mode needs bordered subject tables.")
+    else:
+        by_sem: Dict[Optional[int], int] = {}
+        for r in rows:
+            by_sem[r["semester_number"]] = by_sem.get(r["semester_number"], 0) + 1
+        logger.info(f"[multi-semester] Extracted {len(rows)} subjects: {by_sem}")
+    return rows, warnings
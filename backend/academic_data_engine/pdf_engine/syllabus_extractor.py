@@ -1,11 +1,15 @@
 """
 pdf_engine/syllabus_extractor.py
 Extracts per-subject module/topic content from detailed syllabus pages using PyMuPDF.
+Page text is read once per document and indexed by code-like token, so looking up
+many subjects costs one pass over the PDF.
 """
 import re
 import logging
-from typing import List, Dict, Tuple
-from pdf_engine.pdf_reader import open_with_pymupdf
+from collections import defaultdict
+from typing import List, Dict, Tuple, Union
+from pdf_engine.document import PdfDocument
+from pdf_engine.pdf_reader import PdfSource
 
 logger = logging.getLogger(__name__)
 
@@ -25,14 +29,32 @@ OBJECTIVES_END = re.compile(
 )
 
 
-def _find_subject_page(doc, subject_code: str) -> List[int]:
-    """Return page indices where the subject code appears."""
-    pages = []
-    for i in range(len(doc)):
-        text = doc[i].get_text()
-        if subject_code.upper() in text.upper():
-            pages.append(i)
-    return pages
+_TOKEN = re.compile(r"[A-Z0-9]+")
+
+
+class _PageIndex:
+    """Code-like token → page indices, built from each page's PyMuPDF text once."""
+
+    def __init__(self, doc: PdfDocument):
+        self.doc = doc
+        self.n_pages = len(doc.fitz)
+        self.tokens: Dict[str, List[int]] = defaultdict(list)
+        for i in range(self.n_pages):
+            for tok in set(_TOKEN.findall(doc.fitz_text(i).upper())):
+                if any(ch.isdigit() for ch in tok):
+                    self.tokens[tok].append(i)
+
+    def find_subject_pages(self, subject_code: str) -> List[int]:
+        """Page indices where the subject code appears (substring match, as before)."""
+        code = subject_code.upper()
+        pages = set()
+        if _TOKEN.fullmatch(code) and any(ch.isdigit() for ch in code):
+            for tok, tok_pages in self.tokens.items():
+                if code in tok:
+                    pages.update(tok_pages)
+        else:  # not a single code-like token: fall back to scanning the cached text
+            pages.update(i for i in range(self.n_pages) if code in self.doc.fitz_text(i).upper())
+        return sorted(pages)
 
 
 def _extract_modules(text: str) -> List[Dict]:
@@ -96,36 +118,21 @@ def _extract_learning_objectives(text: str) -> str:
     return "\n".join(obj_lines[:20])  # cap at 20 lines
 
 
-def extract_subject_syllabus(file_bytes: bytes, subject_code: str) -> Tuple[List[Dict], List[str]]:
-    """
-    Extract modules/topics for a specific subject from the full PDF.
-    Returns (list_of_module_dicts, warnings).
-    """
-    warnings: List[str] = []
-    results: List[Dict] = []
-
-    doc = open_with_pymupdf(file_bytes)
-    if doc is None:
-        warnings.append("Could not open PDF with PyMuPDF.")
-        return results, warnings
-
-    pages = _find_subject_page(doc, subject_code)
+def _subject_modules(index: _PageIndex, subject_code: str, warnings: List[str]) -> List[Dict]:
+    pages = index.find_subject_pages(subject_code)
     if not pages:
         warnings.append(f"Subject code '{subject_code}' not found in any page of the PDF.")
-        doc.close()
-        return results, warnings
+        return []
 
     # Aggregate text from all matching pages (and the next page for continuation)
     full_text = ""
     visited = set()
     for p in pages:
         for pg in [p, p + 1]:
-            if pg < len(doc) and pg not in visited:
-                full_text += doc[pg].get_text() + "\n"
+            if pg < index.n_pages and pg not in visited:
+                full_text += index.doc.fitz_text(pg) + "\n"
                 visited.add(pg)
 
-    doc.close()
-
     objectives = _extract_learning_objectives(full_text)
     modules = _extract_modules(full_text)
 
@@ -137,5 +144,29 @@ def extract_subject_syllabus(file_bytes: bytes, subject_code: str) -> Tuple[List
 
     for mod in modules:
         mod["learning_objectives"] = objectives if mod["module_number"] == 1 else ""
+    return modules
+
 
-    return modules, warnings
+def extract_subject_syllabus(
+    source: PdfSource, subject_code: Union[str, List[str]],
+) -> Tuple[Union[List[Dict], Dict[str, List[Dict]]], List[str]]:
+    """
+    Extract modules/topics for one subject, or for a list of subjects in one pass.
+    Returns (list_of_module_dicts, warnings) for a single code, and
+    ({code: list_of_module_dicts}, warnings) for a list of codes.
+    """
+    warnings: List[str] = []
+    codes = [subject_code] if isinstance(subject_code, str) else list(subject_code)
+    results: Dict[str, List[Dict]] = {code: [] for code in codes}
+
+    with PdfDocument(source) as doc:
+        if doc.fitz is None:
+            warnings.append("Could not open PDF with PyMuPDF.")
+        else:
+            index = _PageIndex(doc)
+            for code in codes:
+                results[code] = _subject_modules(index, code, warnings)
+
+    if isinstance(subject_code, str):
+        return results[subject_code], warnings
+    return results, warnings
@@ -0,0 +1,55 @@
+"""
+recompute_cie.py – Re-apply the CIE rules to every stored record
+================================================================
+Run after changing a scaling rule in services/cie_calculator.py (and cie_batch.py):
+recomputes ia_scaled, lab_test_scaled, final_cie and is_detained for all cie_records,
+re-syncs see_marks.is_detained, and rewrites only the rows that changed.
+
+    python recompute_cie.py --dry-run        # report what would change
+    python recompute_cie.py                  # apply
+    python recompute_cie.py --chunk-size 5000
+
+Uses DATABASE_URL like the server. Safe to re-run: a second run changes nothing.
+"""
+import argparse
+import sys, os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database import SessionLocal, engine, Base
+from migrations import run_migrations
+from services import recompute_service
+
+
+def _print_progress(report):
+    pct = 100 * report.scanned / report.total if report.total else 100
+    print(f"  {report.scanned:>8}/{report.total} ({pct:5.1f}%)  changed={report.changed}  "
+          f"see_flags={report.see_changed}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute stored CIE values after a rule change.")
+    parser.add_argument("--dry-run", action="store_true", help="report differences without writing")
+    parser.add_argument("--chunk-size", type=int, default=recompute_service.DEFAULT_CHUNK,
+                        help=f"records per batch / commit (default {recompute_service.DEFAULT_CHUNK})")
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    print(f"Recomputing CIE records{' (dry run)' if args.dry_run else ''} …")
+    with SessionLocal() as db:
+        report = recompute_service.recompute_cie(db, dry_run=args.dry_run, chunk_size=args.chunk_size,
+                                                 progress=_print_progress)
+
+    verb = "would change" if args.dry_run else "changed"
+    print(f"\n{report.scanned} CIE records scanned, {report.changed} {verb}, "
+          f"{report.see_changed} SEE detained flags {verb}, "
+          f"{report.semesters_refreshed} semester stats {'affected' if args.dry_run else 'rebuilt'}.")
+    for field, count in sorted(report.field_changes.items()):
+        print(f"  {field:16s} {count}")
+    for d in report.samples:
+        print(f"  record {d.cie_record_id} (subject {d.subject_id}): {d.field} {d.old} → {d.new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+routers/admin.py – Maintenance operations: CIE recomputation, response cache metrics
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from database import get_db
+import schemas
+from services import recompute_service, response_cache
+
+router = APIRouter(tags=["Admin"])
+
+
+@router.post("/admin/recompute-cie", response_model=schemas.CIERecomputeReport)
+def recompute_cie(
+    dry_run: bool = Query(True, description="Report what would change without writing; pass false to apply."),
+    chunk_size: int = Query(recompute_service.DEFAULT_CHUNK, ge=100, le=20_000),
+    db: Session = Depends(get_db),
+):
+    """
+    Re-apply services/cie_calculator.py to every stored CIE record and re-sync the SEE
+    detained flags. Only rows whose computed values differ are written, one commit per
+    chunk; progress is logged per chunk. For large databases prefer `python recompute_cie.py`.
+    """
+    return recompute_service.recompute_cie(db, dry_run=dry_run, chunk_size=chunk_size)
+
+
+@router.get("/admin/cache/stats", response_model=schemas.ResponseCacheStats)
+def response_cache_stats():
+    """Hits, misses and hit rate per cached read endpoint (this process), plus cache size."""
+    return response_cache.stats()
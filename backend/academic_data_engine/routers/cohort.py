@@ -0,0 +1,57 @@
+"""
+routers/cohort.py – Cohort rank lists: rank, percentile, mean, median, std dev
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from database import get_db
+import models, schemas
+from services import cohort_service
+
+router = APIRouter(tags=["Cohorts"])
+
+
+@router.get("/cohorts/ranks", response_model=schemas.CohortRanking)
+def cohort_ranks(
+    branch: str = Query(..., min_length=1),
+    scheme: str = Query(..., min_length=1),
+    semester_number: int = Query(..., ge=1, le=8),
+    academic_year: str = Query(..., min_length=1),
+    subject_code: Optional[str] = Query(None, min_length=1),
+    db: Session = Depends(get_db),
+):
+    """
+    Rank list of every student of branch + scheme in that semester and academic year:
+    by CIE + SEE (/100) of subject_code, or by SGPA when subject_code is omitted.
+    Students without marks yet are left out.
+    """
+    cohort = cohort_service.Cohort(branch, scheme, semester_number, academic_year)
+    if subject_code:
+        return cohort_service.subject_ranking(db, cohort, subject_code.strip().upper())
+    return cohort_service.semester_ranking(db, cohort)
+
+
+def _standing(ranking: schemas.CohortRanking, **match) -> schemas.CohortRanking:
+    """The cohort figures with only the matching entry ([] when it has no marks yet)."""
+    entries = [e for e in ranking.entries if all(getattr(e, k) == v for k, v in match.items())]
+    return ranking.model_copy(update={"entries": entries})
+
+
+@router.get("/semesters/{semester_id}/rank", response_model=schemas.CohortRanking)
+def semester_rank(semester_id: int, db: Session = Depends(get_db)):
+    """Where this semester's SGPA stands in its cohort."""
+    cohort = cohort_service.cohort_of(db, semester_id)
+    if cohort is None:
+        raise HTTPException(status_code=404, detail="Semester not found")
+    return _standing(cohort_service.semester_ranking(db, cohort), semester_id=semester_id)
+
+
+@router.get("/subjects/{subject_id}/rank", response_model=schemas.CohortRanking)
+def subject_rank(subject_id: int, db: Session = Depends(get_db)):
+    """Where this subject's CIE + SEE stands among the cohort's students of the same course."""
+    subj = db.query(models.Subject).filter(models.Subject.id == subject_id).first()
+    if not subj:
+        raise HTTPException(status_code=404, detail="Subject not found")
+    cohort = cohort_service.cohort_of(db, subj.semester_id)
+    ranking = cohort_service.subject_ranking(db, cohort, subj.subject_code)
+    return _standing(ranking, subject_id=subject_id)
@@ -1,11 +1,19 @@
 """
 routers/marks.py – CIE and SEE marks entry (RNSIT 2024 Scheme)
 """
-from fastapi import APIRouter, Depends, HTTPException
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_async_db, get_db
 import models, schemas
-from services.cie_calculator import compute_cie, is_detained
+from services import stats_service
+from services.marks_service import (
+    MAX_BULK_ROWS, apply_cie, apply_see, save_cie_bulk, save_see_bulk,
+)
 
 router = APIRouter(tags=["Marks"])
 
@@ -19,21 +27,10 @@ def save_cie(subject_id: int, payload: schemas.CIERecordCreate, db: Session = De
     if not subj:
         raise HTTPException(404, "Subject not found")
 
-    computed = compute_cie(subj.subject_type.value, payload.model_dump())
-    computed["is_detained"] = is_detained(computed.get("final_cie"), subj.is_mandatory)
-
     rec = db.query(models.CIERecord).filter(models.CIERecord.subject_id == subject_id).first()
-    if rec:
-        for k, v in computed.items():
-            setattr(rec, k, v)
-    else:
-        rec = models.CIERecord(subject_id=subject_id, **computed)
-        db.add(rec)
-
-    # Sync detained flag to SEE record if it exists
     see = db.query(models.SEEMark).filter(models.SEEMark.subject_id == subject_id).first()
-    if see:
-        see.is_detained = computed["is_detained"]
+    rec = apply_cie(db, subj, payload.model_dump(), rec, see)
+    stats_service.recompute(db, [subj.semester_id])
 
     db.commit()
     db.refresh(rec)
@@ -41,8 +38,8 @@ def save_cie(subject_id: int, payload: schemas.CIERecordCreate, db: Session = De
 
 
 @router.get("/subjects/{subject_id}/cie", response_model=schemas.CIERecordOut)
-def get_cie(subject_id: int, db: Session = Depends(get_db)):
-    rec = db.query(models.CIERecord).filter(models.CIERecord.subject_id == subject_id).first()
+async def get_cie(subject_id: int, db: AsyncSession = Depends(get_async_db)):
+    rec = await db.scalar(select(models.CIERecord).where(models.CIERecord.subject_id == subject_id))
     if not rec:
         raise HTTPException(404, "CIE record not found")
     return rec
@@ -60,27 +57,9 @@ def save_see(subject_id: int, payload: schemas.SEEMarkCreate, db: Session = Depe
         raise HTTPException(400, "MC (Mandatory Course) subjects have no SEE")
 
     cie_rec = db.query(models.CIERecord).filter(models.CIERecord.subject_id == subject_id).first()
-    detained = cie_rec.is_detained if cie_rec else False
-
-    reduced = None
-    if not payload.is_absent and payload.raw_scored is not None:
-        reduced = round(payload.raw_scored / 2.0, 2)
-
     mark = db.query(models.SEEMark).filter(models.SEEMark.subject_id == subject_id).first()
-    if mark:
-        mark.raw_scored = payload.raw_scored
-        mark.reduced_scored = reduced
-        mark.is_absent = payload.is_absent
-        mark.is_detained = detained
-    else:
-        mark = models.SEEMark(
-            subject_id=subject_id,
-            raw_scored=payload.raw_scored,
-            reduced_scored=reduced,
-            is_absent=payload.is_absent,
-            is_detained=detained,
-        )
-        db.add(mark)
+    mark = apply_see(db, subj, payload, mark, cie_rec)
+    stats_service.recompute(db, [subj.semester_id])
 
     db.commit()
     db.refresh(mark)
@@ -88,8 +67,54 @@ def save_see(subject_id: int, payload: schemas.SEEMarkCreate, db: Session = Depe
 
 
 @router.get("/subjects/{subject_id}/see", response_model=schemas.SEEMarkOut)
-def get_see(subject_id: int, db: Session = Depends(get_db)):
-    mark = db.query(models.SEEMark).filter(models.SEEMark.subject_id == subject_id).first()
+async def get_see(subject_id: int, db: AsyncSession = Depends(get_async_db)):
+    mark = await db.scalar(select(models.SEEMark).where(models.SEEMark.subject_id == subject_id))
     if not mark:
         raise HTTPException(404, "SEE mark not found")
     return mark
+
+
+# ── Bulk entry (whole semester / section) ─────────────────────────
+
+async def _read_bulk_rows(request: Request) -> list:
+    """Parse the request body as a JSON array of row objects or as CSV with a header row."""
+    body = await request.body()
+    if "csv" in request.headers.get("content-type", "").lower():
+        try:
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            # Blank cells mean "not entered", same as omitting the key in JSON
+            rows = [
+                {k.strip(): v.strip() for k, v in r.items() if k and v and v.strip()}
+                for r in reader
+            ]
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise HTTPException(400, f"Could not parse CSV body: {exc}")
+    else:
+        try:
+            rows = json.loads(body)
+        except ValueError:
+            raise HTTPException(400, "Body must be a JSON array of rows or text/csv")
+        if not isinstance(rows, list):
+            raise HTTPException(400, "Body must be a JSON array of rows or text/csv")
+
+    if len(rows) > MAX_BULK_ROWS:
+        raise HTTPException(413, f"At most {MAX_BULK_ROWS} rows per request")
+    return rows
+
+
+@router.post("/marks/cie/bulk", response_model=schemas.BulkMarksResponse)
+def save_cie_bulk_endpoint(rows: list = Depends(_read_bulk_rows), db: Session = Depends(get_db)):
+    """
+    Enter CIE marks for many subjects at once (JSON array or text/csv).
+    Each row carries the CIERecordCreate fields plus either subject_id or usn + subject_code
+    (and semester_number if the code repeats across semesters). All rows are validated
+    before anything is written; valid rows are stored in a single transaction and
+    invalid ones are reported per row.
+    """
+    return save_cie_bulk(db, rows)
+
+
+@router.post("/marks/see/bulk", response_model=schemas.BulkMarksResponse)
+def save_see_bulk_endpoint(rows: list = Depends(_read_bulk_rows), db: Session = Depends(get_db)):
+    """Enter SEE raw marks for many subjects at once. Same row addressing as /marks/cie/bulk."""
+    return save_see_bulk(db, rows)
@@ -0,0 +1,30 @@
+"""
+routers/search.py – Full-text search over syllabus modules
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+import schemas
+from services import search_service
+
+router = APIRouter(tags=["Search"])
+
+
+@router.get("/search/modules", response_model=list[schemas.ModuleSearchHit])
+async def search_modules(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Which subjects / modules cover a topic, best match first. Searches module titles,
+    topics and learning objectives; every word must match (the last one as a prefix).
+    Matches in the snippet are wrapped in [ ].
+    """
+    if not search_service.available:
+        raise HTTPException(status_code=501, detail="Module search needs SQLite with FTS5.")
+    match = search_service.fts_query(q)
+    if not match:
+        raise HTTPException(status_code=422, detail="Search text has no words.")
+    return await search_service.search_modules(db, match, limit, offset)
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from database import get_db
 import models, schemas
+from services import cohort_service, response_cache, stats_service
 
 router = APIRouter(tags=["Semesters"])
 
@@ -42,10 +43,21 @@ def list_semesters(student_id: int, db: Session = Depends(get_db)):
 
 @router.get("/semesters/{semester_id}", response_model=schemas.SemesterOut)
 def get_semester(semester_id: int, db: Session = Depends(get_db)):
-    sem = db.query(models.Semester).filter(models.Semester.id == semester_id).first()
-    if not sem:
+    def load():
+        sem = db.query(models.Semester).filter(models.Semester.id == semester_id).first()
+        if not sem:
+            raise HTTPException(status_code=404, detail="Semester not found")
+        return sem
+    return response_cache.get_or_load(response_cache.SEMESTER, semester_id, schemas.SemesterOut, load)
+
+
+@router.get("/semesters/{semester_id}/stats", response_model=schemas.SemesterStatsOut)
+def get_semester_stats(semester_id: int, db: Session = Depends(get_db)):
+    """Totals, credits and SGPA of the semester – precomputed, kept current by marks entry."""
+    stats = stats_service.get_stats(db, semester_id)
+    if stats is None:
         raise HTTPException(status_code=404, detail="Semester not found")
-    return sem
+    return stats
 
 
 @router.delete("/students/{student_id}/semesters/{semester_id}", status_code=204)
@@ -56,5 +68,8 @@ def delete_semester(student_id: int, semester_id: int, db: Session = Depends(get
     ).first()
     if not sem:
         raise HTTPException(status_code=404, detail="Semester not found for this student")
+    cohort_service.invalidate(db, [semester_id])
+    response_cache.invalidate(db, [response_cache.SEMESTER, response_cache.SUBJECTS, response_cache.MARKS_SUMMARY],
+                              [semester_id])
     db.delete(sem)
     db.commit()
@@ -1,10 +1,18 @@
 """
 routers/student.py – Student CRUD + full data export
 """
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import hashlib
+import json
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from database import get_db
 import models, schemas
+from services import cohort_service, response_cache
+from services.summary_service import semester_tree_options
+from utils import format_json_response
 
 router = APIRouter(tags=["Students"])
 
@@ -28,17 +36,99 @@ def create_student(payload: schemas.StudentCreate, db: Session = Depends(get_db)
     return student
 
 
-@router.get("/students/", response_model=list[schemas.StudentOut])
-def list_students(db: Session = Depends(get_db)):
-    return db.query(models.Student).all()
+def _encode_cursor(name: str, student_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([name, student_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        name, student_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(name), int(student_id)
+    except (ValueError, TypeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+@router.get("/students/", response_model=Union[List[schemas.StudentOut], List[schemas.StudentBrief]])
+def list_students(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    branch: Optional[str] = None,
+    scheme: Optional[str] = None,
+    usn_prefix: Optional[str] = None,
+    fields: Literal["full", "brief"] = "full",
+    db: Session = Depends(get_db),
+):
+    """
+    Students ordered by (name, id), one page at a time.
+    Pass the X-Next-Cursor response header back as ?cursor= for the next page
+    (header absent = last page). fields=brief returns only id, name and usn.
+    """
+    if fields == "brief":
+        q = db.query(models.Student.id, models.Student.name, models.Student.usn)
+    else:
+        q = db.query(models.Student)
+
+    if branch:
+        q = q.filter(models.Student.branch == branch.strip())
+    if scheme:
+        q = q.filter(models.Student.scheme == scheme.strip())
+    if usn_prefix:
+        q = q.filter(models.Student.usn.startswith(usn_prefix.strip().upper(), autoescape=True))
+    if cursor:
+        q = q.filter(tuple_(models.Student.name, models.Student.id) > _decode_cursor(cursor))
+
+    rows = q.order_by(models.Student.name, models.Student.id).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].name, rows[-1].id)
+
+    out_schema = schemas.StudentBrief if fields == "brief" else schemas.StudentOut
+    return [out_schema.model_validate(r) for r in rows]
 
 
 @router.get("/students/{student_id}", response_model=schemas.StudentOut)
 def get_student(student_id: int, db: Session = Depends(get_db)):
+    def load():
+        s = db.query(models.Student).filter(models.Student.id == student_id).first()
+        if not s:
+            raise HTTPException(404, "Student not found")
+        return s
+    return response_cache.get_or_load(response_cache.STUDENT, student_id, schemas.StudentOut, load)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+@router.get("/students/{student_id}/full", response_model=schemas.StudentFull)
+def get_student_full(student_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Whole transcript: every semester's marks summary in one response (two queries).
+    Sends an ETag; a matching If-None-Match gets 304 Not Modified.
+    """
     s = db.query(models.Student).filter(models.Student.id == student_id).first()
     if not s:
         raise HTTPException(404, "Student not found")
-    return s
+
+    semesters = (
+        db.query(models.Semester)
+        .options(*semester_tree_options())
+        .filter(models.Semester.student_id == student_id)
+        .order_by(models.Semester.semester_number)
+        .all()
+    )
+    body = schemas.StudentFull.model_validate(format_json_response(s, semesters)).model_dump_json()
+    etag = '"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.delete("/students/{student_id}", status_code=204)
@@ -46,5 +136,10 @@ def delete_student(student_id: int, db: Session = Depends(get_db)):
     s = db.query(models.Student).filter(models.Student.id == student_id).first()
     if not s:
         raise HTTPException(404, "Student not found")
+    semester_ids = [sem.id for sem in s.semesters]
+    cohort_service.invalidate(db, semester_ids)
+    response_cache.invalidate(db, [response_cache.STUDENT], [student_id])
+    response_cache.invalidate(db, [response_cache.SEMESTER, response_cache.SUBJECTS, response_cache.MARKS_SUMMARY],
+                              semester_ids)
     db.delete(s)
     db.commit()
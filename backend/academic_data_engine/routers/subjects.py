@@ -2,9 +2,15 @@
 routers/subjects.py – Subject CRUD (manual entry + update after PDF upload)
 """
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_async_db, get_db
 import models, schemas
+from services import response_cache, stats_service
+from services.subject_service import (
+    UPLOAD_KEEPS, get_or_create_course, recompute_if_rules_changed, split_subject_data,
+)
 
 router = APIRouter(tags=["Subjects"])
 
@@ -16,9 +22,9 @@ def create_subject(semester_id: int, payload: schemas.SubjectCreate, db: Session
         raise HTTPException(status_code=404, detail="Semester not found")
 
     # Check duplicate
-    dup = db.query(models.Subject).filter(
+    dup = db.query(models.Subject.id).join(models.Course).filter(
         models.Subject.semester_id == semester_id,
-        models.Subject.subject_code == payload.subject_code.strip().upper()
+        models.Course.subject_code == payload.subject_code.strip().upper()
     ).first()
     if dup:
         raise HTTPException(status_code=409, detail=f"Subject {payload.subject_code} already exists in this semester")
@@ -29,19 +35,38 @@ def create_subject(semester_id: int, payload: schemas.SubjectCreate, db: Session
     if data["subject_type"] == "mc":
         data["is_mandatory"] = True
 
-    subject = models.Subject(semester_id=semester_id, **data)
+    # A new code creates the scheme's catalog entry. An existing one is shared with every
+    # student on the scheme and is enrolled as it is: a type / credits / MC flag that
+    # contradicts it is refused (corrections go through PUT /subjects/{id}).
+    course_data, enrollment = split_subject_data(data)
+    course = get_or_create_course(db, sem.student.scheme, course_data, keep=models.COURSE_FIELDS)
+    given = payload.model_fields_set | ({"is_mandatory"} if "subject_type" in payload.model_fields_set else set())
+    conflicts = [f for f in UPLOAD_KEEPS if f in given and getattr(course, f) != course_data[f]]
+    if conflicts:
+        raise HTTPException(
+            status_code=409,
+            detail=f"{course.subject_code} is in the {course.scheme} catalog with a different "
+                   f"{', '.join(conflicts)}; correct the course with PUT /subjects/{{id}} instead",
+        )
+    subject = models.Subject(semester_id=semester_id, course=course, **enrollment)
     db.add(subject)
+    stats_service.invalidate(db, [semester_id])
     db.commit()
     db.refresh(subject)
     return subject
 
 
 @router.get("/semesters/{semester_id}/subjects/", response_model=list[schemas.SubjectOut])
-def list_subjects(semester_id: int, db: Session = Depends(get_db)):
-    sem = db.query(models.Semester).filter(models.Semester.id == semester_id).first()
+async def list_subjects(semester_id: int, db: AsyncSession = Depends(get_async_db)):
+    cached, epoch = await response_cache.lookup_async(response_cache.SUBJECTS, semester_id)
+    if cached is not None:
+        return cached
+    sem = await db.get(models.Semester, semester_id)
     if not sem:
         raise HTTPException(status_code=404, detail="Semester not found")
-    return db.query(models.Subject).filter(models.Subject.semester_id == semester_id).all()
+    result = await db.scalars(select(models.Subject).where(models.Subject.semester_id == semester_id))
+    return await response_cache.store_async(response_cache.SUBJECTS, semester_id, list[schemas.SubjectOut],
+                                            result.all(), epoch)
 
 
 @router.get("/subjects/{subject_id}", response_model=schemas.SubjectOut)
@@ -52,6 +77,19 @@ def get_subject(subject_id: int, db: Session = Depends(get_db)):
     return subj
 
 
+@router.get("/subjects/{subject_id}/modules", response_model=list[schemas.SyllabusModuleOut])
+async def list_subject_modules(subject_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Module / topic content stored from the syllabus upload ([] until parsing has finished)."""
+    if await db.get(models.Subject, subject_id) is None:
+        raise HTTPException(status_code=404, detail="Subject not found")
+    result = await db.scalars(
+        select(models.SyllabusModule)
+        .where(models.SyllabusModule.subject_id == subject_id)
+        .order_by(models.SyllabusModule.module_number, models.SyllabusModule.id)
+    )
+    return result.all()
+
+
 @router.put("/subjects/{subject_id}", response_model=schemas.SubjectOut)
 def update_subject(subject_id: int, payload: schemas.SubjectUpdate, db: Session = Depends(get_db)):
     subj = db.query(models.Subject).filter(models.Subject.id == subject_id).first()
@@ -61,6 +99,9 @@ def update_subject(subject_id: int, payload: schemas.SubjectUpdate, db: Session
         setattr(subj, field, value)
     if subj.subject_type and subj.subject_type.value == "mc":
         subj.is_mandatory = True
+    # the type is shared by every student on the course: their stored CIE follows it
+    recompute_if_rules_changed(db, subj.course)
+    stats_service.invalidate_courses(db, [subj.course_id])
     db.commit()
     db.refresh(subj)
     return subj
@@ -71,5 +112,6 @@ def delete_subject(subject_id: int, db: Session = Depends(get_db)):
     subj = db.query(models.Subject).filter(models.Subject.id == subject_id).first()
     if not subj:
         raise HTTPException(status_code=404, detail="Subject not found")
+    stats_service.invalidate(db, [subj.semester_id])
     db.delete(subj)
     db.commit()
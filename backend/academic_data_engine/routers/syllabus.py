@@ -1,69 +1,287 @@
 """
 routers/syllabus.py – PDF syllabus upload
+
+Uploads are streamed to a temp file (services/uploads.py) and parsed from there;
+the file is removed once the request's background module parsing has finished.
+
+The upload handlers are async for the upload stream and the extraction pool. Their
+database steps go through _db(): each runs in the threadpool on a session of its own,
+so waiting on SQLite's write lock never stalls the event loop, and no pooled connection
+is held while the PDF is staged or parsed.
 """
+import asyncio
 import logging
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from database import get_db
+from collections import defaultdict
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Query, Session
+from starlette.concurrency import run_in_threadpool
+from database import SessionLocal, get_db
 import models, schemas
-from pdf_engine.structure_extractor import extract_subjects_from_pdf
-from services.subject_service import create_subject_from_row, upsert_subject
+from pdf_engine.structure_extractor import extract_subjects_by_semester, extract_subjects_from_pdf
+from services import extraction_cache, extraction_pool, job_queue, module_service, uploads
+from services.subject_service import prepare_subject_rows, store_extracted_subjects, upsert_subjects
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Syllabus"])
 
-MAX_PDF_MB = 20
 
+def _in_session(fn, *args):
+    with SessionLocal() as db:
+        return fn(db, *args)
+
+
+async def _db(fn, *args):
+    """fn(db, *args) in the threadpool, on a session that is closed before it returns."""
+    return await run_in_threadpool(_in_session, fn, *args)
+
+
+async def _extract(pdf: uploads.StagedPdf, extract_fn, variant: str = ""):
+    """(rows, warnings) from the extraction cache, else parsed in the process pool and cached."""
+    cache_key = extraction_cache.cache_key(pdf.sha256, variant)
+    cached = await _db(extraction_cache.get, cache_key)
+    if cached is not None:
+        logger.info("Extraction cache hit")
+        return cached
+
+    # Parsing is CPU-bound: run it in the process pool so the event loop keeps serving
+    try:
+        rows, warnings = await extraction_pool.run(extract_fn, pdf.path)
+    except extraction_pool.PoolSaturated:
+        raise HTTPException(
+            status_code=503,
+            detail="Syllabus extraction is busy with other uploads. Please retry shortly.",
+            headers={"Retry-After": "15"},
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail=f"PDF extraction did not finish within {extraction_pool.PDF_JOB_TIMEOUT_S:.0f} s.",
+        )
+    except BrokenProcessPool:
+        raise HTTPException(
+            status_code=503,
+            detail="The PDF worker was restarted during extraction. Please retry.",
+            headers={"Retry-After": "5"},
+        )
+
+    await _db(extraction_cache.put, cache_key, rows, warnings)
+    return rows, warnings
+
+
+def _target_query(db: Session) -> Query:
+    """
+    Target semesters of a bulk upload as plain rows (semester_id, student_id, usn,
+    semester_number): they outlive the session of the _db() step that loaded them.
+    """
+    return (
+        db.query(models.Semester.id.label("semester_id"), models.Semester.student_id,
+                 models.Student.usn, models.Semester.semester_number)
+        .join(models.Student, models.Student.id == models.Semester.student_id)
+    )
+
+
+def _cohort_targets(db: Session, semester_number: int, academic_year: str, branch: str, scheme: str) -> list:
+    return (
+        _target_query(db)
+        .filter(
+            models.Semester.semester_number == semester_number,
+            models.Semester.academic_year == academic_year,
+            models.Student.branch == branch,
+            models.Student.scheme == scheme,
+        )
+        .all()
+    )
+
+
+def _store_by_semester_number(db: Session, subjects_by_number: dict, student_id: Optional[int],
+                              branch: Optional[str], scheme: Optional[str], usn_prefix: Optional[str]):
+    """
+    (targets, counts) of a multi-semester upload: the existing semesters of one student,
+    or of a cohort, whose number has subjects, and the upsert_subjects() result.
+    """
+    target = _target_query(db).filter(models.Semester.semester_number.in_(list(subjects_by_number)))
+    if student_id is not None:
+        target = target.filter(models.Semester.student_id == student_id)
+    else:
+        target = target.filter(models.Student.branch == branch, models.Student.scheme == scheme)
+        if usn_prefix:
+            target = target.filter(models.Student.usn.startswith(usn_prefix, autoescape=True))
+    targets = target.all()
+    return targets, upsert_subjects(db, {t.semester_id: subjects_by_number[t.semester_number] for t in targets})
+
+
+def _exists(db: Session, model, pk: int) -> bool:
+    return db.get(model, pk) is not None
 
-@router.post("/upload-syllabus/{semester_id}", response_model=schemas.SyllabusUploadResponse, status_code=201)
+
+def _enqueue(db: Session, semester_id: int, filename: str, pdf_path: str) -> schemas.SyllabusJobOut:
+    return job_queue.job_out(job_queue.enqueue(db, semester_id, filename, pdf_path))
+
+
+def _semester_results(targets, counts) -> list:
+    """Per-semester inserted/updated report for the bulk upload endpoints."""
+    return [
+        schemas.SemesterUploadResult(
+            semester_id=t.semester_id, student_id=t.student_id, usn=t.usn,
+            semester_number=t.semester_number,
+            inserted=counts[t.semester_id][0], updated=counts[t.semester_id][1],
+        )
+        for t in sorted(targets, key=lambda t: (t.usn, t.semester_number))
+    ]
+
+
+# Declared before /upload-syllabus/{semester_id} so the literal paths win
+@router.post("/upload-syllabus/cohort", response_model=schemas.CohortUploadResponse)
+async def upload_syllabus_cohort(
+    background_tasks: BackgroundTasks,
+    semester_number: int,
+    academic_year: str,
+    branch: str,
+    scheme: str,
+    file: UploadFile = File(...),
+):
+    """
+    Apply one syllabus to a whole section: the PDF is parsed once and its subjects are
+    written to every semester matching (semester_number, academic_year, branch, scheme)
+    in one batched transaction.
+    """
+    targets = await _db(_cohort_targets, semester_number, academic_year.strip(), branch.strip(), scheme.strip())
+    if not targets:
+        raise HTTPException(status_code=404, detail="No semesters match this cohort")
+
+    async with uploads.staged_pdf(file, background_tasks) as pdf:
+        logger.info(f"Processing syllabus '{file.filename}' for {len(targets)} semesters "
+                    f"({branch} {scheme}, sem {semester_number}, {academic_year})")
+        extracted_rows, warnings = await _extract(pdf, extract_subjects_from_pdf)
+        warnings = list(warnings)
+        if not extracted_rows:
+            warnings.append(
+                "No subjects could be extracted from this PDF. "
+                "Please use manual entry or check that the PDF contains a proper subject table."
+            )
+
+        subjects = prepare_subject_rows(extracted_rows, warnings)
+        semester_ids = [t.semester_id for t in targets]
+        counts = await _db(upsert_subjects, {sid: subjects for sid in semester_ids}) if subjects else {
+            sid: (0, 0) for sid in semester_ids
+        }
+        if subjects:
+            background_tasks.add_task(module_service.populate_modules, pdf.path, semester_ids)
+
+    return schemas.CohortUploadResponse(
+        semester_number=semester_number,
+        academic_year=academic_year.strip(),
+        branch=branch.strip(),
+        scheme=scheme.strip(),
+        subjects_extracted=len(extracted_rows),
+        subjects_per_semester=len(subjects),
+        semesters_updated=_semester_results(targets, counts),
+        warnings=warnings,
+    )
+
+
+@router.post("/upload-syllabus/all-semesters", response_model=schemas.MultiSemesterUploadResponse)
+async def upload_syllabus_all_semesters(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    student_id: Optional[int] = None,
+    branch: Optional[str] = None,
+    scheme: Optional[str] = None,
+    usn_prefix: Optional[str] = None,
+):
+    """
+    Upload a scheme book covering several semesters. Every subject table is extracted in
+    one parse, grouped by its semester heading and stored into the matching existing
+    semesters of one student (?student_id=) or of a cohort (?branch=&scheme=[&usn_prefix=]).
+    """
+    if student_id is not None:
+        if not await _db(_exists, models.Student, student_id):
+            raise HTTPException(status_code=404, detail="Student not found")
+    elif not (branch and scheme):
+        raise HTTPException(status_code=400, detail="Give student_id, or branch and scheme for a cohort.")
+
+    async with uploads.staged_pdf(file, background_tasks) as pdf:
+        logger.info(f"Processing multi-semester syllabus '{file.filename}'")
+        extracted_rows, warnings = await _extract(pdf, extract_subjects_by_semester, variant="by-semester")
+        warnings = list(warnings)
+
+        rows_by_number = defaultdict(list)
+        for row in extracted_rows:
+            if row.get("semester_number") is None:
+                warnings.append(f"Could not tell which semester '{row.get('subject_code')}' belongs to; skipped.")
+                continue
+            rows_by_number[row["semester_number"]].append(row)
+        subjects_by_number = {n: prepare_subject_rows(rows, warnings) for n, rows in sorted(rows_by_number.items())}
+
+        targets, counts = await _db(
+            _store_by_semester_number, subjects_by_number, student_id,
+            branch and branch.strip(), scheme and scheme.strip(), usn_prefix and usn_prefix.strip().upper(),
+        )
+
+        if targets:
+            background_tasks.add_task(module_service.populate_modules, pdf.path, [t.semester_id for t in targets])
+
+    matched = {t.semester_number for t in targets}
+    return schemas.MultiSemesterUploadResponse(
+        semesters_detected=list(subjects_by_number),
+        subjects_extracted=len(extracted_rows),
+        semesters_updated=_semester_results(targets, counts),
+        unmatched_semesters=[n for n in subjects_by_number if n not in matched],
+        warnings=warnings,
+    )
+
+
+@router.post(
+    "/upload-syllabus/{semester_id}",
+    response_model=schemas.SyllabusUploadResponse,
+    status_code=201,
+    responses={202: {"model": schemas.SyllabusJobOut, "description": "Queued (background=true)"}},
+)
 async def upload_syllabus(
     semester_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    background: bool = False,
 ):
     """
     Upload a syllabus PDF. Subjects are extracted and stored automatically.
     Subject type (PCC / IPCC / PCCL / MC …) is auto-detected from the course code pattern.
     The user can still correct types after upload via the subject edit endpoint.
+    Module / topic content is parsed afterwards in the background (GET /subjects/{id}/modules).
+
+    With ?background=true the PDF is queued and a 202 with the job is returned at once;
+    poll GET /jobs/{job_id} for progress and the final result.
     """
-    sem = db.query(models.Semester).filter(models.Semester.id == semester_id).first()
-    if not sem:
+    if not await _db(_exists, models.Semester, semester_id):
         raise HTTPException(status_code=404, detail="Semester not found")
 
-    if not file.filename.lower().endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
+    async with uploads.staged_pdf(file, background_tasks) as pdf:
+        logger.info(f"Processing syllabus '{file.filename}' for semester {semester_id} ({pdf.size} bytes)")
 
-    file_bytes = await file.read()
-    if len(file_bytes) > MAX_PDF_MB * 1024 * 1024:
-        raise HTTPException(status_code=413, detail=f"PDF exceeds {MAX_PDF_MB} MB limit.")
+        if background:
+            job = await _db(_enqueue, semester_id, file.filename, pdf.path)
+            return JSONResponse(status_code=202, content=job.model_dump(mode="json"))
 
-    logger.info(f"Processing syllabus '{file.filename}' for semester {semester_id}")
+        extracted_rows, warnings = await _extract(pdf, extract_subjects_from_pdf)
+        result = await _db(store_extracted_subjects, semester_id, extracted_rows, warnings)
+        if result.subjects_stored:
+            background_tasks.add_task(module_service.populate_modules, pdf.path, [semester_id])
+    return result
 
-    extracted_rows, warnings = extract_subjects_from_pdf(file_bytes)
-
-    if not extracted_rows:
-        warnings.append(
-            "No subjects could be extracted from this PDF. "
-            "Please use manual entry or check that the PDF contains a proper subject table."
-        )
 
-    stored = 0
-    for row in extracted_rows:
-        try:
-            subject_data = create_subject_from_row(row)
-            if subject_data["credits"] <= 0 and not subject_data["is_mandatory"]:
-                warnings.append(f"Skipped '{subject_data['subject_code']}' – credits = 0 (likely a header row).")
-                continue
-            upsert_subject(db, semester_id, subject_data)
-            stored += 1
-        except Exception as exc:
-            warnings.append(f"Could not store '{row.get('subject_code', '?')}': {exc}")
+@router.get("/syllabus/cache/stats", response_model=schemas.ExtractionCacheStats)
+def extraction_cache_stats(db: Session = Depends(get_db)):
+    """Extraction cache hit/miss counters (this process) and persisted size."""
+    return extraction_cache.stats(db)
 
-    logger.info(f"Stored {stored}/{len(extracted_rows)} subjects for semester {semester_id}")
 
-    return schemas.SyllabusUploadResponse(
-        semester_id=semester_id,
-        subjects_extracted=len(extracted_rows),
-        subjects_stored=stored,
-        warnings=warnings,
-    )
+@router.get("/jobs/{job_id}", response_model=schemas.SyllabusJobOut)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Status of a background syllabus upload: progress while running, the upload result when done."""
+    job = db.query(models.SyllabusJob).filter(models.SyllabusJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_queue.job_out(job)
@@ -3,9 +3,9 @@ schemas.py – Pydantic v2 schemas (RNSIT 2024 Scheme — CIE+SEE only)
 """
 from __future__ import annotations
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, field_validator, ConfigDict
-from models import SubjectType
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel, field_validator, model_validator, ConfigDict
+from models import JobStatus, SubjectType
 
 
 # ── Student ────────────────────────────────────────────────────────
@@ -16,6 +16,13 @@ class StudentCreate(BaseModel):
     branch: str
     scheme: str
 
+class StudentBrief(BaseModel):
+    """Lightweight projection for dropdowns / pickers (GET /students/?fields=brief)."""
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    name: str
+    usn: str
+
 class StudentOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: int
@@ -47,6 +54,50 @@ class SemesterOut(BaseModel):
     academic_year: str
     created_at: datetime
 
+class SemesterStatsOut(BaseModel):
+    """Precomputed semester aggregates (chosen subjects; MC subjects only count towards detained)."""
+    model_config = ConfigDict(from_attributes=True)
+    semester_id: int
+    subjects_total: int
+    subjects_complete: int
+    detained_count: int
+    total_cie: float
+    total_see: float
+    credits_total: float
+    credits_earned: float
+    sgpa: Optional[float]        # provisional until status == "complete" (missing marks count as 0)
+    status: str                  # pending | in_progress | complete
+    updated_at: Optional[datetime]
+
+
+# ── Cohort rank lists ───────────────────────────────────────────────
+
+class CohortRankEntry(BaseModel):
+    student_id: int
+    usn: str
+    name: str
+    semester_id: int
+    subject_id: Optional[int] = None    # subject rank lists only
+    score: float
+    rank: int                           # 1 = best; ties share a rank
+    percentile: float                   # % of the cohort scoring at or below this score
+
+class CohortRanking(BaseModel):
+    """
+    Rank list of a cohort (branch + scheme + semester number + academic year).
+    score: CIE + SEE out of 100 (MC: CIE /100) for a subject, SGPA for a semester.
+    """
+    branch: str
+    scheme: str
+    semester_number: int
+    academic_year: str
+    subject_code: Optional[str] = None  # None → whole-semester ranking
+    count: int
+    mean: Optional[float] = None
+    median: Optional[float] = None
+    stddev: Optional[float] = None      # population standard deviation
+    entries: List[CohortRankEntry] = []
+
 
 # ── Subject ─────────────────────────────────────────────────────────
 
@@ -132,6 +183,82 @@ class SEEMarkOut(BaseModel):
     is_detained:    bool
 
 
+# ── Bulk marks entry ─────────────────────────────────────────────────
+
+class _BulkRowRef(BaseModel):
+    """A bulk row addresses its subject by id, or by USN + subject code (+ semester)."""
+    subject_id:      Optional[int] = None
+    usn:             Optional[str] = None
+    subject_code:    Optional[str] = None
+    semester_number: Optional[int] = None
+
+    @field_validator("usn", "subject_code")
+    @classmethod
+    def normalise(cls, v):
+        return "".join(v.split()).upper() if v else v
+
+    @model_validator(mode="after")
+    def has_subject_ref(self):
+        if self.subject_id is None and not (self.usn and self.subject_code):
+            raise ValueError("Give subject_id, or usn and subject_code")
+        return self
+
+class CIEBulkRow(_BulkRowRef, CIERecordCreate):
+    pass
+
+class SEEBulkRow(_BulkRowRef, SEEMarkCreate):
+    pass
+
+class BulkRowError(BaseModel):
+    row: int                          # 1-based position in the uploaded array / CSV
+    subject_id: Optional[int] = None
+    detail: str
+
+class BulkMarksResponse(BaseModel):
+    rows_received: int
+    rows_stored:   int
+    created:       int
+    updated:       int
+    errors: List[BulkRowError] = []
+
+
+# ── CIE recomputation (rule changes) ─────────────────────────────────
+
+class CIERecomputeDiff(BaseModel):
+    cie_record_id: int
+    subject_id: int
+    field: str
+    old: Union[bool, float, None]
+    new: Union[bool, float, None]
+
+class CIERecomputeReport(BaseModel):
+    dry_run: bool
+    total: int                      # cie_records rows when the run started
+    scanned: int = 0
+    changed: int = 0                # cie_records rows rewritten (or that would be, on a dry run)
+    see_changed: int = 0            # see_marks.is_detained flags re-synced
+    semesters_refreshed: int = 0    # semester_stats rows rebuilt
+    field_changes: Dict[str, int] = {}
+    samples: List[CIERecomputeDiff] = []    # first few differences
+
+
+# ── Response cache ───────────────────────────────────────────────────
+
+class EndpointCacheStats(BaseModel):
+    endpoint: str
+    hits: int              # since this process started
+    misses: int
+    hit_rate: float
+    invalidated: int       # keys dropped by writes
+
+class ResponseCacheStats(BaseModel):
+    backend: str           # memory | sqlite | off
+    entries: int
+    max_entries: int
+    ttl_s: float
+    endpoints: List[EndpointCacheStats] = []
+
+
 # ── Summary per semester (simple CIE+SEE output) ─────────────────────
 
 class SubjectMarksSummary(BaseModel):
@@ -179,12 +306,74 @@ class SyllabusModuleOut(BaseModel):
     topics: Optional[str]
     learning_objectives: Optional[str]
 
+class ModuleSearchHit(BaseModel):
+    module_id: int
+    subject_id: int
+    subject_code: str
+    subject_name: str
+    module_number: int
+    module_title: Optional[str]
+    snippet: str
+    score: float               # bm25 – lower is a better match
+    copies: int                # matching rows with this subject code + module (e.g. one per student)
+
 class SyllabusUploadResponse(BaseModel):
     semester_id: int
     subjects_extracted: int
     subjects_stored: int
+    subjects_inserted: int = 0
+    subjects_updated: int = 0
     warnings: List[str] = []
 
+class SemesterUploadResult(BaseModel):
+    semester_id: int
+    student_id: int
+    usn: str
+    semester_number: int
+    inserted: int
+    updated: int
+
+class CohortUploadResponse(BaseModel):
+    semester_number: int
+    academic_year: str
+    branch: str
+    scheme: str
+    subjects_extracted: int
+    subjects_per_semester: int               # subjects written to each matched semester
+    semesters_updated: List[SemesterUploadResult]
+    warnings: List[str] = []
+
+class MultiSemesterUploadResponse(BaseModel):
+    semesters_detected: List[int]            # semester numbers found in the PDF
+    subjects_extracted: int
+    semesters_updated: List[SemesterUploadResult]
+    unmatched_semesters: List[int] = []      # detected, but no matching Semester exists
+    warnings: List[str] = []
+
+class ExtractionCacheStats(BaseModel):
+    hits: int              # since this process started
+    misses: int
+    hit_rate: float
+    entries: int           # persisted
+    size_bytes: int
+    max_bytes: int
+
+class SyllabusJobOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    semester_id: int
+    filename: Optional[str]
+    status: JobStatus
+    strategy: Optional[str]
+    pages_total: int
+    pages_scanned: int
+    subjects_found: int
+    error: Optional[str]
+    result: Optional[SyllabusUploadResponse] = None
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
 
 # ── Full JSON export ──────────────────────────────────────────────────
 
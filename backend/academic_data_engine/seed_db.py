@@ -16,10 +16,13 @@ import sys, os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from database import SessionLocal, engine, Base
+from migrations import run_migrations
 import models
 from services.cie_calculator import compute_cie, is_detained
+from services.subject_service import get_or_create_course
 
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 # ─────────────────────────────────────────────────────────────────
 #  RNSIT 2024 Scheme — III Semester CSE
@@ -202,13 +205,16 @@ def seed():
 
         # ── Create subjects + marks ─────────────────────────────
         for code, name, stype, credits in SUBJECTS_3SEM:
+            course = get_or_create_course(db, student.scheme, {
+                "subject_code": code,
+                "subject_name": name,
+                "subject_type": models.SubjectType(stype),
+                "credits": credits,
+                "is_mandatory": (stype == "mc"),
+            })
             subject = models.Subject(
                 semester_id=semester.id,
-                subject_code=code,
-                subject_name=name,
-                subject_type=models.SubjectType(stype),
-                credits=credits,
-                is_mandatory=(stype == "mc"),
+                course=course,
                 is_chosen=True,
             )
             db.add(subject)
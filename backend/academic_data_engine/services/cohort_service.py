@@ -0,0 +1,232 @@
+"""
+services/cohort_service.py – Cohort rank lists (rank, percentile, mean, median, std dev)
+
+A cohort is every student of one branch + scheme in the same semester number and
+academic year. Rank lists are computed in the database with window functions – per
+subject code on CIE + SEE, per semester on SGPA (from semester_stats) – and the result
+is kept in cohort_snapshots. Marks and subject writes delete the snapshots of their
+cohort in their own transaction (via stats_service), so a snapshot is only rebuilt
+after something in that cohort changed.
+
+A rebuild must not store a rank list that a concurrent write has already made stale.
+On SQLite the rebuild's first DELETE takes the database write lock. On PostgreSQL a
+DELETE of a missing row locks nothing, so rebuilds and invalidations both take a
+transaction-scoped advisory lock per cohort (lock_cohorts()): a write waits for a
+rebuild in progress and then deletes its snapshot, and a rebuild waits for the write
+to commit and then ranks its marks.
+"""
+import hashlib
+import math
+from typing import Iterable, NamedTuple, Optional, Union
+from sqlalchemy import Select, delete, exists, text
+from sqlalchemy.orm import Session
+import models, schemas
+
+CHUNK = 500
+
+
+class Cohort(NamedTuple):
+    branch: str
+    scheme: str
+    semester_number: int
+    academic_year: str
+
+
+def snapshot_key(cohort: Cohort, subject_code: Optional[str] = None) -> str:
+    return "|".join((*map(str, cohort), subject_code or "*"))
+
+
+def _lock_id(cohort: Cohort) -> int:
+    """Stable signed 64-bit advisory lock id of a cohort (all its snapshots share it)."""
+    digest = hashlib.blake2b(snapshot_key(cohort).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _uses_advisory_locks(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def lock_cohorts(db: Session, cohorts: Iterable[Cohort]):
+    """
+    PostgreSQL: take the advisory lock of each cohort until the transaction ends, in
+    id order so that two transactions never wait on each other. No-op elsewhere.
+    """
+    if not _uses_advisory_locks(db):
+        return
+    for lock_id in sorted({_lock_id(Cohort(*c)) for c in cohorts}):
+        db.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": lock_id})
+
+
+# ── Window queries ────────────────────────────────────────────────
+
+_COHORT_FILTER = """
+    st.branch = :branch AND st.scheme = :scheme
+    AND sem.semester_number = :semester_number AND sem.academic_year = :academic_year
+"""
+
+# score out of 100: CIE /50 + reduced SEE /50, or CIE /100 for MC
+_SUBJECT_SCORES = f"""
+SELECT st.id AS student_id, st.usn, st.name, sem.id AS semester_id, s.id AS subject_id,
+       CASE WHEN c.is_mandatory THEN cie.final_cie
+            ELSE cie.final_cie + COALESCE(see.reduced_scored, 0) END AS score
+FROM students st
+JOIN semesters sem ON sem.student_id = st.id
+JOIN subjects s ON s.semester_id = sem.id
+JOIN courses c ON c.id = s.course_id
+JOIN cie_records cie ON cie.subject_id = s.id
+LEFT JOIN see_marks see ON see.subject_id = s.id
+WHERE {_COHORT_FILTER}
+  AND c.scheme = :scheme AND c.subject_code = :subject_code
+  AND s.is_chosen AND cie.final_cie IS NOT NULL
+"""
+
+# semesters with no marks yet (or no credit subjects) are left out
+_SEMESTER_SCORES = f"""
+SELECT st.id AS student_id, st.usn, st.name, sem.id AS semester_id, NULL AS subject_id,
+       ss.sgpa AS score
+FROM students st
+JOIN semesters sem ON sem.student_id = st.id
+JOIN semester_stats ss ON ss.semester_id = sem.id
+WHERE {_COHORT_FILTER}
+  AND ss.sgpa IS NOT NULL AND ss.status != 'pending'
+"""
+
+_MISSING_STATS = f"""
+SELECT sem.id
+FROM students st
+JOIN semesters sem ON sem.student_id = st.id
+LEFT JOIN semester_stats ss ON ss.semester_id = sem.id
+WHERE {_COHORT_FILTER} AND ss.semester_id IS NULL
+"""
+
+_RANK_SQL = """
+WITH scores AS ({scores}),
+ranked AS (
+    SELECT scores.*,
+           RANK() OVER (ORDER BY score DESC) AS rank,
+           CUME_DIST() OVER (ORDER BY score) AS cume_dist,
+           ROW_NUMBER() OVER (ORDER BY score, student_id) AS rn,
+           COUNT(*) OVER () AS n,
+           AVG(score) OVER () AS mean
+    FROM scores
+),
+median AS (
+    SELECT AVG(score) AS median FROM ranked WHERE rn IN ((n + 1) / 2, (n + 2) / 2)
+)
+SELECT r.student_id, r.usn, r.name, r.semester_id, r.subject_id, r.score, r.rank,
+       r.cume_dist, r.n, r.mean, m.median,
+       AVG((r.score - r.mean) * (r.score - r.mean)) OVER () AS variance
+FROM ranked r CROSS JOIN median m
+ORDER BY r.rank, r.usn
+"""
+
+
+def _rank(db: Session, cohort: Cohort, scores_sql: str, subject_code: Optional[str] = None) -> schemas.CohortRanking:
+    rows = db.execute(text(_RANK_SQL.format(scores=scores_sql)),
+                      {**cohort._asdict(), "subject_code": subject_code}).mappings().all()
+    ranking = schemas.CohortRanking(**cohort._asdict(), subject_code=subject_code, count=len(rows))
+    if rows:
+        first = rows[0]
+        ranking.mean = round(first["mean"], 2)
+        ranking.median = round(first["median"], 2)
+        ranking.stddev = round(math.sqrt(max(first["variance"], 0.0)), 2)
+    ranking.entries = [
+        schemas.CohortRankEntry(
+            student_id=r["student_id"], usn=r["usn"], name=r["name"],
+            semester_id=r["semester_id"], subject_id=r["subject_id"],
+            score=round(r["score"], 2), rank=r["rank"], percentile=round(100 * r["cume_dist"], 1),
+        )
+        for r in rows
+    ]
+    return ranking
+
+
+def _build_semester(db: Session, cohort: Cohort) -> schemas.CohortRanking:
+    # stats rows are filled lazily (see stats_service); rank complete data only
+    from services import stats_service  # stats_service imports this module for invalidation
+    missing = db.execute(text(_MISSING_STATS), cohort._asdict()).scalars().all()
+    stats_service.fill(db, missing)
+    db.flush()
+    return _rank(db, cohort, _SEMESTER_SCORES)
+
+
+# ── Snapshots ─────────────────────────────────────────────────────
+
+def _snapshot(db: Session, cohort: Cohort, subject_code: Optional[str], build) -> schemas.CohortRanking:
+    key = snapshot_key(cohort, subject_code)
+    snap = db.get(models.CohortSnapshot, key)
+    if snap is not None:
+        return schemas.CohortRanking.model_validate_json(snap.payload_json)
+
+    # Writing first takes SQLite's write lock (PostgreSQL: the cohort's advisory lock),
+    # so no marks write can commit between the rank query and storing its result
+    # (which would leave a stale snapshot).
+    lock_cohorts(db, [cohort])
+    db.execute(delete(models.CohortSnapshot).where(models.CohortSnapshot.key == key))
+    ranking = build()
+    db.add(models.CohortSnapshot(key=key, **cohort._asdict(), payload_json=ranking.model_dump_json()))
+    db.commit()
+    return ranking
+
+
+def subject_ranking(db: Session, cohort: Cohort, subject_code: str) -> schemas.CohortRanking:
+    return _snapshot(db, cohort, subject_code, lambda: _rank(db, cohort, _SUBJECT_SCORES, subject_code))
+
+
+def semester_ranking(db: Session, cohort: Cohort) -> schemas.CohortRanking:
+    return _snapshot(db, cohort, None, lambda: _build_semester(db, cohort))
+
+
+def cohort_of(db: Session, semester_id: int) -> Optional[Cohort]:
+    row = (
+        db.query(models.Student.branch, models.Student.scheme,
+                 models.Semester.semester_number, models.Semester.academic_year)
+        .join(models.Semester, models.Semester.student_id == models.Student.id)
+        .filter(models.Semester.id == semester_id)
+        .first()
+    )
+    return Cohort(*row) if row else None
+
+
+def _cohorts_of(db: Session, semester_ids) -> list:
+    return (
+        db.query(models.Student.branch, models.Student.scheme,
+                 models.Semester.semester_number, models.Semester.academic_year)
+        .join(models.Semester, models.Semester.student_id == models.Student.id)
+        .filter(models.Semester.id.in_(semester_ids))
+        .distinct()
+        .all()
+    )
+
+
+def invalidate(db: Session, semester_ids: Union[Iterable[int], Select]):
+    """
+    Drop the snapshots of every cohort these semesters belong to. semester_ids may be a
+    SELECT of semester ids. Does not commit.
+    """
+    if _uses_advisory_locks(db):
+        if isinstance(semester_ids, Select):
+            cohorts = _cohorts_of(db, semester_ids)
+        else:
+            semester_ids = list(set(semester_ids))
+            cohorts = [c for i in range(0, len(semester_ids), CHUNK)
+                       for c in _cohorts_of(db, semester_ids[i:i + CHUNK])]
+        lock_cohorts(db, cohorts)
+
+    def drop(ids):
+        in_cohort = exists().where(
+            models.Semester.id.in_(ids),
+            models.Student.id == models.Semester.student_id,
+            models.Student.branch == models.CohortSnapshot.branch,
+            models.Student.scheme == models.CohortSnapshot.scheme,
+            models.Semester.semester_number == models.CohortSnapshot.semester_number,
+            models.Semester.academic_year == models.CohortSnapshot.academic_year,
+        )
+        db.execute(delete(models.CohortSnapshot).where(in_cohort))
+
+    if isinstance(semester_ids, Select):
+        drop(semester_ids)
+        return
+    semester_ids = list(set(semester_ids))
+    for i in range(0, len(semester_ids), CHUNK):
+        drop(semester_ids[i:i + CHUNK])
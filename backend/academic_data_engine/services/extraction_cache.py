@@ -0,0 +1,114 @@
+"""
+services/extraction_cache.py – Persistent cache of syllabus extraction results
+
+Every section of a batch uploads the same scheme PDF, so extract_subjects_from_pdf results
+are stored in the extraction_cache table keyed by sha256(PDF bytes) + EXTRACTOR_VERSION.
+A repeat upload skips parsing entirely. Entries are evicted least-recently-used once the
+stored JSON exceeds EXTRACTION_CACHE_MAX_MB (default 64).
+
+get() and put() run in their own short session on the caller's engine: committing the
+hit counter or a new entry must not commit (or expire the loaded rows of) the request.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+import models, schemas
+from pdf_engine.structure_extractor import EXTRACTOR_VERSION
+
+MAX_BYTES = int(float(os.getenv("EXTRACTION_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0}
+
+
+def cache_key(sha256: str, variant: str = "") -> str:
+    """
+    sha256: hex digest of the PDF (computed while it is staged, see services/uploads.py).
+    variant separates results of different extraction modes for the same PDF.
+    """
+    key = f"{sha256}:{EXTRACTOR_VERSION}"
+    return f"{key}:{variant}" if variant else key
+
+
+def _count(name: str):
+    with _lock:
+        _counters[name] += 1
+
+
+def _own_session(db: Session) -> Session:
+    return Session(bind=db.get_bind())
+
+
+def get(db: Session, key: str) -> Optional[Tuple[List[dict], List[str]]]:
+    """Cached (rows, warnings) for key, or None. Marks the entry as recently used."""
+    with _own_session(db) as cache_db:
+        entry = cache_db.get(models.ExtractionCacheEntry, key)
+        if entry is None:
+            _count("misses")
+            return None
+        _count("hits")
+        result = json.loads(entry.rows_json), json.loads(entry.warnings_json)
+        cache_db.execute(
+            update(models.ExtractionCacheEntry)
+            .where(models.ExtractionCacheEntry.key == key)
+            .values(hits=models.ExtractionCacheEntry.hits + 1, last_used_at=datetime.utcnow())
+        )
+        cache_db.commit()
+    return result
+
+
+def put(db: Session, key: str, rows: List[dict], warnings: List[str]):
+    """Store an extraction result, then evict LRU entries beyond MAX_BYTES."""
+    rows_json, warnings_json = json.dumps(rows), json.dumps(warnings)
+    with _own_session(db) as cache_db:
+        entry = cache_db.get(models.ExtractionCacheEntry, key) or models.ExtractionCacheEntry(key=key)
+        entry.rows_json = rows_json
+        entry.warnings_json = warnings_json
+        entry.size_bytes = len(rows_json) + len(warnings_json)
+        entry.last_used_at = datetime.utcnow()
+        cache_db.add(entry)
+        cache_db.flush()
+        _evict(cache_db, key)
+        cache_db.commit()
+
+
+def _evict(db: Session, keep_key: str):
+    total = db.query(func.coalesce(func.sum(models.ExtractionCacheEntry.size_bytes), 0)).scalar()
+    if total <= MAX_BYTES:
+        return
+    oldest = (
+        db.query(models.ExtractionCacheEntry.key, models.ExtractionCacheEntry.size_bytes)
+        .filter(models.ExtractionCacheEntry.key != keep_key)
+        .order_by(models.ExtractionCacheEntry.last_used_at)
+    )
+    evict = []
+    for old_key, size in oldest:
+        if total <= MAX_BYTES:
+            break
+        evict.append(old_key)
+        total -= size
+    if evict:
+        db.query(models.ExtractionCacheEntry).filter(
+            models.ExtractionCacheEntry.key.in_(evict)
+        ).delete(synchronize_session=False)
+
+
+def stats(db: Session) -> schemas.ExtractionCacheStats:
+    entries, size = db.query(
+        func.count(models.ExtractionCacheEntry.key),
+        func.coalesce(func.sum(models.ExtractionCacheEntry.size_bytes), 0),
+    ).one()
+    with _lock:
+        hits, misses = _counters["hits"], _counters["misses"]
+    return schemas.ExtractionCacheStats(
+        hits=hits,
+        misses=misses,
+        hit_rate=round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        entries=entries,
+        size_bytes=size,
+        max_bytes=MAX_BYTES,
+    )
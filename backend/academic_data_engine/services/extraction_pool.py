@@ -0,0 +1,151 @@
+"""
+services/extraction_pool.py – Bounded process pool for CPU-bound PDF parsing
+
+pdfplumber / PyMuPDF extraction holds the GIL for seconds on large syllabi, so it runs
+in worker processes instead of on the event loop or in the request threadpool.
+
+Configuration (environment):
+  PDF_WORKERS        default min(4, CPU count) – worker processes
+  PDF_JOB_TIMEOUT_S  default 120               – per-job wait before the request gives up
+  PDF_MAX_QUEUE      default 8                 – jobs allowed to wait for a free worker;
+                                                 beyond that submit() raises PoolSaturated
+
+A job that outlives its timeout is abandon()ed. A ProcessPoolExecutor cannot stop one
+running job, and a worker stuck on a malformed PDF would otherwise hold its slot for
+good, so the pool it runs in is retired: later jobs go to a fresh pool and the old
+pool's workers are terminated. Jobs that were running next to it fail with
+BrokenProcessPool.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_JOB_TIMEOUT_S = float(os.getenv("PDF_JOB_TIMEOUT_S", "120"))
+PDF_MAX_QUEUE = int(os.getenv("PDF_MAX_QUEUE", "8"))
+
+
+class PoolSaturated(Exception):
+    """All workers are busy and the wait queue is full."""
+
+
+_lock = threading.Lock()
+_executor = None
+_in_flight = 0
+_owners: Dict[Future, ProcessPoolExecutor] = {}   # unfinished job → the pool it was submitted to
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: workers start clean instead of inheriting the server's threads and DB connections
+        _executor = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _release(executor: ProcessPoolExecutor, fut: Future):
+    global _in_flight, _executor
+    with _lock:
+        _in_flight -= 1
+        _owners.pop(fut, None)
+        if (not fut.cancelled() and isinstance(fut.exception(), BrokenProcessPool)
+                and _executor is executor):
+            logger.error("PDF worker process died; the pool will be recreated")
+            _executor = None
+
+
+def _terminate(executor: ProcessPoolExecutor):
+    # the executor notices its dead workers and fails their futures with BrokenProcessPool
+    for proc in list((getattr(executor, "_processes", None) or {}).values()):
+        proc.terminate()
+    executor.shutdown(wait=False)
+
+
+def in_flight() -> int:
+    """Jobs currently running or queued."""
+    return _in_flight
+
+
+def submit(fn, *args) -> Future:
+    """
+    Queue fn(*args) on the pool. The slot is held until the job actually finishes,
+    so jobs that outlive their request timeout still count against the queue.
+    """
+    global _in_flight
+    with _lock:
+        if _in_flight >= PDF_WORKERS + PDF_MAX_QUEUE:
+            raise PoolSaturated()
+        _in_flight += 1
+        executor = _get_executor()
+    try:
+        fut = executor.submit(fn, *args)
+    except BaseException:
+        with _lock:
+            _in_flight -= 1
+        raise
+    with _lock:
+        _owners[fut] = executor
+    fut.add_done_callback(functools.partial(_release, executor))
+    return fut
+
+
+def abandon(fut: Future):
+    """
+    Give up on a job after its timeout: cancelled if it is still queued, otherwise its
+    pool is retired and its workers terminated, which frees the job's slot.
+    """
+    global _executor
+    if fut.cancel():
+        return
+    with _lock:
+        executor = _owners.get(fut)
+        if executor is None:    # finished meanwhile, or not submitted here
+            return
+        if _executor is executor:
+            _executor = None
+    logger.error("PDF job exceeded its timeout; terminating its worker pool")
+    _terminate(executor)
+
+
+def submit_when_free(fn, *args, stop: Optional[threading.Event] = None,
+                     poll_s: float = 1.0) -> Optional[Future]:
+    """submit(), waiting for capacity instead of raising PoolSaturated; None if stop gets set."""
+    while stop is None or not stop.is_set():
+        try:
+            return submit(fn, *args)
+        except PoolSaturated:
+            time.sleep(poll_s)
+    return None
+
+
+async def run(fn, *args, timeout: float = PDF_JOB_TIMEOUT_S):
+    """
+    Await fn(*args) in a worker process. Raises PoolSaturated, asyncio.TimeoutError (the
+    job is abandoned) or BrokenProcessPool (its worker died or its pool was retired).
+    """
+    fut = submit(fn, *args)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(fut), timeout)
+    except asyncio.TimeoutError:
+        abandon(fut)
+        raise
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,260 @@
+"""
+services/job_queue.py – Background syllabus uploads backed by the syllabus_jobs table
+
+No external broker: the API stages the PDF on disk and inserts a `queued` row; worker
+threads in the API process claim rows with a conditional UPDATE, parse the PDF in the
+extraction process pool (which writes page progress straight into the row) and store
+the subjects. Queued jobs survive a restart because the table is the queue. A PDF already
+in the extraction cache skips the pool entirely. Module content is parsed once the job is
+marked done.
+
+A claimed job records the claiming process (INSTANCE_ID) and a heartbeat that the process
+refreshes while it runs. A running job whose heartbeat is older than STALE_AFTER_S has
+no live owner – its process crashed or was restarted – and is put back in the queue, at
+start() and periodically by every running process.
+
+Configuration (environment):
+  SYLLABUS_JOB_DIR     default ./job_files  – where staged PDFs wait for a worker
+  SYLLABUS_JOB_TIMEOUT default 900          – seconds a background parse may take
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from concurrent.futures import TimeoutError as FutureTimeout
+from sqlalchemy import or_
+
+from database import SessionLocal
+import models, schemas
+from services import extraction_cache, extraction_pool, module_service, uploads
+
+logger = logging.getLogger(__name__)
+
+JOB_DIR = os.getenv("SYLLABUS_JOB_DIR", "./job_files")
+JOB_TIMEOUT_S = float(os.getenv("SYLLABUS_JOB_TIMEOUT", "900"))
+POLL_INTERVAL_S = 2.0
+PROGRESS_INTERVAL_S = 0.5
+HEARTBEAT_INTERVAL_S = 15.0
+STALE_AFTER_S = 4 * HEARTBEAT_INTERVAL_S
+
+INSTANCE_ID = uuid.uuid4().hex   # this API process, as recorded on the jobs it claims
+
+_wake = threading.Event()
+_stop = threading.Event()
+_threads: list = []
+
+
+# ── Runs inside the extraction worker process ─────────────────────
+
+class _ProgressWriter:
+    """Throttled progress callback that writes into the job row from the worker process."""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.state: dict = {}
+        self.last_write = 0.0
+
+    def __call__(self, **fields):
+        # A new strategy or a new subject count is written at once; page counts are throttled
+        changed = any(fields.get(k, self.state.get(k)) != self.state.get(k) for k in ("strategy", "subjects_found"))
+        self.state.update(fields)
+        now = time.monotonic()
+        if changed or now - self.last_write >= PROGRESS_INTERVAL_S:
+            self.last_write = now
+            with SessionLocal() as db:
+                db.query(models.SyllabusJob).filter(models.SyllabusJob.id == self.job_id).update(self.state)
+                db.commit()
+
+
+def run_extraction_job(job_id: int, file_path: str):
+    """Worker-process entry point: parse the staged PDF, reporting progress on the job row."""
+    from pdf_engine.structure_extractor import extract_subjects_from_pdf
+
+    return extract_subjects_from_pdf(file_path, progress=_ProgressWriter(job_id))
+
+
+# ── API side ──────────────────────────────────────────────────────
+
+def enqueue(db, semester_id: int, filename: str, pdf_path: str) -> models.SyllabusJob:
+    """Move the staged upload into JOB_DIR and create a queued job row."""
+    os.makedirs(JOB_DIR, exist_ok=True)
+    path = os.path.abspath(os.path.join(JOB_DIR, f"{uuid.uuid4().hex}.pdf"))
+    shutil.move(pdf_path, path)
+
+    job = models.SyllabusJob(semester_id=semester_id, filename=filename, file_path=path)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _wake.set()
+    return job
+
+
+def job_out(job: models.SyllabusJob) -> schemas.SyllabusJobOut:
+    out = schemas.SyllabusJobOut.model_validate(job)
+    if job.result_json:
+        out.result = schemas.SyllabusUploadResponse.model_validate_json(job.result_json)
+    return out
+
+
+def _claim_next() -> Optional[int]:
+    """Atomically move the oldest queued job to running; returns its id."""
+    with SessionLocal() as db:
+        while True:
+            job_id = (
+                db.query(models.SyllabusJob.id)
+                .filter(models.SyllabusJob.status == models.JobStatus.queued)
+                .order_by(models.SyllabusJob.id)
+                .limit(1)
+                .scalar()
+            )
+            if job_id is None:
+                return None
+            claimed = (
+                db.query(models.SyllabusJob)
+                .filter(models.SyllabusJob.id == job_id,
+                        models.SyllabusJob.status == models.JobStatus.queued)
+                .update({"status": models.JobStatus.running, "started_at": datetime.utcnow(),
+                         "worker_id": INSTANCE_ID, "heartbeat_at": datetime.utcnow()})
+            )
+            db.commit()
+            if claimed:
+                return job_id
+
+
+def _process(job_id: int):
+    from services.subject_service import store_extracted_subjects
+
+    with SessionLocal() as db:
+        job = db.get(models.SyllabusJob, job_id)
+        semester_id, path = job.semester_id, job.file_path
+        try:
+            cache_key = extraction_cache.cache_key(uploads.sha256_file(path))
+        except OSError as exc:
+            _set(job_id, status=models.JobStatus.failed, finished_at=datetime.utcnow(),
+                 error=f"Staged PDF is missing: {exc}")
+            return
+        cached = extraction_cache.get(db, cache_key)
+
+    fut, in_use = None, False
+    if cached is None:
+        # Background jobs wait for pool capacity instead of failing with 503
+        fut = extraction_pool.submit_when_free(run_extraction_job, job_id, path, stop=_stop)
+        if fut is None:  # shutting down – leave it for the next start
+            _set(job_id, status=models.JobStatus.queued, started_at=None, worker_id=None, heartbeat_at=None)
+            return
+
+    try:
+        if cached is not None:
+            rows, warnings = cached
+            _set(job_id, strategy="cache")
+        else:
+            rows, warnings = fut.result(timeout=JOB_TIMEOUT_S)
+            with SessionLocal() as db:
+                extraction_cache.put(db, cache_key, rows, warnings)
+        with SessionLocal() as db:
+            if db.get(models.Semester, semester_id) is None:
+                raise ValueError("Semester was deleted while the syllabus was being parsed")
+            result = store_extracted_subjects(db, semester_id, rows, warnings)
+        _set(job_id, status=models.JobStatus.done, subjects_found=len(rows),
+             result_json=result.model_dump_json(), finished_at=datetime.utcnow())
+        if result.subjects_stored:
+            module_service.populate_modules(path, [semester_id])
+    except FutureTimeout:
+        _set(job_id, status=models.JobStatus.failed, finished_at=datetime.utcnow(),
+             error=f"PDF extraction did not finish within {JOB_TIMEOUT_S:.0f} s.")
+        extraction_pool.abandon(fut)
+        # a running worker may still have the file open until it is terminated
+        fut.add_done_callback(lambda _: uploads.discard(path))
+        in_use = True
+    except Exception as exc:
+        logger.exception(f"Syllabus job {job_id} failed")
+        _set(job_id, status=models.JobStatus.failed, finished_at=datetime.utcnow(), error=str(exc))
+    finally:
+        if path and not in_use:
+            uploads.discard(path)
+
+
+def _set(job_id: int, **fields):
+    with SessionLocal() as db:
+        db.query(models.SyllabusJob).filter(models.SyllabusJob.id == job_id).update(fields)
+        db.commit()
+
+
+def _worker_loop():
+    while not _stop.is_set():
+        try:
+            job_id = _claim_next()
+        except Exception:
+            logger.exception("Could not poll syllabus_jobs")
+            job_id = None
+        if job_id is None:
+            _wake.wait(POLL_INTERVAL_S)
+            _wake.clear()
+            continue
+        _process(job_id)
+
+
+# ── Ownership ─────────────────────────────────────────────────────
+
+def requeue_orphans() -> int:
+    """Put running jobs back in the queue unless a live process owns them; returns how many."""
+    stale = datetime.utcnow() - timedelta(seconds=STALE_AFTER_S)
+    with SessionLocal() as db:
+        requeued = db.query(models.SyllabusJob).filter(
+            models.SyllabusJob.status == models.JobStatus.running,
+            or_(models.SyllabusJob.worker_id.is_(None),
+                models.SyllabusJob.worker_id != INSTANCE_ID),
+            or_(models.SyllabusJob.heartbeat_at.is_(None),
+                models.SyllabusJob.heartbeat_at < stale),
+        ).update({"status": models.JobStatus.queued, "started_at": None,
+                  "worker_id": None, "heartbeat_at": None}, synchronize_session=False)
+        db.commit()
+    if requeued:
+        logger.warning(f"Requeued {requeued} syllabus job(s) left running by a process that is gone")
+        _wake.set()
+    return requeued
+
+
+def _heartbeat():
+    """Refresh this process's running jobs; requeue jobs whose owner stopped heartbeating."""
+    with SessionLocal() as db:
+        db.query(models.SyllabusJob).filter(
+            models.SyllabusJob.status == models.JobStatus.running,
+            models.SyllabusJob.worker_id == INSTANCE_ID,
+        ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+    requeue_orphans()
+
+
+def _heartbeat_loop():
+    while not _stop.wait(HEARTBEAT_INTERVAL_S):
+        try:
+            _heartbeat()
+        except Exception:
+            logger.exception("Syllabus job heartbeat failed")
+
+
+def start(threads: int = extraction_pool.PDF_WORKERS):
+    """Requeue jobs orphaned by a previous run and start the worker threads."""
+    requeue_orphans()
+
+    _stop.clear()
+    for i in range(max(1, threads)):
+        t = threading.Thread(target=_worker_loop, name=f"syllabus-job-{i}", daemon=True)
+        t.start()
+        _threads.append(t)
+    t = threading.Thread(target=_heartbeat_loop, name="syllabus-job-heartbeat", daemon=True)
+    t.start()
+    _threads.append(t)
+
+
+def stop():
+    _stop.set()
+    _wake.set()
+    for t in _threads:
+        t.join(timeout=5)
+    _threads.clear()
@@ -0,0 +1,216 @@
+"""
+services/marks_service.py – CIE/SEE persistence shared by single-subject and bulk entry
+"""
+from typing import Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+import models, schemas
+from services import stats_service
+from services.cie_calculator import compute_cie, is_detained
+
+MAX_BULK_ROWS = 10_000
+
+
+# ── Per-subject helpers (no commit) ───────────────────────────────
+
+def apply_cie(db: Session, subj: models.Subject, data: dict,
+              rec: Optional[models.CIERecord] = None,
+              see: Optional[models.SEEMark] = None) -> models.CIERecord:
+    """Compute CIE for one subject and stage the insert/update of its CIERecord."""
+    computed = compute_cie(subj.subject_type.value, data)
+    computed["is_detained"] = is_detained(computed.get("final_cie"), subj.is_mandatory)
+
+    if rec:
+        for k, v in computed.items():
+            setattr(rec, k, v)
+    else:
+        rec = models.CIERecord(subject_id=subj.id, **computed)
+        db.add(rec)
+
+    # Sync detained flag to SEE record if it exists
+    if see:
+        see.is_detained = computed["is_detained"]
+    return rec
+
+
+def apply_see(db: Session, subj: models.Subject, payload: schemas.SEEMarkCreate,
+              mark: Optional[models.SEEMark] = None,
+              cie_rec: Optional[models.CIERecord] = None) -> models.SEEMark:
+    """Halve the raw SEE score and stage the insert/update of the subject's SEEMark."""
+    detained = cie_rec.is_detained if cie_rec else False
+
+    reduced = None
+    if not payload.is_absent and payload.raw_scored is not None:
+        reduced = round(payload.raw_scored / 2.0, 2)
+
+    if mark:
+        mark.raw_scored = payload.raw_scored
+        mark.reduced_scored = reduced
+        mark.is_absent = payload.is_absent
+        mark.is_detained = detained
+    else:
+        mark = models.SEEMark(
+            subject_id=subj.id,
+            raw_scored=payload.raw_scored,
+            reduced_scored=reduced,
+            is_absent=payload.is_absent,
+            is_detained=detained,
+        )
+        db.add(mark)
+    return mark
+
+
+# ── Bulk entry ────────────────────────────────────────────────────
+
+def _validation_detail(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()
+    )
+
+
+def _validate_rows(raw_rows: list, row_schema) -> Tuple[list, List[schemas.BulkRowError]]:
+    """Validate every row up front. Returns ([(row_no, parsed)], errors)."""
+    parsed, errors = [], []
+    for i, raw in enumerate(raw_rows, start=1):
+        if not isinstance(raw, dict):
+            errors.append(schemas.BulkRowError(row=i, detail="Row must be an object"))
+            continue
+        try:
+            parsed.append((i, row_schema.model_validate(raw)))
+        except ValidationError as exc:
+            errors.append(schemas.BulkRowError(row=i, detail=_validation_detail(exc)))
+    return parsed, errors
+
+
+def _resolve_subjects(db: Session, parsed: list) -> Tuple[Dict[int, models.Subject], List[schemas.BulkRowError]]:
+    """
+    Map each row number to its Subject using at most two queries:
+    one by primary key, one joining students → semesters → subjects → courses by (USN, code).
+    """
+    ids = {row.subject_id for _, row in parsed if row.subject_id is not None}
+    by_id = {}
+    if ids:
+        by_id = {s.id: s for s in db.query(models.Subject).filter(models.Subject.id.in_(ids))}
+
+    by_usn: Dict[Tuple[str, str], List[Tuple[int, models.Subject]]] = {}
+    keyed = [row for _, row in parsed if row.subject_id is None]
+    if keyed:
+        hits = (
+            db.query(models.Student.usn, models.Semester.semester_number, models.Subject)
+            .join(models.Semester, models.Semester.student_id == models.Student.id)
+            .join(models.Subject, models.Subject.semester_id == models.Semester.id)
+            .join(models.Course, models.Course.id == models.Subject.course_id)
+            .filter(
+                models.Student.usn.in_({r.usn for r in keyed}),
+                models.Course.subject_code.in_({r.subject_code for r in keyed}),
+            )
+        )
+        for usn, sem_no, subj in hits:
+            by_usn.setdefault((usn, subj.subject_code), []).append((sem_no, subj))
+
+    resolved, errors = {}, []
+    for row_no, row in parsed:
+        if row.subject_id is not None:
+            subj = by_id.get(row.subject_id)
+            if not subj:
+                errors.append(schemas.BulkRowError(row=row_no, subject_id=row.subject_id,
+                                                   detail="Subject not found"))
+                continue
+        else:
+            matches = [
+                s for sem_no, s in by_usn.get((row.usn, row.subject_code), [])
+                if row.semester_number is None or sem_no == row.semester_number
+            ]
+            if not matches:
+                errors.append(schemas.BulkRowError(
+                    row=row_no, detail=f"Subject {row.subject_code} not found for USN {row.usn}"))
+                continue
+            if len(matches) > 1:
+                errors.append(schemas.BulkRowError(
+                    row=row_no,
+                    detail=f"{row.subject_code} exists in several semesters for {row.usn}; give semester_number"))
+                continue
+            subj = matches[0]
+        resolved[row_no] = subj
+    return resolved, errors
+
+
+def _prepare(db: Session, raw_rows: list, row_schema):
+    """Validate + resolve rows, dropping rows that address the same subject twice."""
+    parsed, errors = _validate_rows(raw_rows, row_schema)
+    resolved, lookup_errors = _resolve_subjects(db, parsed)
+    errors.extend(lookup_errors)
+
+    ready, seen = [], {}
+    for row_no, row in parsed:
+        subj = resolved.get(row_no)
+        if subj is None:
+            continue
+        if subj.id in seen:
+            errors.append(schemas.BulkRowError(
+                row=row_no, subject_id=subj.id, detail=f"Duplicate of row {seen[subj.id]}"))
+            continue
+        seen[subj.id] = row_no
+        ready.append((row_no, row, subj))
+    return ready, errors
+
+
+def _load_existing(db: Session, subject_ids: set):
+    if not subject_ids:
+        return {}, {}
+    cies = db.query(models.CIERecord).filter(models.CIERecord.subject_id.in_(subject_ids))
+    sees = db.query(models.SEEMark).filter(models.SEEMark.subject_id.in_(subject_ids))
+    return {r.subject_id: r for r in cies}, {m.subject_id: m for m in sees}
+
+
+def save_cie_bulk(db: Session, raw_rows: list) -> schemas.BulkMarksResponse:
+    """
+    Validate all rows, compute CIE for each and upsert every CIERecord in one transaction.
+    Invalid rows are reported and skipped; valid rows are stored.
+    """
+    ready, errors = _prepare(db, raw_rows, schemas.CIEBulkRow)
+    cie_map, see_map = _load_existing(db, {subj.id for _, _, subj in ready})
+
+    created = 0
+    fields = schemas.CIERecordCreate.model_fields
+    for _, row, subj in ready:
+        rec = cie_map.get(subj.id)
+        created += rec is None
+        apply_cie(db, subj, row.model_dump(include=set(fields)), rec, see_map.get(subj.id))
+    stats_service.recompute(db, {subj.semester_id for _, _, subj in ready})
+    db.commit()
+
+    return schemas.BulkMarksResponse(
+        rows_received=len(raw_rows),
+        rows_stored=len(ready),
+        created=created,
+        updated=len(ready) - created,
+        errors=sorted(errors, key=lambda e: e.row),
+    )
+
+
+def save_see_bulk(db: Session, raw_rows: list) -> schemas.BulkMarksResponse:
+    """Validate all rows and upsert every SEEMark in one transaction (MC subjects are rejected)."""
+    ready, errors = _prepare(db, raw_rows, schemas.SEEBulkRow)
+    mc_rows = [(n, subj) for n, _, subj in ready if subj.is_mandatory]
+    for row_no, subj in mc_rows:
+        errors.append(schemas.BulkRowError(
+            row=row_no, subject_id=subj.id, detail="MC (Mandatory Course) subjects have no SEE"))
+    ready = [r for r in ready if not r[2].is_mandatory]
+    cie_map, see_map = _load_existing(db, {subj.id for _, _, subj in ready})
+
+    created = 0
+    for _, row, subj in ready:
+        mark = see_map.get(subj.id)
+        created += mark is None
+        apply_see(db, subj, row, mark, cie_map.get(subj.id))
+    stats_service.recompute(db, {subj.semester_id for _, _, subj in ready})
+    db.commit()
+
+    return schemas.BulkMarksResponse(
+        rows_received=len(raw_rows),
+        rows_stored=len(ready),
+        created=created,
+        updated=len(ready) - created,
+        errors=sorted(errors, key=lambda e: e.row),
+    )
@@ -0,0 +1,97 @@
+"""
+services/module_service.py – Persist syllabus module content (syllabus_modules table)
+
+After a syllabus upload stores subjects, populate_modules() runs outside the request:
+one parse of the PDF in the extraction pool returns the modules of every uploaded
+subject code, and they are written for all affected subjects in one transaction.
+GET /subjects/{id}/modules then reads from the table instead of re-parsing the PDF.
+
+Configuration (environment):
+  SYLLABUS_MODULE_TIMEOUT default 600 – seconds module parsing may take
+"""
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, Iterable, List
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from database import SessionLocal
+import models
+from pdf_engine.syllabus_extractor import extract_subject_syllabus
+from services import extraction_pool
+
+logger = logging.getLogger(__name__)
+
+MODULE_TIMEOUT_S = float(os.getenv("SYLLABUS_MODULE_TIMEOUT", "600"))
+BATCH_SIZE = 500
+
+
+def store_modules(db: Session, modules_by_code: Dict[str, List[dict]],
+                  subject_ids_by_code: Dict[str, List[int]]) -> int:
+    """
+    Replace the modules of every subject in subject_ids_by_code with the parsed ones.
+    Codes without parsed modules keep what they had. Returns rows written.
+    """
+    rows, replaced = [], []
+    for code, subject_ids in subject_ids_by_code.items():
+        modules = modules_by_code.get(code)
+        if not modules:
+            continue
+        replaced.extend(subject_ids)
+        for subject_id in subject_ids:
+            rows.extend(
+                {
+                    "subject_id": subject_id,
+                    "module_number": m["module_number"],
+                    "module_title": m.get("module_title") or None,
+                    "topics": m.get("topics") or None,
+                    "learning_objectives": m.get("learning_objectives") or None,
+                }
+                for m in modules
+            )
+
+    for i in range(0, len(replaced), BATCH_SIZE):
+        db.execute(delete(models.SyllabusModule)
+                   .where(models.SyllabusModule.subject_id.in_(replaced[i:i + BATCH_SIZE])))
+    # render_nulls: otherwise the ORM splits the batch wherever a row's NULL columns differ
+    stmt = insert(models.SyllabusModule).execution_options(render_nulls=True)
+    for i in range(0, len(rows), BATCH_SIZE):
+        db.execute(stmt, rows[i:i + BATCH_SIZE])
+    db.commit()
+    return len(rows)
+
+
+def populate_modules(pdf_path: str, semester_ids: Iterable[int]):
+    """
+    Background task: parse modules for the subjects of these semesters and store them.
+    pdf_path must stay in place until this returns.
+    """
+    semester_ids = list(semester_ids)
+    try:
+        with SessionLocal() as db:
+            subject_ids_by_code = defaultdict(list)
+            for i in range(0, len(semester_ids), BATCH_SIZE):
+                for subject_id, code in (
+                    db.query(models.Subject.id, models.Course.subject_code)
+                    .join(models.Course, models.Course.id == models.Subject.course_id)
+                    .filter(models.Subject.semester_id.in_(semester_ids[i:i + BATCH_SIZE]))
+                ):
+                    subject_ids_by_code[code].append(subject_id)
+        if not subject_ids_by_code:
+            return
+
+        fut = extraction_pool.submit_when_free(extract_subject_syllabus, pdf_path, sorted(subject_ids_by_code))
+        try:
+            modules_by_code, warnings = fut.result(timeout=MODULE_TIMEOUT_S)
+        except FutureTimeout:
+            extraction_pool.abandon(fut)
+            raise
+
+        with SessionLocal() as db:
+            written = store_modules(db, modules_by_code, subject_ids_by_code)
+        found = sum(1 for code in subject_ids_by_code if modules_by_code.get(code))
+        logger.info(f"Stored {written} syllabus modules ({found}/{len(subject_ids_by_code)} subject codes "
+                    f"found) for {len(semester_ids)} semester(s)")
+    except Exception:
+        logger.exception(f"Module extraction failed for semesters {semester_ids[:10]}")
@@ -0,0 +1,136 @@
+"""
+services/recompute_service.py – Re-apply the CIE rules to every stored cie_records row
+
+After a scaling rule in services/cie_calculator.py (and its twin in cie_batch.py) changes,
+the stored ia_scaled, lab_test_scaled, final_cie and is_detained – and the is_detained
+copied onto see_marks – are stale. recompute_cie() walks cie_records in primary-key
+chunks, recomputes each chunk with compute_cie_batch, and writes back only the rows
+whose values differ (bulk UPDATE by primary key, one commit per chunk). Every semester
+with a rewritten row gets its semester_stats rebuilt and its cached marks summary dropped
+in the same commit – the summary shows the scaled components too.
+
+Used by recompute_cie.py (command line) and POST /admin/recompute-cie, and – limited to
+the enrollments of one course, with commit=False so it lands in the request's own
+transaction – when a course's subject type is corrected.
+"""
+import logging
+import math
+from collections import Counter
+from typing import Callable, Iterable, Optional
+import numpy as np
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+import models, schemas
+from services import stats_service
+from services.cie_batch import RAW_FIELDS, compute_cie_batch
+
+logger = logging.getLogger(__name__)
+
+COMPUTED_FIELDS = ("ia_scaled", "lab_test_scaled", "final_cie", "is_detained")
+DEFAULT_CHUNK = 2000
+MAX_SAMPLES = 20
+
+Progress = Callable[[schemas.CIERecomputeReport], None]
+
+
+def _stored(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _computed(value) -> Optional[float]:
+    return None if math.isnan(value) else float(value)
+
+
+def _chunk_rows(db: Session, after_id: int, size: int, course_ids: Optional[list]):
+    """Next `size` CIE records after after_id, with what the batch engine and the SEE sync need."""
+    stmt = (
+        select(
+            models.CIERecord.id, models.CIERecord.subject_id, models.Subject.semester_id,
+            models.Course.subject_type, models.Course.is_mandatory,
+            *(getattr(models.CIERecord, f) for f in RAW_FIELDS + COMPUTED_FIELDS),
+            models.SEEMark.id.label("see_id"), models.SEEMark.is_detained.label("see_detained"),
+        )
+        .join(models.Subject, models.Subject.id == models.CIERecord.subject_id)
+        .join(models.Course, models.Course.id == models.Subject.course_id)
+        .outerjoin(models.SEEMark, models.SEEMark.subject_id == models.CIERecord.subject_id)
+        .where(models.CIERecord.id > after_id)
+        .order_by(models.CIERecord.id)
+        .limit(size)
+    )
+    if course_ids is not None:
+        stmt = stmt.where(models.Subject.course_id.in_(course_ids))
+    return db.execute(stmt).mappings().all()
+
+
+def recompute_cie(db: Session, dry_run: bool = False, chunk_size: int = DEFAULT_CHUNK,
+                  progress: Optional[Progress] = None,
+                  course_ids: Optional[Iterable[int]] = None,
+                  commit: bool = True) -> schemas.CIERecomputeReport:
+    """
+    Recompute every CIE record – or only those of subjects enrolled in course_ids; with
+    dry_run nothing is written but the report is the same. progress, if given, is called
+    with the running report after each chunk. With commit=False the chunks are written
+    but left for the caller to commit (or roll back) with the rest of its transaction.
+    """
+    total = db.query(func.count(models.CIERecord.id))
+    if course_ids is not None:
+        course_ids = sorted(set(course_ids))
+        total = (total.join(models.Subject, models.Subject.id == models.CIERecord.subject_id)
+                 .filter(models.Subject.course_id.in_(course_ids)))
+    report = schemas.CIERecomputeReport(dry_run=dry_run, total=total.scalar())
+    field_changes, refreshed = Counter(), set()
+    last_id = 0
+
+    while rows := _chunk_rows(db, last_id, chunk_size, course_ids):
+        last_id = rows[-1]["id"]
+        batch = compute_cie_batch(
+            [r["subject_type"] for r in rows],
+            {f: [np.nan if r[f] is None else r[f] for r in rows] for f in RAW_FIELDS},
+            is_mandatory=[bool(r["is_mandatory"]) for r in rows],
+        )
+
+        cie_updates, see_updates, semesters = [], [], set()
+        for i, r in enumerate(rows):
+            new = {
+                "ia_scaled": _computed(batch["ia_scaled"][i]),
+                "lab_test_scaled": _computed(batch["lab_test_scaled"][i]),
+                "final_cie": _computed(batch["final_cie"][i]),
+                "is_detained": bool(batch["is_detained"][i]),
+            }
+            old = {f: _stored(r[f]) for f in ("ia_scaled", "lab_test_scaled", "final_cie")}
+            old["is_detained"] = bool(r["is_detained"])
+            changed = [f for f in COMPUTED_FIELDS if new[f] != old[f]]
+            if changed:
+                cie_updates.append({"id": r["id"], **new})
+                field_changes.update(changed)
+                semesters.add(r["semester_id"])
+                for f in changed:
+                    if len(report.samples) < MAX_SAMPLES:
+                        report.samples.append(schemas.CIERecomputeDiff(
+                            cie_record_id=r["id"], subject_id=r["subject_id"],
+                            field=f, old=old[f], new=new[f],
+                        ))
+            if r["see_id"] is not None and bool(r["see_detained"]) != new["is_detained"]:
+                see_updates.append({"id": r["see_id"], "is_detained": new["is_detained"]})
+                semesters.add(r["semester_id"])
+
+        report.scanned += len(rows)
+        report.changed += len(cie_updates)
+        report.see_changed += len(see_updates)
+        refreshed |= semesters
+        report.semesters_refreshed = len(refreshed)
+        if not dry_run and (cie_updates or see_updates):
+            if cie_updates:
+                db.execute(update(models.CIERecord), cie_updates)
+            if see_updates:
+                db.execute(update(models.SEEMark), see_updates)
+            stats_service.recompute(db, semesters)
+            if commit:
+                db.commit()
+
+        report.field_changes = dict(field_changes)
+        logger.info(f"CIE recompute{' (dry run)' if dry_run else ''}: {report.scanned}/{report.total} "
+                    f"scanned, {report.changed} changed, {report.see_changed} SEE flags")
+        if progress:
+            progress(report)
+    return report
@@ -0,0 +1,318 @@
+"""
+services/response_cache.py – Cache of read-endpoint responses, dropped by the write paths
+
+GET /students/{id}, /semesters/{id}, /semesters/{id}/subjects/ and
+/semesters/{id}/marks-summary are read far more often than marks change. Their
+responses are cached as JSON-ready data under "<endpoint>:<entity id>".
+
+Writes call invalidate(db, endpoint, ids) before committing: the keys are dropped
+right after the session commits (and forgotten on rollback), so a reader can never
+re-cache what the transaction is replacing. Every invalidation also bumps an epoch;
+a response loaded before the latest bump is returned but not stored.
+
+Backends:
+  memory  bounded LRU with TTL, per process (default). With several workers a
+          write only clears the cache of the worker that handled it, so the
+          others may serve the old response until RESPONSE_CACHE_TTL_S passes.
+  sqlite  a local SQLite file shared by all workers on the host (stand-in for a
+          shared cache server): one invalidation clears it for everyone.
+  off     no caching.
+
+Async handlers use lookup_async() / store_async(): the sqlite backend's file I/O then
+runs in the threadpool instead of blocking the event loop; the memory backend is called
+inline.
+
+Configuration (environment):
+  RESPONSE_CACHE_BACKEND      default memory              – memory | sqlite | off
+  RESPONSE_CACHE_MAX_ENTRIES  default 4096
+  RESPONSE_CACHE_TTL_S        default 300
+  RESPONSE_CACHE_PATH         default ./response_cache.db – sqlite backend only
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+import schemas
+
+logger = logging.getLogger(__name__)
+
+BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "4096"))
+TTL_S = float(os.getenv("RESPONSE_CACHE_TTL_S", "300"))
+SQLITE_PATH = os.getenv("RESPONSE_CACHE_PATH", "./response_cache.db")
+
+# Cached endpoints, keyed by the id in their path
+STUDENT = "get_student"
+SEMESTER = "get_semester"
+SUBJECTS = "list_subjects"
+MARKS_SUMMARY = "marks_summary"
+ENDPOINTS = (STUDENT, SEMESTER, SUBJECTS, MARKS_SUMMARY)
+
+_PENDING = "response_cache_keys"   # Session.info entry: keys to drop on commit
+
+
+def cache_key(endpoint: str, entity_id: int) -> str:
+    return f"{endpoint}:{entity_id}"
+
+
+# ── Backends ──────────────────────────────────────────────────────
+
+class MemoryBackend:
+    name = "memory"
+    blocking = False   # no I/O: safe to call from the event loop
+
+    def __init__(self, max_entries: int, ttl_s: float):
+        self.max_entries, self.ttl_s = max_entries, ttl_s
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()   # key → (expires, value)
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def epoch(self) -> int:
+        return self._epoch
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value, epoch: int):
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._data[key] = (time.monotonic() + self.ttl_s, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]):
+        with self._lock:
+            self._epoch += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """Same interface over a local SQLite file; eviction is by expiry (oldest first)."""
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int, ttl_s: float):
+        self.path, self.max_entries, self.ttl_s = path, max_entries, ttl_s
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_expires ON entries (expires)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (id INTEGER PRIMARY KEY CHECK (id = 1), epoch INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta (id, epoch) VALUES (1, 0)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def epoch(self) -> int:
+        return self._conn().execute("SELECT epoch FROM meta WHERE id = 1").fetchone()[0]
+
+    def get(self, key: str):
+        row = self._conn().execute("SELECT value FROM entries WHERE key = ? AND expires >= ?",
+                                   (key, time.time())).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, key: str, value, epoch: int):
+        now = time.time()
+        with self._conn() as conn:
+            stored = conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires) "
+                "SELECT ?, ?, ? FROM meta WHERE id = 1 AND epoch = ?",
+                (key, json.dumps(value), now + self.ttl_s, epoch),
+            ).rowcount
+            if stored:
+                conn.execute("DELETE FROM entries WHERE expires < ?", (now,))
+                conn.execute("DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY expires "
+                             "LIMIT max(0, (SELECT COUNT(*) FROM entries) - ?))", (self.max_entries,))
+
+    def delete(self, keys: Iterable[str]):
+        keys = list(keys)
+        with self._conn() as conn:
+            conn.execute("UPDATE meta SET epoch = epoch + 1 WHERE id = 1")
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                conn.execute(f"DELETE FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+
+    def size(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM entries WHERE expires >= ?", (time.time(),)).fetchone()[0]
+
+
+def _make_backend():
+    if BACKEND == "off":
+        return None
+    if BACKEND == "sqlite":
+        return SQLiteBackend(SQLITE_PATH, MAX_ENTRIES, TTL_S)
+    if BACKEND != "memory":
+        logger.warning(f"Unknown RESPONSE_CACHE_BACKEND={BACKEND!r}; using memory")
+    return MemoryBackend(MAX_ENTRIES, TTL_S)
+
+
+_backend = _make_backend()
+
+_lock = threading.Lock()
+_counters = {name: {"hits": 0, "misses": 0, "invalidated": 0} for name in ENDPOINTS}
+
+
+def _count(endpoint: str, name: str, n: int = 1):
+    with _lock:
+        _counters[endpoint][name] += n
+
+
+# ── Reads ─────────────────────────────────────────────────────────
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def _dump(schema, obj):
+    """Validate obj (ORM rows allowed) against the response schema; JSON-ready result."""
+    adapter = _adapters.get(schema)
+    if adapter is None:
+        adapter = _adapters[schema] = TypeAdapter(schema)
+    return jsonable_encoder(adapter.validate_python(obj, from_attributes=True))
+
+
+def lookup(endpoint: str, entity_id: int):
+    """Cached response and the epoch to store a fresh one with: (value or None, epoch)."""
+    if _backend is None:
+        return None, 0
+    key = cache_key(endpoint, entity_id)
+    try:
+        epoch = _backend.epoch()
+        value = _backend.get(key)
+    except sqlite3.Error as e:
+        logger.warning(f"Response cache read failed for {key}: {e}")
+        return None, None
+    _count(endpoint, "misses" if value is None else "hits")
+    return value, epoch
+
+
+def _set(endpoint: str, entity_id: int, value, epoch: Optional[int]):
+    if _backend is not None and epoch is not None:
+        try:
+            _backend.set(cache_key(endpoint, entity_id), value, epoch)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed for {endpoint}:{entity_id}: {e}")
+
+
+def store(endpoint: str, entity_id: int, schema, obj, epoch: Optional[int]):
+    """Serialise obj as the endpoint's response, cache it unless an invalidation intervened."""
+    value = _dump(schema, obj)
+    _set(endpoint, entity_id, value, epoch)
+    return value
+
+
+def get_or_load(endpoint: str, entity_id: int, schema, load: Callable[[], Any]):
+    """Cached response, or load() (which may raise, e.g. 404 – not cached) and cache it."""
+    value, epoch = lookup(endpoint, entity_id)
+    if value is not None:
+        return value
+    return store(endpoint, entity_id, schema, load(), epoch)
+
+
+def _blocking() -> bool:
+    return _backend is not None and _backend.blocking
+
+
+async def lookup_async(endpoint: str, entity_id: int):
+    """lookup() for async handlers; a backend doing file I/O is read in the threadpool."""
+    if _blocking():
+        return await run_in_threadpool(lookup, endpoint, entity_id)
+    return lookup(endpoint, entity_id)
+
+
+async def store_async(endpoint: str, entity_id: int, schema, obj, epoch: Optional[int]):
+    """store() for async handlers: serialised on the loop (obj may be ORM rows), written in the threadpool."""
+    value = _dump(schema, obj)
+    if _blocking():
+        await run_in_threadpool(_set, endpoint, entity_id, value, epoch)
+    else:
+        _set(endpoint, entity_id, value, epoch)
+    return value
+
+
+# ── Invalidation ──────────────────────────────────────────────────
+
+def invalidate(db: Session, endpoints: Iterable[str], entity_ids: Iterable[int]):
+    """Drop these endpoints' responses for these ids once db commits. Does not commit."""
+    keys = {cache_key(e, i) for e in endpoints for i in entity_ids}
+    if keys:
+        db.info.setdefault(_PENDING, set()).update(keys)
+
+
+def invalidate_semesters(db: Session, semester_ids: Iterable[int]):
+    """Subjects or marks of these semesters changed."""
+    invalidate(db, (SUBJECTS, MARKS_SUMMARY), semester_ids)
+
+
+def _drop(keys: set):
+    if _backend is None or not keys:
+        return
+    try:
+        _backend.delete(keys)
+    except sqlite3.Error as e:
+        logger.error(f"Response cache invalidation failed ({len(keys)} keys): {e}")
+        return
+    for key in keys:
+        _count(key.split(":", 1)[0], "invalidated")
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session):
+    _drop(session.info.pop(_PENDING, set()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session):
+    session.info.pop(_PENDING, None)
+
+
+# ── Metrics ───────────────────────────────────────────────────────
+
+def stats() -> schemas.ResponseCacheStats:
+    with _lock:
+        counters = {name: dict(c) for name, c in _counters.items()}
+    try:
+        entries = _backend.size() if _backend is not None else 0
+    except sqlite3.Error:
+        entries = -1
+    return schemas.ResponseCacheStats(
+        backend=_backend.name if _backend is not None else "off",
+        entries=entries,
+        max_entries=MAX_ENTRIES,
+        ttl_s=TTL_S,
+        endpoints=[
+            schemas.EndpointCacheStats(
+                endpoint=name, **c,
+                hit_rate=round(c["hits"] / (c["hits"] + c["misses"]), 4) if c["hits"] + c["misses"] else 0.0,
+            )
+            for name, c in counters.items()
+        ],
+    )
@@ -0,0 +1,111 @@
+"""
+services/search_service.py – Full-text search over syllabus modules (SQLite FTS5)
+
+syllabus_modules_fts is an external-content FTS5 index over module_title, topics and
+learning_objectives of syllabus_modules. Triggers keep it in step with every insert,
+update and delete, so modules written after an upload are searchable immediately.
+Other databases have no index; the search endpoint reports 501 there.
+"""
+import logging
+import re
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+import schemas
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "syllabus_modules_fts"
+
+available = False  # set by ensure_module_index() at startup
+
+_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        module_title, topics, learning_objectives,
+        content='syllabus_modules', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS syllabus_modules_fts_ai AFTER INSERT ON syllabus_modules BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, module_title, topics, learning_objectives)
+        VALUES (new.id, new.module_title, new.topics, new.learning_objectives);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS syllabus_modules_fts_ad AFTER DELETE ON syllabus_modules BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, module_title, topics, learning_objectives)
+        VALUES ('delete', old.id, old.module_title, old.topics, old.learning_objectives);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS syllabus_modules_fts_au AFTER UPDATE ON syllabus_modules BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, module_title, topics, learning_objectives)
+        VALUES ('delete', old.id, old.module_title, old.topics, old.learning_objectives);
+        INSERT INTO {FTS_TABLE}(rowid, module_title, topics, learning_objectives)
+        VALUES (new.id, new.module_title, new.topics, new.learning_objectives);
+    END""",
+]
+
+# Title matches weigh most, then learning objectives, then topics (bm25: lower = better)
+_BM25 = f"bm25({FTS_TABLE}, 5.0, 1.0, 2.0)"
+
+# Cohort uploads copy one module to every student's subject: return each
+# (subject_code, module_number) once, with how many matching copies exist.
+_SEARCH_SQL = f"""
+SELECT module_id, subject_id, subject_code, subject_name, module_number, module_title,
+       snippet, score, copies
+FROM (
+    SELECT hits.*,
+           ROW_NUMBER() OVER (PARTITION BY subject_code, module_number ORDER BY score, module_id) AS rn,
+           COUNT(*) OVER (PARTITION BY subject_code, module_number) AS copies
+    FROM (
+        SELECT m.id AS module_id, m.subject_id, c.subject_code, c.subject_name,
+               m.module_number, m.module_title,
+               snippet({FTS_TABLE}, -1, '[', ']', '…', 12) AS snippet,
+               {_BM25} AS score
+        FROM {FTS_TABLE}
+        JOIN syllabus_modules m ON m.id = {FTS_TABLE}.rowid
+        JOIN subjects s ON s.id = m.subject_id
+        JOIN courses c ON c.id = s.course_id
+        WHERE {FTS_TABLE} MATCH :q
+    ) AS hits
+)
+WHERE rn = 1
+ORDER BY score, module_id
+LIMIT :limit OFFSET :offset
+"""
+
+
+def ensure_module_index(engine: Engine) -> bool:
+    """Create the FTS index and triggers if missing (SQLite only). Returns False if unavailable."""
+    global available
+    if engine.dialect.name != "sqlite":
+        return False
+    try:
+        with engine.begin() as conn:
+            created = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :n"), {"n": FTS_TABLE}
+            ).first() is None
+            for stmt in _DDL:
+                conn.execute(text(stmt))
+            if created:  # index modules stored before the index existed
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        available = True
+        return True
+    except Exception as exc:  # SQLite built without FTS5
+        logger.warning(f"Module search disabled: {exc}")
+        return False
+
+
+def fts_query(q: str) -> str:
+    """
+    User text → FTS5 query: every word must match, the last one as a prefix so
+    partial input ("karna") still finds results. Words are quoted so punctuation
+    and FTS5 operators in the input cannot cause syntax errors.
+    """
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+async def search_modules(db: AsyncSession, q: str, limit: int, offset: int) -> List[schemas.ModuleSearchHit]:
+    result = await db.execute(text(_SEARCH_SQL), {"q": q, "limit": limit, "offset": offset})
+    return [schemas.ModuleSearchHit.model_validate(dict(row)) for row in result.mappings()]
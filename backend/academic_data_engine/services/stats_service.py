@@ -0,0 +1,157 @@
+"""
+services/stats_service.py – semester_stats maintenance (totals, credits, SGPA per semester)
+
+Marks writes call recompute() for the semesters they touched before committing, so the
+stats row changes in the same transaction as the marks. A semester has a handful of
+subjects, so the affected rows are rebuilt from one query rather than patched with
+deltas. Writes that change subjects or courses call invalidate*() instead; a missing
+row is rebuilt by get_stats() on the next read. Both also drop the cohort rank-list
+snapshots (services/cohort_service.py) and cached responses (services/response_cache.py)
+of the semesters concerned.
+
+Grade points are taken from CIE + SEE out of 100 on the 10-point scale of
+academic_analyzer/gpa_calculator.py, with one deviation: its marks_to_grade_point() is a
+dashboard estimate that gives 5 to everything below 50, while a stored SGPA has to fail a
+subject, so here 40–49 is 5 and below PASS_MARKS is 0. credits_earned counts the Complete
+subjects at or above PASS_MARKS. Subjects without marks yet count as 0, so SGPA is
+provisional until status is "complete".
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+import models
+from services import cohort_service, response_cache
+from services.summary_service import FINAL_STATUSES, subject_status
+
+PASS_MARKS = 40
+GRADE_POINTS = ((90, 10), (80, 9), (70, 8), (60, 7), (50, 6), (PASS_MARKS, 5))
+CHUNK = 500
+
+
+def grade_point(marks: float) -> int:
+    """Grade point of CIE + SEE marks; 0 (fail) below PASS_MARKS."""
+    for floor, gp in GRADE_POINTS:
+        if marks >= floor:
+            return gp
+    return 0
+
+
+def _empty() -> dict:
+    return {
+        "subjects_total": 0, "subjects_complete": 0, "detained_count": 0,
+        "total_cie": 0.0, "total_see": 0.0, "credits_total": 0.0, "credits_earned": 0.0,
+        "weighted_gp": 0.0,
+    }
+
+
+def _aggregate(db: Session, semester_ids: list) -> Dict[int, dict]:
+    acc = {sid: _empty() for sid in semester_ids}
+    for i in range(0, len(semester_ids), CHUNK):
+        rows = db.execute(
+            select(
+                models.Subject.semester_id, models.Course.credits, models.Course.is_mandatory,
+                models.CIERecord.final_cie, models.CIERecord.is_detained,
+                models.SEEMark.reduced_scored, models.SEEMark.is_absent,
+            )
+            .join(models.Course, models.Course.id == models.Subject.course_id)
+            .outerjoin(models.CIERecord, models.CIERecord.subject_id == models.Subject.id)
+            .outerjoin(models.SEEMark, models.SEEMark.subject_id == models.Subject.id)
+            .where(models.Subject.semester_id.in_(semester_ids[i:i + CHUNK]),
+                   models.Subject.is_chosen.is_(True))
+        )
+        for sid, credits, mandatory, cie, detained, see, absent in rows:
+            a = acc[sid]
+            status = subject_status(cie, bool(detained), see, bool(absent), mandatory)
+            a["subjects_total"] += 1
+            a["subjects_complete"] += status in FINAL_STATUSES
+            a["detained_count"] += status == "Detained"
+            if mandatory:  # MC: CIE /100, no SEE, no credits
+                continue
+            marks = (cie or 0.0) + (see or 0.0)
+            gp = grade_point(marks)
+            a["total_cie"] += cie or 0.0
+            a["total_see"] += see or 0.0
+            a["credits_total"] += credits
+            a["weighted_gp"] += gp * credits
+            if status == "Complete" and marks >= PASS_MARKS:
+                a["credits_earned"] += credits
+    return acc
+
+
+def _status(a: dict) -> str:
+    if a["subjects_total"] and a["subjects_complete"] == a["subjects_total"]:
+        return "complete"
+    if a["subjects_complete"] or a["total_cie"] or a["total_see"]:
+        return "in_progress"
+    return "pending"
+
+
+def recompute(db: Session, semester_ids: Iterable[int]) -> Dict[int, models.SemesterStats]:
+    """Rebuild the stats rows of these semesters after a marks write. Does not commit."""
+    semester_ids = sorted(set(semester_ids))
+    cohort_service.invalidate(db, semester_ids)
+    response_cache.invalidate(db, [response_cache.MARKS_SUMMARY], semester_ids)
+    return fill(db, semester_ids)
+
+
+def fill(db: Session, semester_ids: Iterable[int]) -> Dict[int, models.SemesterStats]:
+    """Write the stats rows of these semesters from their current marks. Does not commit."""
+    semester_ids = sorted(set(semester_ids))
+    if not semester_ids:
+        return {}
+    db.flush()  # sessions run with autoflush off: make staged marks visible to the query
+    existing = {}
+    for i in range(0, len(semester_ids), CHUNK):
+        existing.update(
+            (s.semester_id, s) for s in db.query(models.SemesterStats)
+            .filter(models.SemesterStats.semester_id.in_(semester_ids[i:i + CHUNK]))
+        )
+
+    result = {}
+    now = datetime.utcnow()
+    for sid, a in _aggregate(db, semester_ids).items():
+        stats = existing.get(sid) or models.SemesterStats(semester_id=sid)
+        for field in ("subjects_total", "subjects_complete", "detained_count", "credits_total", "credits_earned"):
+            setattr(stats, field, a[field])
+        stats.total_cie = round(a["total_cie"], 2)
+        stats.total_see = round(a["total_see"], 2)
+        stats.sgpa = round(a["weighted_gp"] / a["credits_total"], 2) if a["credits_total"] else None
+        stats.status = _status(a)
+        stats.updated_at = now
+        db.add(stats)
+        result[sid] = stats
+    return result
+
+
+def invalidate(db: Session, semester_ids: Iterable[int]):
+    """Drop the stats of these semesters (subjects added / removed / re-chosen). Does not commit."""
+    semester_ids = list(set(semester_ids))
+    cohort_service.invalidate(db, semester_ids)
+    response_cache.invalidate_semesters(db, semester_ids)
+    for i in range(0, len(semester_ids), CHUNK):
+        db.execute(delete(models.SemesterStats)
+                   .where(models.SemesterStats.semester_id.in_(semester_ids[i:i + CHUNK])))
+
+
+def invalidate_courses(db: Session, course_ids: Iterable[int]):
+    """Drop the stats of every semester enrolled in these courses (credits / type changed)."""
+    course_ids = list(set(course_ids))
+    for i in range(0, len(course_ids), CHUNK):
+        enrolled = select(models.Subject.semester_id).where(models.Subject.course_id.in_(course_ids[i:i + CHUNK]))
+        cohort_service.invalidate(db, enrolled)
+        response_cache.invalidate_semesters(db, db.scalars(enrolled).all())
+        db.execute(delete(models.SemesterStats)
+                   .where(models.SemesterStats.semester_id.in_(enrolled)))
+
+
+def get_stats(db: Session, semester_id: int) -> Optional[models.SemesterStats]:
+    """Stored stats (one primary-key read), rebuilt first if missing. None if no such semester."""
+    stats = db.get(models.SemesterStats, semester_id)
+    if stats is not None:
+        return stats
+    if db.get(models.Semester, semester_id) is None:
+        return None
+    stats = fill(db, [semester_id])[semester_id]
+    db.commit()
+    return stats
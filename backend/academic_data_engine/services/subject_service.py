@@ -1,9 +1,18 @@
 """
 services/subject_service.py – Subject creation from PDF-extracted rows
 """
+import logging
 import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-import models
+from sqlalchemy.orm.attributes import get_history
+import models, schemas
+from services import recompute_service, stats_service
+
+logger = logging.getLogger(__name__)
 
 
 def normalize_code(code: str) -> str:
@@ -37,24 +46,212 @@ def create_subject_from_row(row_dict: dict) -> dict:
     }
 
 
-def upsert_subject(db: Session, semester_id: int, subject_data: dict) -> tuple:
-    """Insert or update a subject. Returns (subject, created: bool)."""
-    code = subject_data["subject_code"]
-    existing = db.query(models.Subject).filter(
-        models.Subject.semester_id == semester_id,
-        models.Subject.subject_code == code,
+def split_subject_data(subject_data: dict) -> Tuple[dict, dict]:
+    """Split a subject dict into its Course (catalog) fields and its enrollment fields."""
+    course = {f: subject_data[f] for f in models.COURSE_FIELDS if f in subject_data}
+    enrollment = {f: v for f, v in subject_data.items() if f not in models.COURSE_FIELDS}
+    return course, enrollment
+
+
+# Catalog fields a syllabus upload does not overwrite on an existing course: they are
+# corrected by hand (PUT /subjects/{id}), and the type decides every stored CIE value.
+UPLOAD_KEEPS = ("subject_type", "credits", "is_mandatory")
+# Course fields the stored CIE / detention of its enrollments are computed from
+CIE_RULE_FIELDS = ("subject_type", "is_mandatory")
+
+
+def get_or_create_course(db: Session, scheme: str, course_data: dict, keep: Iterable[str] = ()) -> models.Course:
+    """
+    Catalog entry for (scheme, subject_code), created if missing. Fields given in
+    course_data overwrite the catalog (except those in keep), so every student on the
+    scheme sees the change. Does not commit.
+    """
+    course = db.query(models.Course).filter(
+        models.Course.scheme == scheme,
+        models.Course.subject_code == course_data["subject_code"],
     ).first()
+    if course is None:
+        course = models.Course(scheme=scheme, **course_data)
+        db.add(course)
+        db.flush()
+    else:
+        for field, val in course_data.items():
+            if field not in keep:
+                setattr(course, field, val)
+    return course
+
+
+def recompute_if_rules_changed(db: Session, course: models.Course):
+    """
+    Re-apply the CIE rules to every enrollment of course if its type or MC flag has
+    unflushed changes. Call before anything flushes the session. Does not commit: the
+    recomputed rows are part of the caller's transaction.
+    """
+    if any(get_history(course, f).has_changes() for f in CIE_RULE_FIELDS):
+        db.flush()
+        recompute_service.recompute_cie(db, course_ids=[course.id], commit=False)
+
+
+def prepare_subject_rows(extracted_rows: List[dict], warnings: List[str]) -> List[dict]:
+    """
+    create_subject_from_row() for each row, dropping zero-credit rows. A code listed
+    twice keeps its last row, as the old row-by-row upsert did.
+    """
+    prepared: Dict[str, dict] = {}
+    for row in extracted_rows:
+        subject_data = create_subject_from_row(row)
+        code = subject_data["subject_code"]
+        if subject_data["credits"] <= 0 and not subject_data["is_mandatory"]:
+            warnings.append(f"Skipped '{code}' – credits = 0 (likely a header row).")
+            continue
+        prepared.pop(code, None)
+        prepared[code] = subject_data
+    return list(prepared.values())
+
+
+UPSERT_CHUNK = 500  # rows per INSERT statement (keeps bound parameters well under SQLite's limit)
+_DIALECT_INSERT = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+
+
+def _chunks(items: list, size: int = UPSERT_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _semester_schemes(db: Session, semester_ids: List[int]) -> Dict[int, str]:
+    schemes = {}
+    for chunk in _chunks(semester_ids):
+        schemes.update(
+            db.query(models.Semester.id, models.Student.scheme)
+            .join(models.Student, models.Student.id == models.Semester.student_id)
+            .filter(models.Semester.id.in_(chunk))
+        )
+    return schemes
+
 
-    if existing:
-        for field, val in subject_data.items():
-            if hasattr(existing, field):
-                setattr(existing, field, val)
-        db.commit()
-        db.refresh(existing)
-        return existing, False
+def _course_ids(db: Session, keys: set) -> Dict[Tuple[str, str], int]:
+    """{(scheme, subject_code): course id} for the given keys."""
+    ids = {}
+    for scheme in {s for s, _ in keys}:
+        codes = sorted(c for s, c in keys if s == scheme)
+        for chunk in _chunks(codes):
+            for course_id, code in db.query(models.Course.id, models.Course.subject_code).filter(
+                models.Course.scheme == scheme, models.Course.subject_code.in_(chunk)
+            ):
+                ids[(scheme, code)] = course_id
+    return ids
 
-    subject = models.Subject(semester_id=semester_id, **subject_data)
-    db.add(subject)
+
+def _existing_enrollments(db: Session, semester_ids: List[int]) -> Dict[Tuple[int, int], models.Subject]:
+    existing = {}
+    for chunk in _chunks(semester_ids):
+        for subj in db.query(models.Subject).filter(models.Subject.semester_id.in_(chunk)):
+            existing[(subj.semester_id, subj.course_id)] = subj
+    return existing
+
+
+def _upsert_rows(db: Session, dialect_insert, table, values: List[dict], keys: List[str],
+                 keep: Iterable[str] = ()):
+    """INSERT ... ON CONFLICT (keys) DO UPDATE (leaving the keep columns), UPSERT_CHUNK rows per statement."""
+    for chunk in _chunks(values):
+        stmt = dialect_insert(table).values(chunk)
+        # ON CONFLICT skips the ORM's onupdate, so updated_at is set explicitly
+        update_cols = [c for c in chunk[0] if c not in keys and c not in keep and c != "created_at"]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={c: stmt.excluded[c] for c in update_cols},
+        )
+        db.execute(stmt)
+
+
+def upsert_subjects(db: Session, subjects_by_semester: Dict[int, List[dict]]) -> Dict[int, Tuple[int, int]]:
+    """
+    Insert or update subjects for one or many semesters in a single transaction.
+    subjects_by_semester: {semester_id: [subject_data, ...]} (codes unique per semester).
+    Returns {semester_id: (inserted, updated)}.
+
+    Each code becomes one Course per scheme – an existing catalog entry gets the new
+    name and L-T-P but keeps its UPLOAD_KEEPS fields – then one enrollment per semester. On SQLite / PostgreSQL both steps are
+    INSERT ... ON CONFLICT DO UPDATE per UPSERT_CHUNK rows; other databases fall back
+    to ORM inserts/updates.
+    """
+    schemes = _semester_schemes(db, list(subjects_by_semester))
+    catalog: Dict[Tuple[str, str], dict] = {}
+    for semester_id, rows in subjects_by_semester.items():
+        for subject_data in rows:
+            course_data, _ = split_subject_data(subject_data)
+            catalog[(schemes[semester_id], subject_data["subject_code"])] = course_data
+
+    dialect_insert = _DIALECT_INSERT.get(db.get_bind().dialect.name)
+    now = datetime.utcnow()
+    if dialect_insert is None:
+        course_ids = {key: get_or_create_course(db, key[0], data, keep=UPLOAD_KEEPS).id
+                      for key, data in catalog.items()}
+    else:
+        _upsert_rows(db, dialect_insert, models.Course,
+                     [{**data, "scheme": scheme, "created_at": now, "updated_at": now}
+                      for (scheme, _), data in catalog.items()],
+                     ["scheme", "subject_code"], keep=UPLOAD_KEEPS)
+        course_ids = _course_ids(db, set(catalog))
+
+    existing = _existing_enrollments(db, list(subjects_by_semester))
+    counts, enrollments = {}, []
+    for semester_id, rows in subjects_by_semester.items():
+        updated = 0
+        for subject_data in rows:
+            course_id = course_ids[(schemes[semester_id], subject_data["subject_code"])]
+            updated += (semester_id, course_id) in existing
+            _, enrollment = split_subject_data(subject_data)
+            enrollments.append({**enrollment, "semester_id": semester_id, "course_id": course_id})
+        counts[semester_id] = (len(rows) - updated, updated)
+
+    if dialect_insert is None:
+        for row in enrollments:
+            subj = existing.get((row["semester_id"], row["course_id"]))
+            if subj is None:
+                db.add(models.Subject(**row))
+            else:
+                for field, val in row.items():
+                    setattr(subj, field, val)
+    else:
+        _upsert_rows(db, dialect_insert, models.Subject,
+                     [{**row, "created_at": now, "updated_at": now} for row in enrollments],
+                     ["semester_id", "course_id"])
+    db.flush()
+    # catalog changes reach every semester enrolled in these courses, not only the uploaded ones
+    stats_service.invalidate_courses(db, course_ids.values())
     db.commit()
-    db.refresh(subject)
-    return subject, True
+    return counts
+
+
+def store_extracted_subjects(db: Session, semester_id: int, extracted_rows: List[dict],
+                             warnings: List[str]) -> schemas.SyllabusUploadResponse:
+    """Store PDF-extracted rows into a semester; shared by the upload route and the job worker."""
+    if not extracted_rows:
+        warnings.append(
+            "No subjects could be extracted from this PDF. "
+            "Please use manual entry or check that the PDF contains a proper subject table."
+        )
+
+    inserted = updated = 0
+    subjects = prepare_subject_rows(extracted_rows, warnings)
+    if subjects:
+        try:
+            inserted, updated = upsert_subjects(db, {semester_id: subjects})[semester_id]
+        except Exception as exc:
+            db.rollback()
+            logger.exception(f"Storing subjects for semester {semester_id} failed")
+            warnings.append(f"Could not store the extracted subjects: {exc}")
+
+    stored = inserted + updated
+    logger.info(f"Stored {stored}/{len(extracted_rows)} subjects for semester {semester_id} "
+                f"({inserted} new, {updated} updated)")
+
+    return schemas.SyllabusUploadResponse(
+        semester_id=semester_id,
+        subjects_extracted=len(extracted_rows),
+        subjects_stored=stored,
+        subjects_inserted=inserted,
+        subjects_updated=updated,
+        warnings=warnings,
+    )
@@ -0,0 +1,95 @@
+"""
+services/summary_service.py – Marks-summary read model (CIE + SEE per subject)
+
+The summary touches every subject's CIE and SEE row, so semesters are always loaded
+through semester_tree_options() – one joined SELECT instead of 1 + 3N + … lazy loads.
+"""
+from sqlalchemy.orm import joinedload
+import models, schemas
+
+
+def semester_tree_options():
+    """Loader options that pull a semester's subjects with their course, CIE and SEE rows in the same query."""
+    subjects = joinedload(models.Semester.subjects)
+    return (
+        # "unnested": a flat LEFT JOIN, so SQLite searches subjects by semester_id instead
+        # of materialising (subjects JOIN courses) and scanning it
+        subjects.joinedload(models.Subject.course, innerjoin="unnested"),
+        subjects.joinedload(models.Subject.cie_record),
+        subjects.joinedload(models.Subject.see_mark),
+    )
+
+
+FINAL_STATUSES = ("Complete", "Detained", "Absent")
+
+
+def subject_status(final_cie, detained: bool, see_reduced, is_absent: bool, is_mandatory: bool) -> str:
+    """Pending / CIE Only / Complete / Detained / Absent for one subject's marks."""
+    if detained:
+        return "Detained"
+    if is_absent:
+        return "Absent"
+    if final_cie is not None and (see_reduced is not None or is_mandatory):
+        return "Complete"
+    if final_cie is not None:
+        return "CIE Only"
+    return "Pending"
+
+
+def build_subject_summary(subj: models.Subject) -> schemas.SubjectMarksSummary:
+    """Build a SubjectMarksSummary for one subject from DB."""
+    cie = subj.cie_record
+    see = subj.see_mark
+
+    # Pull CIE components
+    ia1      = cie.ia_test1_raw      if cie else None
+    ia2      = cie.ia_test2_raw      if cie else None
+    ia_sc    = cie.ia_scaled         if cie else None
+    cce      = cie.cce_marks         if cie else None
+    lab_rec  = cie.lab_record_marks  if cie else None
+    lt1      = cie.lab_test1_raw     if cie else None
+    lt2      = cie.lab_test2_raw     if cie else None
+    lt_sc    = cie.lab_test_scaled   if cie else None
+    direct   = cie.direct_cie_marks  if cie else None
+    final_cie = cie.final_cie        if cie else None
+    detained = cie.is_detained       if cie else False
+
+    see_raw     = see.raw_scored     if see else None
+    see_reduced = see.reduced_scored if see else None
+    is_absent   = see.is_absent      if see else False
+
+    status = subject_status(final_cie, detained, see_reduced, is_absent, subj.is_mandatory)
+
+    return schemas.SubjectMarksSummary(
+        subject_id=subj.id,
+        subject_code=subj.subject_code,
+        subject_name=subj.subject_name,
+        subject_type=subj.subject_type.value,
+        credits=subj.credits,
+        is_mandatory=subj.is_mandatory,
+        ia_test1_raw=ia1,
+        ia_test2_raw=ia2,
+        ia_scaled=ia_sc,
+        cce_marks=cce,
+        lab_record_marks=lab_rec,
+        lab_test1_raw=lt1,
+        lab_test2_raw=lt2,
+        lab_test_scaled=lt_sc,
+        direct_cie_marks=direct,
+        final_cie=final_cie,
+        is_detained=detained,
+        see_raw=see_raw,
+        see_reduced=see_reduced,
+        is_absent=is_absent,
+        status=status,
+    )
+
+
+def build_semester_summary(sem: models.Semester) -> schemas.SemesterMarksSummary:
+    """Summary for one semester (chosen subjects only). Expects semester_tree_options() loading."""
+    return schemas.SemesterMarksSummary(
+        semester_id=sem.id,
+        semester_number=sem.semester_number,
+        academic_year=sem.academic_year,
+        subjects=[build_subject_summary(s) for s in sem.subjects if s.is_chosen],
+    )
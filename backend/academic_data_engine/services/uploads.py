@@ -0,0 +1,130 @@
+"""
+services/uploads.py – Streaming syllabus uploads: size cap, staging on disk, cleanup
+
+An uploaded PDF is never held in memory whole. UploadSizeLimit answers 413 as soon as
+an upload body is known to be too large – from Content-Length before any of it is
+read, otherwise the moment the received bytes cross the limit – and staged_pdf()
+copies the file part to a temp file in CHUNK_BYTES pieces, hashing it on the way.
+The pdf_engine then opens the file by path, in the extraction worker processes too.
+
+Configuration (environment):
+  MAX_PDF_MB      default 20              – largest accepted syllabus PDF
+  UPLOAD_TMP_DIR  default system temp dir – where uploads wait while they are parsed
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from typing import NamedTuple
+from fastapi import BackgroundTasks, HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+MAX_PDF_MB = float(os.getenv("MAX_PDF_MB", "20"))
+MAX_PDF_BYTES = int(MAX_PDF_MB * 1024 * 1024)
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+CHUNK_BYTES = 1024 * 1024
+MULTIPART_SLACK = 64 * 1024      # boundary and part headers around the file
+UPLOAD_PATH_PREFIX = "/upload-syllabus"
+
+
+def _too_large_detail() -> str:
+    return f"PDF exceeds {MAX_PDF_MB:g} MB limit."
+
+
+# ── Early rejection ───────────────────────────────────────────────
+
+class UploadSizeLimit:
+    """ASGI middleware: 413 for syllabus upload bodies over the limit, without buffering them."""
+
+    def __init__(self, app, max_body: int = MAX_PDF_BYTES + MULTIPART_SLACK):
+        self.app = app
+        self.max_body = max_body
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(UPLOAD_PATH_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_body:
+            await JSONResponse({"detail": _too_large_detail()}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    # raised inside form parsing, so FastAPI turns it into the 413 response
+                    raise HTTPException(status_code=413, detail=_too_large_detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+# ── Staging ───────────────────────────────────────────────────────
+
+class StagedPdf(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+
+
+def discard(path: str):
+    """Remove a staged PDF; already gone (e.g. moved to the job queue) is fine."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove staged upload {path}: {e}")
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def stage_pdf(file: UploadFile) -> StagedPdf:
+    """Copy an uploaded PDF to a temp file chunk by chunk, enforcing MAX_PDF_MB as it goes."""
+    if not (file.filename or "").lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
+
+    digest, size = hashlib.sha256(), 0
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=UPLOAD_TMP_DIR)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_PDF_BYTES:
+                    raise HTTPException(status_code=413, detail=_too_large_detail())
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        discard(path)
+        raise
+    return StagedPdf(path, digest.hexdigest(), size)
+
+
+@asynccontextmanager
+async def staged_pdf(file: UploadFile, background_tasks: BackgroundTasks):
+    """
+    stage_pdf() for one request. The file is removed after the request's background
+    tasks (queued inside the block) have run, or at once if the block raises.
+    """
+    pdf = await stage_pdf(file)
+    try:
+        yield pdf
+    except BaseException:
+        discard(pdf.path)
+        raise
+    background_tasks.add_task(discard, pdf.path)
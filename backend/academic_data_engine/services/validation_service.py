@@ -8,9 +8,9 @@ import models
 
 def check_duplicate_subject(db: Session, semester_id: int, subject_code: str, exclude_id: int = None):
     """Raise 409 if subject_code already exists in the semester."""
-    query = db.query(models.Subject).filter(
+    query = db.query(models.Subject.id).join(models.Course).filter(
         models.Subject.semester_id == semester_id,
-        models.Subject.subject_code == subject_code.strip().upper(),
+        models.Course.subject_code == subject_code.strip().upper(),
     )
     if exclude_id:
         query = query.filter(models.Subject.id != exclude_id)
@@ -0,0 +1,97 @@
+"""
+tests/conftest.py – Shared fixtures: a throwaway SQLite database and the app client
+
+The app modules read their configuration at import time, so the environment is set
+before anything from the engine is imported. Run from backend/academic_data_engine:
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_TMP = tempfile.mkdtemp(prefix="academic-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+os.environ["RESPONSE_CACHE_BACKEND"] = "off"
+os.environ["SYLLABUS_JOB_DIR"] = os.path.join(_TMP, "job_files")
+os.environ["UPLOAD_TMP_DIR"] = _TMP
+sys.path.insert(0, ENGINE_DIR)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import main  # creates and migrates the tables
+import models
+from database import Base, SessionLocal, engine
+
+
+def clear_database():
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture
+def db():
+    """Session on an emptied database."""
+    clear_database()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """App client; not entered as a context manager, so the job workers stay stopped."""
+    return TestClient(main.app)
+
+
+@contextmanager
+def count_statements(bind):
+    """Collects (statement, parameters) for the SQL executed on bind (an Engine) while the block runs."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(bind, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", _record)
+
+
+def add_students(db, n, semester_number=3, academic_year="2025-26", branch="CSE", scheme="2024",
+                 usn_prefix="1RN24CS"):
+    """n students with one semester each; returns the semesters."""
+    semesters = []
+    for i in range(n):
+        student = models.Student(name=f"Student {i}", usn=f"{usn_prefix}{i:03d}", branch=branch, scheme=scheme)
+        sem = models.Semester(student=student, semester_number=semester_number, academic_year=academic_year)
+        db.add_all([student, sem])
+        semesters.append(sem)
+    db.commit()
+    return semesters
+
+
+def add_subjects(db, semester, n, scheme="2024", with_marks=True):
+    """n PCC subjects on semester (courses created as needed), with CIE and SEE marks."""
+    subjects = []
+    for i in range(n):
+        code = f"BCS3{i:02d}"
+        course = (db.query(models.Course).filter_by(scheme=scheme, subject_code=code).first()
+                  or models.Course(scheme=scheme, subject_code=code, subject_name=f"Course {i}", credits=3))
+        subject = models.Subject(semester=semester, course=course)
+        if with_marks:
+            subject.cie_record = models.CIERecord(ia_test1_raw=40, ia_test2_raw=30, ia_scaled=21,
+                                                  cce_marks=15, final_cie=36)
+            subject.see_mark = models.SEEMark(raw_scored=70, reduced_scored=35)
+        db.add(subject)
+        subjects.append(subject)
+    db.commit()
+    return subjects
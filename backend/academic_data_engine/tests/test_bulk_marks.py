@@ -0,0 +1,96 @@
+"""
+tests/test_bulk_marks.py – POST /marks/cie/bulk and /marks/see/bulk: JSON and CSV bodies, row errors, limits
+"""
+import models, schemas
+from conftest import add_students, add_subjects, count_statements
+from database import engine
+from routers import marks as marks_router
+from services import marks_service
+
+CIE = {"ia_test1_raw": 40, "ia_test2_raw": 40, "cce_marks": 15}   # PCC: 24 + 15
+
+
+def test_json_rows_by_id_and_by_usn(client, db):
+    sem = add_students(db, 1)[0]
+    first, second = add_subjects(db, sem, 2, with_marks=False)
+    ids = first.id, second.id
+
+    resp = client.post("/marks/cie/bulk", json=[
+        {"subject_id": ids[0], **CIE},
+        {"usn": " 1rn24cs000 ", "subject_code": "bcs301", **CIE},
+    ])
+    assert resp.status_code == 200, resp.text
+    assert resp.json() == {"rows_received": 2, "rows_stored": 2, "created": 2, "updated": 0, "errors": []}
+    db.expire_all()
+    assert [db.get(models.Subject, i).cie_record.final_cie for i in ids] == [39.0, 39.0]
+
+
+def test_csv_rows_with_blank_cells(client, db):
+    sem = add_students(db, 1)[0]
+    subject_ids = [s.id for s in add_subjects(db, sem, 2)]
+    body = ("usn,subject_code,raw_scored,is_absent\n"
+            "1RN24CS000,BCS300,84,\n"
+            "1RN24CS000,BCS301,,true\n")
+
+    resp = client.post("/marks/see/bulk", content=body.encode(), headers={"Content-Type": "text/csv"})
+    assert resp.status_code == 200, resp.text
+    assert (resp.json()["rows_stored"], resp.json()["updated"]) == (2, 2)
+    db.expire_all()
+    marks = [db.get(models.Subject, i).see_mark for i in subject_ids]
+    assert (marks[0].raw_scored, marks[0].reduced_scored, marks[0].is_absent) == (84, 42, False)
+    assert (marks[1].raw_scored, marks[1].reduced_scored, marks[1].is_absent) == (None, None, True)
+
+
+def test_body_that_is_not_rows_is_rejected(client, db):
+    for content, ctype in ((b'{"subject_id": 1}', "application/json"), (b"not json", "application/json"),
+                           (b"\xff\xfe", "text/csv")):
+        resp = client.post("/marks/cie/bulk", content=content, headers={"Content-Type": ctype})
+        assert resp.status_code == 400, (content, resp.text)
+
+
+def test_more_than_max_bulk_rows_is_413(client, db, monkeypatch):
+    monkeypatch.setattr(marks_router, "MAX_BULK_ROWS", 2)
+    rows = [{"subject_id": i, **CIE} for i in range(3)]
+    assert client.post("/marks/cie/bulk", json=rows).status_code == 413
+    csv_body = "subject_id,raw_scored\n" + "".join(f"{i},50\n" for i in range(3))
+    resp = client.post("/marks/see/bulk", content=csv_body.encode(), headers={"Content-Type": "text/csv"})
+    assert resp.status_code == 413
+
+
+def test_unknown_subjects_are_reported_per_row(client, db):
+    sem = add_students(db, 1)[0]
+    subject_id = add_subjects(db, sem, 1)[0].id
+
+    resp = client.post("/marks/see/bulk", json=[
+        {"usn": "1RN24CS000", "subject_code": "BXX999", "raw_scored": 50},
+        {"subject_id": subject_id, "raw_scored": 70},
+        {"subject_id": 999999, "raw_scored": 70},
+        {"usn": "1RN24CS000", "subject_code": "BCS300", "raw_scored": 60},
+    ])
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert (body["rows_received"], body["rows_stored"]) == (4, 1)
+    assert [(e["row"], e["detail"]) for e in body["errors"]] == [
+        (1, "Subject BXX999 not found for USN 1RN24CS000"),
+        (3, "Subject not found"),
+        (4, "Duplicate of row 2"),
+    ]
+    db.expire_all()
+    assert db.get(models.Subject, subject_id).see_mark.raw_scored == 70
+
+
+def test_subjects_are_resolved_in_at_most_two_queries(db):
+    semesters = add_students(db, 20)
+    rows = []
+    for sem in semesters:
+        by_id, by_usn = add_subjects(db, sem, 2)
+        rows.append({"subject_id": by_id.id, "raw_scored": 50})
+        rows.append({"usn": sem.student.usn, "subject_code": by_usn.subject_code, "raw_scored": 50})
+    parsed, errors = marks_service._validate_rows(rows, schemas.SEEBulkRow)
+    assert not errors
+    db.expunge_all()    # nothing from setup in the identity map
+
+    with count_statements(engine) as statements:
+        resolved, errors = marks_service._resolve_subjects(db, parsed)
+    assert not errors and len(resolved) == len(rows)
+    assert len(statements) <= 2
@@ -0,0 +1,111 @@
+"""
+tests/test_cie_batch.py – compute_cie_batch must agree with compute_cie row for row
+"""
+import math
+import random
+
+import numpy as np
+import pytest
+
+from models import SubjectType
+from services.cie_batch import RAW_FIELDS, compute_cie_batch
+from services.cie_calculator import compute_cie, is_detained
+
+TYPES = [t.value for t in SubjectType] + ["unknown"]
+MAXIMA = {
+    "ia_test1_raw": 50, "ia_test2_raw": 50, "cce_marks": 20, "lab_record_marks": 30,
+    "lab_test1_raw": 100, "lab_test2_raw": 100, "direct_cie_marks": 100,
+}
+
+
+def _random_mark(rng: random.Random, field: str):
+    kind = rng.random()
+    if kind < 0.15:
+        return None
+    if kind < 0.25:
+        return 0.0
+    if kind < 0.55:  # half marks: the .x5 rounding ties live here
+        return rng.randint(0, 2 * MAXIMA[field]) / 2
+    return round(rng.uniform(0, MAXIMA[field]), rng.choice([0, 1, 2, 3]))
+
+
+def _compare(rows):
+    """rows: [(subject_type, {field: value or None}, is_mandatory)]"""
+    batch = compute_cie_batch(
+        [t for t, _, _ in rows],
+        {f: [np.nan if d.get(f) is None else d[f] for _, d, _ in rows] for f in RAW_FIELDS},
+        is_mandatory=[m for _, _, m in rows],
+    )
+    for i, (stype, data, mandatory) in enumerate(rows):
+        expected = compute_cie(stype, data)
+        for f in ("ia_scaled", "lab_test_scaled", "final_cie"):
+            got = batch[f][i]
+            want = expected[f]
+            if want is None:
+                assert math.isnan(got), (i, stype, data, f, got)
+            else:
+                assert got == want, (i, stype, data, f, got, want)
+        assert bool(batch["is_detained"][i]) == is_detained(expected["final_cie"], mandatory), (i, stype, data)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_rows_match_scalar_path(seed):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(4000):
+        stype = rng.choice(TYPES)
+        data = {f: _random_mark(rng, f) for f in RAW_FIELDS}
+        rows.append((stype, data, stype == "mc" or rng.random() < 0.05))
+    _compare(rows)
+
+
+def test_edge_rows():
+    none = dict.fromkeys(RAW_FIELDS)
+    rows = [
+        ("pcc", none, False),                                                    # nothing entered
+        ("ipcc", none, False),
+        ("pccl", none, False),
+        ("mc", none, True),                                                      # final_cie stays None
+        ("pcc", {**none, "ia_test1_raw": 50, "ia_test2_raw": 50, "cce_marks": 20}, False),    # exactly 50
+        ("pcc", {**none, "ia_test1_raw": 50, "ia_test2_raw": 50, "cce_marks": 25}, False),    # capped at 50
+        ("ipcc", {**none, "ia_test1_raw": 50, "cce_marks": 10, "lab_record_marks": 30,
+                  "lab_test1_raw": 100, "lab_test2_raw": 100}, False),                         # capped at 50
+        ("pccl", {**none, "lab_record_marks": 40, "lab_test1_raw": 100}, False),               # capped at 50
+        ("pcc", {**none, "ia_test1_raw": 0.0, "ia_test2_raw": -0.0}, False),
+        ("pcc", {**none, "ia_test1_raw": 33.33, "cce_marks": 0.0}, False),      # 19.998 → 20.0, not detained
+        ("pcc", {**none, "ia_test1_raw": 33.3, "cce_marks": 0.0}, False),       # 19.98 → detained
+        ("pcc", {**none, "ia_test1_raw": 20, "cce_marks": 8}, False),           # 12 + 8 = exactly 20
+        ("pcc", {**none, "ia_test1_raw": 20, "cce_marks": 7.99}, False),        # 19.99 → detained
+        ("pcc", {**none, "ia_test1_raw": 20, "cce_marks": 7.99}, True),         # mandatory: never detained
+        ("mc", {**none, "direct_cie_marks": 10}, True),
+        ("mc", {**none, "direct_cie_marks": 10}, False),                        # MC type, flag off: detained
+        ("unknown", {**none, "ia_test2_raw": 40, "cce_marks": 12.5}, False),    # falls back to PCC
+        ("ipcc", {**none, "lab_test2_raw": 55}, False),                         # only the second lab test
+        ("pccl", {**none, "lab_test2_raw": 90}, False),                         # PCCL ignores lab test 2
+        ("pcc", {**none, "ia_test1_raw": 10.125}, False),                       # rounding tie
+    ]
+    _compare(rows)
+
+
+def test_values_at_the_cap_and_threshold():
+    out = compute_cie_batch(
+        ["pcc", "pcc", "pcc"],
+        {"ia_test1_raw": [50, 20, 20], "cce_marks": [25, 8, 7.99]},
+        is_mandatory=[False, False, False],
+    )
+    assert list(out["final_cie"]) == [50.0, 20.0, 19.99]
+    assert list(out["is_detained"]) == [False, False, True]
+
+
+def test_nan_components_stay_missing():
+    out = compute_cie_batch(["ipcc", "mc"], {"ia_test1_raw": [np.nan, np.nan]})
+    assert math.isnan(out["ia_scaled"][0]) and math.isnan(out["lab_test_scaled"][0])
+    assert out["final_cie"][0] == 0.0 and out["is_detained"][0]
+    assert math.isnan(out["final_cie"][1]) and not out["is_detained"][1]
+
+
+def test_empty_and_mismatched_input():
+    out = compute_cie_batch([], {})
+    assert out["final_cie"].shape == (0,)
+    with pytest.raises(ValueError):
+        compute_cie_batch(["pcc", "pcc"], {"cce_marks": [1.0]})
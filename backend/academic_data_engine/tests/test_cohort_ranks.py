@@ -0,0 +1,60 @@
+"""
+tests/test_cohort_ranks.py – Cohort rank lists: SGPA order and snapshot locking
+"""
+from sqlalchemy import event
+
+from conftest import add_students, add_subjects
+from database import engine
+from services import cohort_service
+
+COHORT = {"branch": "CSE", "scheme": "2024", "semester_number": 3, "academic_year": "2025-26"}
+
+
+def _set_totals(db, semester, total):
+    """Every subject of semester at CIE + SEE = total."""
+    for subj in add_subjects(db, semester, 2):
+        subj.cie_record.final_cie = total / 2
+        subj.see_mark.reduced_scored = total / 2
+    db.commit()
+
+
+def test_semester_ranks_follow_the_pass_rule(client, db):
+    passed, failed, better = add_students(db, 3)
+    _set_totals(db, passed, 45)     # 5 points
+    _set_totals(db, failed, 38)     # below 40: 0 points, not tied with 45
+    _set_totals(db, better, 50)     # 6 points
+
+    resp = client.get("/cohorts/ranks", params=COHORT)
+    assert resp.status_code == 200, resp.text
+    entries = resp.json()["entries"]
+    assert [(e["semester_id"], e["score"], e["rank"]) for e in entries] == [
+        (better.id, 6.0, 1), (passed.id, 5.0, 2), (failed.id, 0.0, 3)]
+
+
+def test_rebuild_and_marks_write_take_the_same_cohort_lock(client, db, monkeypatch):
+    """PostgreSQL path, run on SQLite with pg_advisory_xact_lock() recorded instead."""
+    sem = add_students(db, 1)[0]
+    subj = add_subjects(db, sem, 1)[0]
+    subject_id = subj.id
+    locks = []
+
+    def register(dbapi_conn, record):
+        dbapi_conn.create_function("pg_advisory_xact_lock", 1, locks.append)
+
+    monkeypatch.setattr(cohort_service, "_uses_advisory_locks", lambda db: True)
+    db.close()
+    engine.dispose()
+    event.listen(engine, "connect", register)
+    try:
+        assert client.get("/cohorts/ranks", params=COHORT).status_code == 200
+        rebuild = list(locks)
+        locks.clear()
+        assert client.post(f"/subjects/{subject_id}/see", json={"raw_scored": 90}).status_code == 201
+        write = list(locks)
+    finally:
+        event.remove(engine, "connect", register)
+        engine.dispose()
+
+    lock_id = cohort_service._lock_id(cohort_service.Cohort(**COHORT))
+    assert rebuild == [lock_id]
+    assert write == [lock_id]
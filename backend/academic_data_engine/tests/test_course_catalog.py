@@ -0,0 +1,157 @@
+"""
+tests/test_course_catalog.py – Shared course catalog: corrections, CIE recompute, migration
+"""
+import logging
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import models
+from conftest import add_students
+from database import Base
+from migrations import subjects_to_courses
+from services import extraction_pool, module_service, stats_service
+
+ROWS = [{"subject_code": "BCS301", "subject_name": "Maths", "subject_type": "pcc", "credits": "4"}]
+
+
+@pytest.fixture(autouse=True)
+def fake_extraction(monkeypatch):
+    async def run(fn, path):
+        return [dict(r) for r in ROWS], []
+    monkeypatch.setattr(extraction_pool, "run", run)
+    monkeypatch.setattr(module_service, "populate_modules", lambda path, semester_ids: None)
+
+
+def _upload(client, semester_id):
+    resp = client.post(f"/upload-syllabus/{semester_id}",
+                       files={"file": ("s.pdf", b"%PDF-1.4 " + os.urandom(8), "application/pdf")})
+    assert resp.status_code == 201, resp.text
+
+
+def _subject_id(db, semester):
+    return db.query(models.Subject.id).filter(models.Subject.semester_id == semester.id).scalar()
+
+
+def test_upload_keeps_a_corrected_type_and_credits(client, db, monkeypatch):
+    sem_a, sem_b = add_students(db, 2)
+    _upload(client, sem_a.id)
+    resp = client.put(f"/subjects/{_subject_id(db, sem_a)}", json={"subject_type": "ipcc", "credits": 3})
+    assert resp.status_code == 200, resp.text
+
+    monkeypatch.setitem(ROWS[0], "subject_name", "Mathematics for CS")
+    _upload(client, sem_b.id)
+
+    course = db.query(models.Course).one()
+    db.refresh(course)
+    assert (course.subject_type, course.credits) == (models.SubjectType.ipcc, 3)
+    assert course.subject_name == "Mathematics for CS"   # descriptive fields still follow the syllabus
+
+
+def test_manual_add_enrolls_the_catalog_course_unchanged(client, db):
+    sem_a, sem_b, sem_c = add_students(db, 3)
+    _upload(client, sem_a.id)
+
+    resp = client.post(f"/semesters/{sem_b.id}/subjects/",
+                       json={"subject_code": "bcs301", "subject_name": "Discrete Maths", "credits": 2})
+    assert resp.status_code == 409, resp.text
+    assert "credits" in resp.json()["detail"]
+
+    resp = client.post(f"/semesters/{sem_c.id}/subjects/",
+                       json={"subject_code": "BCS301", "subject_name": "Discrete Maths", "option_group": "A"})
+    assert resp.status_code == 201, resp.text
+    assert (resp.json()["subject_name"], resp.json()["credits"], resp.json()["option_group"]) == ("Maths", 4, "A")
+
+    course = db.query(models.Course).one()
+    db.refresh(course)
+    assert (course.subject_name, course.subject_type, course.credits) == ("Maths", models.SubjectType.pcc, 4)
+
+
+def test_type_correction_recomputes_every_enrollment(client, db):
+    sems = add_students(db, 3)
+    for sem in sems:
+        _upload(client, sem.id)
+    subject_ids = [_subject_id(db, sem) for sem in sems]
+    for sid in subject_ids:
+        resp = client.post(f"/subjects/{sid}/cie", json={"ia_test1_raw": 40, "ia_test2_raw": 40, "cce_marks": 15})
+        assert resp.status_code == 201, resp.text
+        assert resp.json()["final_cie"] == 39.0    # PCC: 24 + 15
+
+    # IPCC: IA scales to 20 instead of 30 → 16 + 15 = 31
+    assert client.put(f"/subjects/{subject_ids[0]}", json={"subject_type": "ipcc"}).status_code == 200
+    for sid in subject_ids:
+        cie = client.get(f"/subjects/{sid}/cie").json()
+        assert (cie["ia_scaled"], cie["final_cie"]) == (16.0, 31.0)
+
+    # PCCL ignores IA and CCE: nothing entered for it yet → 0, detained
+    assert client.put(f"/subjects/{subject_ids[1]}", json={"subject_type": "pccl"}).status_code == 200
+    for sid in subject_ids:
+        cie = client.get(f"/subjects/{sid}/cie").json()
+        assert (cie["final_cie"], cie["is_detained"]) == (0.0, True)
+    stats = client.get(f"/semesters/{sems[2].id}/stats").json()
+    assert stats["detained_count"] == 1
+
+
+def test_failed_type_correction_leaves_no_recomputed_cie(client, db, monkeypatch):
+    sems = add_students(db, 2)
+    for sem in sems:
+        _upload(client, sem.id)
+    subject_ids = [_subject_id(db, sem) for sem in sems]
+    for sid in subject_ids:
+        client.post(f"/subjects/{sid}/cie", json={"ia_test1_raw": 40, "ia_test2_raw": 40, "cce_marks": 15})
+
+    def fail(db, course_ids):
+        raise RuntimeError("write failed after the recompute")
+    monkeypatch.setattr(stats_service, "invalidate_courses", fail)
+    with pytest.raises(RuntimeError):
+        client.put(f"/subjects/{subject_ids[0]}", json={"subject_type": "ipcc"})
+
+    for sid in subject_ids:
+        assert client.get(f"/subjects/{sid}/cie").json()["final_cie"] == 39.0    # still PCC
+    db.expire_all()
+    assert db.query(models.Course).one().subject_type == models.SubjectType.pcc
+
+
+# ── Migration from per-student subject copies ─────────────────────
+
+LEGACY_SUBJECTS = """
+CREATE TABLE subjects (
+    id INTEGER PRIMARY KEY, semester_id INTEGER NOT NULL REFERENCES semesters (id) ON DELETE CASCADE,
+    subject_code VARCHAR(20) NOT NULL, subject_name VARCHAR(200) NOT NULL,
+    subject_type VARCHAR(4) NOT NULL, credits FLOAT NOT NULL, ltp_hours VARCHAR(20),
+    is_mandatory BOOLEAN NOT NULL, option_group VARCHAR(30), is_chosen BOOLEAN NOT NULL,
+    created_at DATETIME, updated_at DATETIME,
+    CONSTRAINT uq_sem_subject UNIQUE (semester_id, subject_code)
+)
+"""
+
+
+def test_migration_warns_about_differing_copies(tmp_path, caplog):
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(legacy)
+    with legacy.begin() as conn:
+        conn.execute(text("DROP TABLE subjects"))
+        conn.execute(text(LEGACY_SUBJECTS))
+        for i in (1, 2, 3):
+            conn.execute(text("INSERT INTO students (id, name, usn, branch, scheme) "
+                              "VALUES (:i, 'S', :usn, 'CSE', '2024')"), {"i": i, "usn": f"1RN24CS00{i}"})
+            conn.execute(text("INSERT INTO semesters (id, student_id, semester_number, academic_year) "
+                              "VALUES (:i, :i, 3, '2025-26')"), {"i": i})
+        copies = [(1, "BCS301", "Maths", "PCC", 4), (2, "BCS301", "Maths", "IPCC", 4), (3, "BCS301", "Maths", "IPCC", 3),
+                  (1, "BCS302", "Logic", "PCC", 3), (2, "BCS302", "Logic", "PCC", 3)]
+        for sem, code, name, stype, credits in copies:
+            conn.execute(text("INSERT INTO subjects (semester_id, subject_code, subject_name, subject_type, credits, "
+                              "is_mandatory, is_chosen) VALUES (:s, :c, :n, :t, :cr, 0, 1)"),
+                         {"s": sem, "c": code, "n": name, "t": stype, "cr": credits})
+
+    with caplog.at_level(logging.WARNING, logger="migrations"):
+        subjects_to_courses(legacy)
+
+    warnings = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert "BCS301" in warnings[0] and "subject_type (2 values)" in warnings[0] and "credits (2 values)" in warnings[0]
+    with legacy.connect() as conn:
+        assert conn.execute(text("SELECT subject_type, credits FROM courses WHERE subject_code = 'BCS301'")).one() == ("IPCC", 3)
+        assert conn.execute(text("SELECT COUNT(*) FROM subjects")).scalar() == 5
+    legacy.dispose()
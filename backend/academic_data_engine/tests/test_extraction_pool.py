@@ -0,0 +1,39 @@
+"""
+tests/test_extraction_pool.py – Extraction pool: a job that hangs past its timeout gives its slot back
+"""
+import asyncio
+import time
+
+import pytest
+
+from services import extraction_pool
+
+
+@pytest.fixture
+def one_slot(monkeypatch):
+    """A single worker and no wait queue: one stuck job would saturate the pool."""
+    monkeypatch.setattr(extraction_pool, "PDF_WORKERS", 1)
+    monkeypatch.setattr(extraction_pool, "PDF_MAX_QUEUE", 0)
+    extraction_pool.shutdown()
+    yield
+    extraction_pool.shutdown()
+
+
+def test_hung_job_does_not_keep_its_slot(one_slot):
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await extraction_pool.run(time.sleep, 120, timeout=5)   # 5 s: room for the worker to spawn
+        deadline = time.monotonic() + 30
+        while extraction_pool.in_flight() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        assert extraction_pool.in_flight() == 0
+        return await extraction_pool.run(abs, -3, timeout=30)
+
+    assert asyncio.run(scenario()) == 3
+
+
+def test_abandoning_a_finished_or_foreign_future_is_a_no_op(one_slot):
+    fut = extraction_pool.submit(abs, -1)
+    assert fut.result(timeout=30) == 1
+    extraction_pool.abandon(fut)
+    assert extraction_pool.submit(abs, -2).result(timeout=30) == 2
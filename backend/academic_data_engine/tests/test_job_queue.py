@@ -0,0 +1,101 @@
+"""
+tests/test_job_queue.py – Background syllabus jobs: orphan requeue, timeouts, live progress
+"""
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+import models
+from conftest import add_students
+from pdf_engine import structure_extractor
+from services import extraction_pool, job_queue
+
+
+def _job(db, semester_id, path="/nonexistent.pdf", **fields):
+    job = models.SyllabusJob(semester_id=semester_id, filename="s.pdf", file_path=path, **fields)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def test_requeue_orphans_keeps_only_jobs_with_a_live_owner(db):
+    sem = add_students(db, 1)[0]
+    now = datetime.utcnow()
+    old = now - timedelta(seconds=2 * job_queue.STALE_AFTER_S)
+    running = {"status": models.JobStatus.running, "started_at": old}
+    legacy = _job(db, sem.id, **running)                                   # claimed before owners were recorded
+    crashed = _job(db, sem.id, worker_id="gone", heartbeat_at=old, **running)
+    peer = _job(db, sem.id, worker_id="peer", heartbeat_at=now, **running)
+    own = _job(db, sem.id, worker_id=job_queue.INSTANCE_ID, heartbeat_at=old, **running)
+    done = _job(db, sem.id, status=models.JobStatus.done)
+
+    assert job_queue.requeue_orphans() == 2
+
+    db.expire_all()
+    status = {j.id: j.status for j in db.query(models.SyllabusJob)}
+    assert status[legacy] == status[crashed] == models.JobStatus.queued
+    assert status[peer] == status[own] == models.JobStatus.running
+    assert status[done] == models.JobStatus.done
+    requeued = db.get(models.SyllabusJob, crashed)
+    assert requeued.worker_id is None and requeued.started_at is None
+
+
+def test_claim_records_the_owner(db):
+    sem = add_students(db, 1)[0]
+    job_id = _job(db, sem.id)
+    assert job_queue._claim_next() == job_id
+    job = db.get(models.SyllabusJob, job_id)
+    assert job.worker_id == job_queue.INSTANCE_ID and job.heartbeat_at is not None
+
+
+def test_timed_out_job_keeps_the_pdf_until_the_worker_finishes(db, tmp_path, monkeypatch):
+    sem = add_students(db, 1)[0]
+    pdf = tmp_path / "job.pdf"
+    pdf.write_bytes(b"%PDF-1.4 timeout")
+    job_id = _job(db, sem.id, path=str(pdf), status=models.JobStatus.running)
+
+    fut = Future()
+    fut.set_running_or_notify_cancel()   # already picked up by a worker process
+    monkeypatch.setattr(extraction_pool, "submit_when_free", lambda *a, **kw: fut)
+    monkeypatch.setattr(job_queue, "JOB_TIMEOUT_S", 0.01)
+
+    job_queue._process(job_id)
+    db.expire_all()
+    assert db.get(models.SyllabusJob, job_id).status == models.JobStatus.failed
+    assert pdf.exists()
+
+    fut.set_result(([], []))
+    assert not pdf.exists()
+
+
+class _TextDoc:
+    """Stand-in PdfDocument for the text-line strategy."""
+    def __init__(self, pages):
+        self.pages = pages
+        self.page_count = len(pages)
+
+    def page_text(self, pg_num):
+        return self.pages[pg_num]
+
+
+def test_text_strategy_reports_subjects_as_they_are_found():
+    pages = [
+        "BCS301   Mathematics for CS   4\nBCS302   Digital Design   4",
+        "Preface only",
+        "BCS303   Operating Systems   4",
+        "",
+    ]
+    calls = []
+    subjects, _ = structure_extractor._extract_via_text(_TextDoc(pages), lambda **kw: calls.append(kw))
+    assert len(subjects) == 3
+    assert [c["subjects_found"] for c in calls] == [0, 2, 2, 3]
+
+
+def test_progress_writer_flushes_new_subject_counts(db):
+    sem = add_students(db, 1)[0]
+    job_id = _job(db, sem.id, status=models.JobStatus.running)
+    writer = job_queue._ProgressWriter(job_id)
+    writer(strategy="text", pages_total=4, pages_scanned=0, subjects_found=0)
+    writer(strategy="text", pages_scanned=1, subjects_found=2)   # inside the throttle window
+    db.expire_all()
+    job = db.get(models.SyllabusJob, job_id)
+    assert (job.pages_scanned, job.subjects_found) == (1, 2)
@@ -0,0 +1,35 @@
+"""
+tests/test_marks_summary.py – GET /semesters/{id}/marks-summary
+"""
+from conftest import add_students, add_subjects, count_statements
+from database import async_engine
+
+
+def test_summary_lists_every_subject_with_marks(client, db):
+    sem = add_students(db, 1)[0]
+    add_subjects(db, sem, 3)
+    resp = client.get(f"/semesters/{sem.id}/marks-summary")
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["semester_id"] == sem.id
+    assert [s["subject_code"] for s in body["subjects"]] == ["BCS300", "BCS301", "BCS302"]
+    assert all(s["final_cie"] == 36 and s["see_reduced"] == 35 for s in body["subjects"])
+
+
+def test_unknown_semester_is_404(client, db):
+    assert client.get("/semesters/999999/marks-summary").status_code == 404
+
+
+def test_statement_count_does_not_depend_on_subject_count(client, db):
+    one, many = add_students(db, 2)
+    add_subjects(db, one, 1)
+    add_subjects(db, many, 30)
+
+    counts = {}
+    for sem, n in ((one, 1), (many, 30)):
+        with count_statements(async_engine.sync_engine) as statements:
+            resp = client.get(f"/semesters/{sem.id}/marks-summary")
+        assert resp.status_code == 200, resp.text
+        assert len(resp.json()["subjects"]) == n
+        counts[n] = len(statements)
+    assert counts[1] == counts[30]
@@ -0,0 +1,79 @@
+"""
+tests/test_page_scan.py – Candidate page scan of the table strategy with PDF_PAGE_WORKERS set
+"""
+import itertools
+
+import pytest
+
+from pdf_engine import structure_extractor as se
+
+
+class _Doc:
+    """Stands in for PdfDocument: page n's tables are [[n]]; records which pages were detected here."""
+
+    def __init__(self, n_pages):
+        self.page_count, self.source, self.detected = n_pages, "handbook.pdf", []
+
+    def page_tables(self, pg_num):
+        self.detected.append(pg_num)
+        return [[pg_num]]
+
+
+@pytest.fixture
+def page_workers(monkeypatch):
+    monkeypatch.setattr(se, "PAGE_WORKERS", 2)
+    monkeypatch.setattr(se, "_could_hold_subject_table", lambda doc, pg_num: pg_num % 2 == 0)
+    prefiltered = []
+    real = se._candidate_pages
+    monkeypatch.setattr(se, "_candidate_pages",
+                        lambda doc, progress: (prefiltered.append(p) or p for p in real(doc, progress)))
+    return prefiltered
+
+
+def test_table_near_the_front_starts_no_page_workers(monkeypatch, page_workers):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("page workers started")
+    monkeypatch.setattr(se, "ProcessPoolExecutor", no_pool)
+
+    doc = _Doc(200)
+    first = next(se._candidate_page_tables(doc, None))
+    assert first == (0, [[0]])
+    assert page_workers == [0]          # the rest of the book was not even pre-filtered
+
+
+def test_later_waves_are_fanned_out_in_page_order(monkeypatch, page_workers):
+    submitted = []
+
+    class _Future:
+        def __init__(self, value):
+            self.value = value
+
+        def result(self):
+            return self.value
+
+        def cancel(self):
+            pass
+
+    class _Pool:
+        def __init__(self, max_workers, mp_context):
+            assert max_workers == 2
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def submit(self, fn, source, pages):
+            submitted.append(pages)
+            return _Future({p: [[p]] for p in pages})
+
+    monkeypatch.setattr(se, "ProcessPoolExecutor", _Pool)
+    doc = _Doc(60)
+    pages = [pg for pg, _ in se._candidate_page_tables(doc, None)]
+
+    wave = se.PAGE_WORKERS * se.PAGES_PER_TASK
+    assert pages == list(range(0, 60, 2))
+    assert doc.detected == pages[:wave]                      # first wave in this process
+    assert list(itertools.chain(*submitted)) == pages[wave:]
+    assert all(len(sl) <= se.PAGES_PER_TASK for sl in submitted)
@@ -0,0 +1,95 @@
+"""
+tests/test_query_plans.py – Hot read paths must be index searches, never full table scans
+
+The SELECTs an endpoint actually runs are captured and re-run under EXPLAIN QUERY PLAN.
+"""
+import os
+import re
+
+import pytest
+from conftest import add_students, add_subjects, count_statements
+from database import async_engine, engine
+from services import extraction_pool, module_service
+
+# "SCAN <table>" without an index; "SCAN t USING [COVERING] INDEX" is an index walk
+_TABLE_SCAN = re.compile(r"\bSCAN (\w+)(?! USING)")
+
+# get_db_data() in academic_analyzer/performance_logic.py: the transcript by USN
+TRANSCRIPT_SQL = """
+SELECT co.subject_name, co.credits, COALESCE(c.final_cie, 0), COALESCE(sm.reduced_scored, 0)
+FROM students st
+JOIN semesters sem ON sem.student_id = st.id
+JOIN subjects s ON s.semester_id = sem.id
+JOIN courses co ON co.id = s.course_id
+LEFT JOIN cie_records c ON c.subject_id = s.id
+LEFT JOIN see_marks sm ON sm.subject_id = s.id
+WHERE st.usn = ?
+"""
+
+
+def _plan(statement, parameters=()):
+    raw = engine.raw_connection()
+    try:
+        rows = raw.cursor().execute("EXPLAIN QUERY PLAN " + statement, tuple(parameters or ())).fetchall()
+    finally:
+        raw.close()
+    return [row[-1] for row in rows]
+
+
+def _assert_index_only(statements):
+    selects = [(s, p) for s, p in statements if s.lstrip().upper().startswith("SELECT")]
+    assert selects, "no SELECT captured"
+    for statement, parameters in selects:
+        plan = _plan(statement, parameters)
+        scans = [line for line in plan if _TABLE_SCAN.search(line)]
+        assert not scans, f"{scans} in plan of:\n{statement}\n{plan}"
+        assert any("USING" in line for line in plan), f"no index used:\n{statement}\n{plan}"
+
+
+@pytest.fixture
+def semester(db):
+    students = add_students(db, 20)
+    for sem in students:
+        add_subjects(db, sem, 8)
+    return students[7]
+
+
+def test_list_subjects_by_semester(client, semester):
+    with count_statements(async_engine.sync_engine) as statements:
+        assert client.get(f"/semesters/{semester.id}/subjects/").status_code == 200
+    _assert_index_only(statements)
+
+
+def test_marks_summary_by_semester(client, semester):
+    with count_statements(async_engine.sync_engine) as statements:
+        assert client.get(f"/semesters/{semester.id}/marks-summary").status_code == 200
+    _assert_index_only(statements)
+
+
+def test_modules_of_a_subject(client, semester):
+    subject_id = semester.subjects[0].id
+    with count_statements(async_engine.sync_engine) as statements:
+        assert client.get(f"/subjects/{subject_id}/modules").status_code == 200
+    _assert_index_only(statements)
+
+
+def test_transcript_by_usn(semester):
+    _assert_index_only([(TRANSCRIPT_SQL, ("1RN24CS007",))])
+
+
+def test_cohort_upload_target_lookup(client, semester, monkeypatch):
+    async def run(fn, path):
+        return [{"subject_code": "BCS399", "subject_name": "Elective", "subject_type": "pcc", "credits": "3"}], []
+    monkeypatch.setattr(extraction_pool, "run", run)
+    monkeypatch.setattr(module_service, "populate_modules", lambda path, semester_ids: None)
+
+    with count_statements(engine) as statements:
+        resp = client.post(
+            "/upload-syllabus/cohort",
+            params={"semester_number": 3, "academic_year": "2025-26", "branch": "CSE", "scheme": "2024"},
+            files={"file": ("s.pdf", b"%PDF-1.4 " + os.urandom(8), "application/pdf")},
+        )
+    assert resp.status_code == 200, resp.text
+    lookups = [(s, p) for s, p in statements if "FROM semesters JOIN students" in s]
+    assert lookups   # the cohort query, then the scheme lookup of upsert_subjects
+    _assert_index_only(lookups)
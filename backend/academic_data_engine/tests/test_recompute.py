@@ -0,0 +1,71 @@
+"""
+tests/test_recompute.py – recompute_cie after a rule change
+"""
+import models
+from conftest import add_students, add_subjects
+from services import recompute_service, response_cache
+
+
+def _spy_invalidations(monkeypatch):
+    calls = []
+    original = response_cache.invalidate
+
+    def spy(db, endpoints, entity_ids):
+        entity_ids = list(entity_ids)
+        calls.append((tuple(endpoints), entity_ids))
+        return original(db, endpoints, entity_ids)
+    monkeypatch.setattr(response_cache, "invalidate", spy)
+    return calls
+
+
+def test_consistent_records_are_left_alone(db):
+    sem = add_students(db, 1)[0]
+    add_subjects(db, sem, 3)
+    report = recompute_service.recompute_cie(db)
+    assert (report.total, report.scanned, report.changed, report.semesters_refreshed) == (3, 3, 0, 0)
+
+
+def test_a_scaled_component_change_refreshes_its_semester(db, monkeypatch):
+    """final_cie and detention unchanged: the semester is still refreshed (its summary shows ia_scaled)."""
+    sem, other = add_students(db, 2)
+    stale = add_subjects(db, sem, 2)[0]
+    add_subjects(db, other, 2)
+    stale.cie_record.ia_scaled = 20.0      # stored under an older rule; 21.0 now, final_cie 36 either way
+    db.commit()
+    calls = _spy_invalidations(monkeypatch)
+
+    report = recompute_service.recompute_cie(db)
+
+    assert report.changed == 1 and report.field_changes == {"ia_scaled": 1}
+    assert report.semesters_refreshed == 1
+    db.expire_all()
+    assert db.get(models.CIERecord, stale.cie_record.id).ia_scaled == 21.0
+    assert db.get(models.SemesterStats, sem.id) is not None
+    assert db.get(models.SemesterStats, other.id) is None
+    assert any(response_cache.MARKS_SUMMARY in endpoints and ids == [sem.id] for endpoints, ids in calls)
+
+
+def test_see_flag_resync_refreshes_its_semester(db):
+    sem = add_students(db, 1)[0]
+    subject = add_subjects(db, sem, 1)[0]
+    subject.see_mark.is_detained = True    # CIE 36 is not detained
+    db.commit()
+
+    report = recompute_service.recompute_cie(db)
+
+    assert (report.changed, report.see_changed, report.semesters_refreshed) == (0, 1, 1)
+    db.expire_all()
+    assert db.get(models.SEEMark, subject.see_mark.id).is_detained is False
+
+
+def test_dry_run_writes_nothing(db):
+    sem = add_students(db, 1)[0]
+    subject = add_subjects(db, sem, 1)[0]
+    subject.cie_record.final_cie = 10.0
+    db.commit()
+
+    report = recompute_service.recompute_cie(db, dry_run=True)
+
+    assert report.changed == 1 and report.semesters_refreshed == 1
+    db.expire_all()
+    assert db.get(models.CIERecord, subject.cie_record.id).final_cie == 10.0
@@ -0,0 +1,47 @@
+"""
+tests/test_response_cache.py – sqlite response cache behind the async read endpoints
+"""
+import asyncio
+
+import pytest
+
+from conftest import add_students, add_subjects
+from services import response_cache
+
+
+class _RecordingBackend(response_cache.SQLiteBackend):
+    """SQLiteBackend noting every call made from a thread that runs an event loop."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.on_loop = []
+
+    def _conn(self):
+        try:
+            asyncio.get_running_loop()
+            self.on_loop.append(True)
+        except RuntimeError:
+            pass
+        return super()._conn()
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path, monkeypatch):
+    backend = _RecordingBackend(str(tmp_path / "cache.sqlite"), 100, 60.0)
+    monkeypatch.setattr(response_cache, "_backend", backend)
+    return backend
+
+
+def test_async_endpoints_keep_sqlite_io_off_the_event_loop(client, db, sqlite_cache):
+    sem = add_students(db, 1)[0]
+    add_subjects(db, sem, 2)
+
+    for url in (f"/semesters/{sem.id}/subjects/", f"/semesters/{sem.id}/marks-summary"):
+        miss = client.get(url)
+        hit = client.get(url)
+        assert miss.status_code == hit.status_code == 200
+        assert miss.json() == hit.json()
+
+    assert sqlite_cache.size() == 2
+    assert {e.endpoint: e.hits for e in response_cache.stats().endpoints}[response_cache.SUBJECTS] >= 1
+    assert not sqlite_cache.on_loop
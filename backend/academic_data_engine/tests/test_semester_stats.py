@@ -0,0 +1,34 @@
+"""
+tests/test_semester_stats.py – GET /semesters/{id}/stats: grade table, credits earned, SGPA
+"""
+import pytest
+
+from conftest import add_students, add_subjects
+from services.stats_service import grade_point
+
+
+@pytest.mark.parametrize("marks, gp", [(100, 10), (90, 10), (89.5, 9), (80, 9), (70, 8), (60, 7),
+                                       (50, 6), (49, 5), (40, 5), (39.5, 0), (0, 0)])
+def test_grade_point_fails_below_40(marks, gp):
+    assert grade_point(marks) == gp
+
+
+def _set_marks(db, subjects, totals):
+    """CIE and reduced SEE of each subject, half of its total each."""
+    for subj, total in zip(subjects, totals):
+        subj.cie_record.final_cie = total / 2
+        subj.see_mark.reduced_scored = total / 2
+    db.commit()
+
+
+def test_only_passed_subjects_earn_credits(client, db):
+    sem = add_students(db, 1)[0]
+    _set_marks(db, add_subjects(db, sem, 3), (95, 45, 38))
+
+    resp = client.get(f"/semesters/{sem.id}/stats")
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["status"] == "complete"
+    assert body["credits_total"] == 9
+    assert body["credits_earned"] == 6          # 38 fails, 40–49 passes with 5 points
+    assert body["sgpa"] == round((10 + 5 + 0) * 3 / 9, 2)
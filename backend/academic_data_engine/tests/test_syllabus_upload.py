@@ -0,0 +1,153 @@
+"""
+tests/test_syllabus_upload.py – Bulk syllabus uploads: results and statement counts
+
+PDF parsing is replaced by fixed rows; these tests cover what the endpoints do with them.
+"""
+import asyncio
+import os
+import pytest
+from sqlalchemy import event
+from conftest import add_students, clear_database, count_statements
+from database import engine
+from services import extraction_pool, module_service, uploads
+
+ROWS = [
+    {"subject_code": "BCS301", "subject_name": "Mathematics for CS", "subject_type": "pcc", "credits": "4"},
+    {"subject_code": "BCS302", "subject_name": "Digital Design", "subject_type": "ipcc", "credits": "4"},
+    {"subject_code": "BCS303", "subject_name": "Operating Systems", "subject_type": "ipcc", "credits": "4"},
+    {"subject_code": "BCSL305", "subject_name": "Data Structures Lab", "subject_type": "pccl", "credits": "1"},
+    {"subject_code": "BSCK307", "subject_name": "Social Connect", "subject_type": "mc", "credits": "0"},
+]
+
+
+@pytest.fixture(autouse=True)
+def fake_extraction(monkeypatch):
+    async def run(fn, path):
+        return [dict(r) for r in ROWS], []
+    monkeypatch.setattr(extraction_pool, "run", run)
+    monkeypatch.setattr(module_service, "populate_modules", lambda path, semester_ids: None)
+
+
+def _upload_cohort(client):
+    # distinct bytes each call: every upload takes the extraction-cache miss path
+    pdf = b"%PDF-1.4 " + os.urandom(16)
+    return client.post(
+        "/upload-syllabus/cohort",
+        params={"semester_number": 3, "academic_year": "2025-26", "branch": "CSE", "scheme": "2024"},
+        files={"file": ("syllabus.pdf", pdf, "application/pdf")},
+    )
+
+
+def test_cohort_upload_reports_every_semester(client, db):
+    semesters = add_students(db, 3)
+    resp = _upload_cohort(client)
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["subjects_per_semester"] == len(ROWS)
+    assert [r["usn"] for r in body["semesters_updated"]] == ["1RN24CS000", "1RN24CS001", "1RN24CS002"]
+    assert {r["semester_id"] for r in body["semesters_updated"]} == {s.id for s in semesters}
+    assert all(r["inserted"] == len(ROWS) and r["updated"] == 0 for r in body["semesters_updated"])
+
+
+def test_no_connection_is_held_while_the_pdf_is_staged_and_parsed(client, db, monkeypatch):
+    semester_id = add_students(db, 1)[0].id
+    checked_out = []
+
+    async def run(fn, path):
+        checked_out.append(engine.pool.checkedout())
+        return [dict(r) for r in ROWS], []
+    monkeypatch.setattr(extraction_pool, "run", run)
+    stage_pdf = uploads.stage_pdf
+
+    async def stage(file):
+        checked_out.append(engine.pool.checkedout())
+        return await stage_pdf(file)
+    monkeypatch.setattr(uploads, "stage_pdf", stage)
+
+    db.close()      # the fixture's own session is not part of the request
+    resp = client.post(f"/upload-syllabus/{semester_id}",
+                       files={"file": ("syllabus.pdf", b"%PDF-1.4 " + os.urandom(16), "application/pdf")})
+    assert resp.status_code == 201, resp.text
+    assert checked_out == [0, 0]     # neither while the upload is staged nor while it is parsed
+
+
+def test_database_steps_run_off_the_event_loop(client, db):
+    sem = add_students(db, 1)[0]
+    semester_id, student_id = sem.id, sem.student_id
+    on_loop = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(statement)
+        except RuntimeError:
+            pass
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert _upload_cohort(client).status_code == 200
+        assert _upload_all_semesters(client, student_id=student_id).status_code == 200
+        for params in ({}, {"background": "true"}):
+            resp = client.post(f"/upload-syllabus/{semester_id}", params=params,
+                               files={"file": ("syllabus.pdf", b"%PDF-1.4 " + os.urandom(16), "application/pdf")})
+            assert resp.status_code in (201, 202), resp.text
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert on_loop == []
+
+
+def _cohort_statements(client, db, n):
+    add_students(db, n)
+    with count_statements(engine) as statements:
+        resp = _upload_cohort(client)
+    assert resp.status_code == 200, resp.text
+    assert len(resp.json()["semesters_updated"]) == n
+    return len(statements)
+
+
+def test_cohort_upload_statement_count_does_not_grow_with_cohort(client, db):
+    small = _cohort_statements(client, db, 1)
+    clear_database()
+    large = _cohort_statements(client, db, 60)
+    assert large == small
+
+
+# ── All semesters ─────────────────────────────────────────────────
+
+def _upload_all_semesters(client, **params):
+    pdf = b"%PDF-1.4 " + os.urandom(16)
+    return client.post("/upload-syllabus/all-semesters", params=params,
+                       files={"file": ("scheme.pdf", pdf, "application/pdf")})
+
+
+def test_all_semesters_upload_matches_semester_numbers(client, db, monkeypatch):
+    async def run(fn, path):
+        return [{**ROWS[0], "semester_number": 3}, {**ROWS[1], "semester_number": 4}], []
+    monkeypatch.setattr(extraction_pool, "run", run)
+    add_students(db, 2)
+
+    resp = _upload_all_semesters(client, branch="CSE", scheme="2024")
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["semesters_detected"] == [3, 4]
+    assert body["unmatched_semesters"] == [4]
+    assert [(r["usn"], r["semester_number"], r["inserted"]) for r in body["semesters_updated"]] == [
+        ("1RN24CS000", 3, 1), ("1RN24CS001", 3, 1),
+    ]
+
+
+def test_all_semesters_upload_statement_count_does_not_grow_with_cohort(client, db, monkeypatch):
+    async def run(fn, path):
+        return [{**r, "semester_number": 3} for r in ROWS], []
+    monkeypatch.setattr(extraction_pool, "run", run)
+
+    counts = []
+    for n in (1, 60):
+        clear_database()
+        add_students(db, n)
+        with count_statements(engine) as statements:
+            resp = _upload_all_semesters(client, branch="CSE", scheme="2024")
+        assert resp.status_code == 200, resp.text
+        assert len(resp.json()["semesters_updated"]) == n
+        counts.append(len(statements))
+    assert counts[0] == counts[1]